@@ -1,8 +1,26 @@
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 from typing import Any
 
 from apps.api.db import ApiDatabase
-from libs.common import MinioDataLakeClient
+from libs.common import MinioDataLakeClient, gold_bundle, restaurant_projection
+from libs.common.store_names import resolve_display_name
+
+logger = logging.getLogger("uvicorn.error")
+
+GOLD_PREFIX = "gold/analysis/"
+WATERMARK_SOURCE = "gold_analysis"
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = (os.getenv(name, str(default)) or "").strip()
+    try:
+        value = int(raw)
+    except ValueError:
+        return default
+    return value if value > 0 else default
 
 
 def _safe_float(value: Any, default: float) -> float:
@@ -14,122 +32,241 @@ def _safe_float(value: Any, default: float) -> float:
         return default
 
 
+def gold_row(payload: Any, *, gold_path: str) -> dict[str, Any] | None:
+    """Serving row for one gold analysis object, or None when it lacks identifiers."""
+    if not isinstance(payload, dict):
+        return None
+    store_id = str(payload.get("store_id") or "").strip()
+    run_id = str(payload.get("run_id") or "").strip()
+    collected_at = str(payload.get("collected_at") or "").strip()
+    if not store_id or not run_id or not collected_at:
+        return None
+    analysis = payload.get("analysis") if isinstance(payload.get("analysis"), dict) else {}
+    legacy = payload.get("legacy_source") if isinstance(payload.get("legacy_source"), dict) else {}
+
+    name = str(legacy.get("name") or "").strip() or None
+    display = resolve_display_name(
+        name,
+        legacy.get("raw_reviews") if isinstance(legacy.get("raw_reviews"), list) else [],
+        store_id=store_id,
+        naver_place_id=legacy.get("naver_place_id"),
+    )
+    return {
+        "store_id": store_id,
+        "run_id": run_id,
+        "collected_at": collected_at,
+        "url": (
+            str(legacy.get("original_url") or "").strip()
+            or str(legacy.get("url") or "").strip()
+            or f"https://map.naver.com/p/entry/place/{store_id}"
+        ),
+        "name": name,
+        "display_name": display.name or None,
+        "display_name_confidence": display.confidence,
+        "display_name_source": display.source,
+        "lat": _safe_float(legacy.get("latitude"), 37.5665),
+        "lng": _safe_float(legacy.get("longitude"), 126.9780),
+        "category": str(analysis.get("vibe") or "").strip() or None,
+        "summary_3lines": str(analysis.get("summary_3lines") or "").strip(),
+        "vibe": str(analysis.get("vibe") or "").strip(),
+        "signature_menu": analysis.get("signature_menu") if isinstance(analysis.get("signature_menu"), list) else [],
+        "tips": analysis.get("tips") if isinstance(analysis.get("tips"), list) else [],
+        "score": _safe_float(analysis.get("score"), 0.0),
+        "ad_review_ratio": _safe_float(analysis.get("ad_review_ratio"), 0.0),
+        "review_summary": analysis.get("review_summary") if isinstance(analysis.get("review_summary"), dict) else {},
+        "categories": analysis.get("categories") if isinstance(analysis.get("categories"), list) else [],
+        "gold_path": gold_path,
+    }
+
+
+def _apply_rows_individually(
+    db: ApiDatabase,
+    keyed_rows: list[tuple[str, dict[str, Any]]],
+    *,
+    conn: Any,
+    refresh_projection: bool,
+) -> list[str]:
+    """Apply rows one savepoint each after their batch failed; returns the rejected keys."""
+    bad_keys: list[str] = []
+    applied: list[str] = []
+    with conn.cursor() as cur:
+        for key, row in keyed_rows:
+            cur.execute("SAVEPOINT gold_row")
+            try:
+                db.apply_gold_rows([row], conn=conn, refresh_projection=False)
+            except Exception as exc:
+                cur.execute("ROLLBACK TO SAVEPOINT gold_row")
+                logger.warning("gold backfill object rejected key=%s error=%s", key, exc)
+                bad_keys.append(key)
+                continue
+            cur.execute("RELEASE SAVEPOINT gold_row")
+            applied.append(row["store_id"])
+        if refresh_projection:
+            restaurant_projection.refresh_stores(cur, applied)
+    return bad_keys
+
+
 def backfill_serving_from_gold(
     *,
     db: ApiDatabase,
     minio: MinioDataLakeClient | None = None,
     max_items: int = 0,
+    incremental: bool = True,
+    dry_run: bool = False,
 ) -> dict[str, Any]:
     """Backfill stores/analysis/snapshots from gold objects.
 
+    Objects are fetched concurrently (BACKFILL_FETCH_WORKERS) and applied in batches of
+    BACKFILL_BATCH_SIZE, one transaction per batch. With incremental=True only objects
+    modified after the stored LastModified watermark (minus a small overlap, since
+    upserts are idempotent) are processed; the watermark advances per committed batch
+    and stops at the first batch that could not be committed (a fetch or database
+    failure) so nothing is skipped. A batch rejected by the database is retried object
+    by object; objects that fail on their own are counted and passed over.
+
     max_items:
       - 0 means no limit.
       - positive number means process up to that many keys.
     """
     client = minio or MinioDataLakeClient()
     gold_bucket = client.gold_bucket
-    gold_keys = client.list_keys(gold_bucket, "gold/analysis/")
+    objects = sorted(client.list_objects_meta(gold_bucket, GOLD_PREFIX), key=lambda item: (item[1], item[0]))
+    listed = len(objects)
+
+    watermark = db.get_backfill_watermark(WATERMARK_SOURCE) if incremental else None
+    if watermark is not None:
+        since = watermark - timedelta(seconds=_env_int("BACKFILL_WATERMARK_OVERLAP_SEC", 120))
+        objects = [item for item in objects if item[1] is None or item[1] > since]
     if max_items > 0:
-        gold_keys = gold_keys[:max_items]
+        objects = objects[:max_items]
+
+    batch_size = _env_int("BACKFILL_BATCH_SIZE", 500)
+    # Large runs rebuild the projection once at the end instead of refreshing per store.
+    rebuild_projection = not dry_run and len(objects) > _env_int("BACKFILL_REBUILD_THRESHOLD", 500)
 
     upserted = 0
     skipped = 0
     failures = 0
+    watermark_blocked = False
 
-    with db.conn() as conn:
-        for index, key in enumerate(gold_keys):
-            savepoint = f"backfill_item_{index}"
-            with conn.cursor() as cur:
-                cur.execute(f"SAVEPOINT {savepoint}")
+    def fetch(item: tuple[str, Any]) -> tuple[tuple[str, Any], dict[str, Any] | None, bool]:
+        key, _ = item
+        try:
+            payload = client.get_json(gold_bucket, key)
+        except Exception as exc:
+            logger.warning("gold backfill fetch failed key=%s error=%s", key, exc)
+            return item, None, True
+        return item, gold_row(payload, gold_path=f"s3://{gold_bucket}/{key}"), False
 
-            try:
-                payload = client.get_json(gold_bucket, key)
-                if not isinstance(payload, dict):
+    with ThreadPoolExecutor(max_workers=_env_int("BACKFILL_FETCH_WORKERS", 8), thread_name_prefix="gold-fetch") as pool:
+        for start in range(0, len(objects), batch_size):
+            batch = objects[start : start + batch_size]
+            keyed_rows: list[tuple[str, dict[str, Any]]] = []
+            fetch_failed = False
+            for (key, _), row, failed in pool.map(fetch, batch):
+                if failed:
+                    failures += 1
+                    fetch_failed = True
+                elif row is None:
                     skipped += 1
-                    with conn.cursor() as cur:
-                        cur.execute(f"RELEASE SAVEPOINT {savepoint}")
-                    continue
-
-                store_id = str(payload.get("store_id") or "").strip()
-                run_id = str(payload.get("run_id") or "").strip()
-                collected_at = str(payload.get("collected_at") or "").strip()
-                analysis = payload.get("analysis") if isinstance(payload.get("analysis"), dict) else {}
-                legacy = payload.get("legacy_source") if isinstance(payload.get("legacy_source"), dict) else {}
+                else:
+                    keyed_rows.append((key, row))
 
-                if not store_id or not run_id or not collected_at:
-                    skipped += 1
-                    with conn.cursor() as cur:
-                        cur.execute(f"RELEASE SAVEPOINT {savepoint}")
-                    continue
-
-                url = (
-                    str(legacy.get("original_url") or "").strip()
-                    or str(legacy.get("url") or "").strip()
-                    or f"https://map.naver.com/p/entry/place/{store_id}"
-                )
-                name = str(legacy.get("name") or "").strip() or None
-                lat = _safe_float(legacy.get("latitude"), 37.5665)
-                lng = _safe_float(legacy.get("longitude"), 126.9780)
-                category = str(analysis.get("vibe") or "").strip() or None
-
-                summary_3lines = str(analysis.get("summary_3lines") or "").strip()
-                vibe = str(analysis.get("vibe") or "").strip()
-                signature_menu_json = analysis.get("signature_menu") if isinstance(analysis.get("signature_menu"), list) else []
-                tips_json = analysis.get("tips") if isinstance(analysis.get("tips"), list) else []
-                score = _safe_float(analysis.get("score"), 0.0)
-                ad_review_ratio = _safe_float(analysis.get("ad_review_ratio"), 0.0)
-                review_summary_json = analysis.get("review_summary") if isinstance(analysis.get("review_summary"), dict) else {}
-                categories_json = analysis.get("categories") if isinstance(analysis.get("categories"), list) else []
-                gold_path = f"s3://{gold_bucket}/{key}"
-
-                db.upsert_store(
-                    store_id=store_id,
-                    url=url,
-                    name=name,
-                    lat=lat,
-                    lng=lng,
-                    category=category,
-                    conn=conn,
-                )
-                db.upsert_analysis(
-                    store_id=store_id,
-                    collected_at_iso=collected_at,
-                    run_id=run_id,
-                    summary_3lines=summary_3lines,
-                    vibe=vibe,
-                    signature_menu_json=signature_menu_json,
-                    tips_json=tips_json,
-                    score=score,
-                    ad_review_ratio=ad_review_ratio,
-                    review_summary_json=review_summary_json,
-                    categories_json=categories_json,
-                    conn=conn,
-                )
-                db.upsert_snapshot(
-                    store_id=store_id,
-                    collected_at_iso=collected_at,
-                    run_id=run_id,
-                    url=url,
-                    status="completed",
-                    progress=100,
-                    gold_path=gold_path,
-                    conn=conn,
-                )
-                upserted += 1
-
-                with conn.cursor() as cur:
-                    cur.execute(f"RELEASE SAVEPOINT {savepoint}")
+            if dry_run:
+                upserted += len(keyed_rows)
+                continue
+            advance = incremental and not watermark_blocked and not fetch_failed and batch[-1][1] is not None
+            try:
+                with db.conn() as conn:
+                    db.apply_gold_rows([row for _, row in keyed_rows], conn=conn, refresh_projection=not rebuild_projection)
+                    if advance:
+                        db.set_backfill_watermark(WATERMARK_SOURCE, batch[-1][1], batch[-1][0], conn=conn)
+                upserted += len(keyed_rows)
             except Exception:
-                failures += 1
-                with conn.cursor() as cur:
-                    cur.execute(f"ROLLBACK TO SAVEPOINT {savepoint}")
-                    cur.execute(f"RELEASE SAVEPOINT {savepoint}")
+                logger.exception("gold backfill batch failed start=%d size=%d; retrying per object", start, len(batch))
+                try:
+                    with db.conn() as conn:
+                        bad_keys = _apply_rows_individually(
+                            db, keyed_rows, conn=conn, refresh_projection=not rebuild_projection
+                        )
+                        # Rows rejected on their own are bad data, not outages: retrying them
+                        # next run fails the same way, so the watermark moves past them.
+                        if advance:
+                            db.set_backfill_watermark(WATERMARK_SOURCE, batch[-1][1], batch[-1][0], conn=conn)
+                    failures += len(bad_keys)
+                    upserted += len(keyed_rows) - len(bad_keys)
+                except Exception:
+                    logger.exception("gold backfill batch retry failed start=%d size=%d", start, len(batch))
+                    failures += len(keyed_rows)
+                    fetch_failed = True
+            watermark_blocked = watermark_blocked or fetch_failed
+
+    if rebuild_projection and upserted:
+        with db.conn() as conn:
+            with conn.cursor() as cur:
+                restaurant_projection.rebuild(cur)
 
     return {
         "ok": failures == 0,
-        "gold_keys": len(gold_keys),
+        "gold_keys": listed,
+        "processed_keys": len(objects),
+        "incremental": watermark is not None,
         "upserted": upserted,
         "skipped": skipped,
         "failures": failures,
         "database_url_set": bool(os.getenv("DATABASE_URL")),
     }
+
+
+def backfill_serving_from_bundle(
+    *,
+    db: ApiDatabase,
+    minio: MinioDataLakeClient | None = None,
+) -> dict[str, Any] | None:
+    """Load the consolidated gold bundle (manifest + one object) into the serving tables.
+
+    Returns None when no bundle exists. On success the backfill watermark is set to the
+    bundle's source LastModified, so a following incremental backfill_serving_from_gold
+    only fetches objects written after the bundle was compacted.
+    """
+    client = minio or MinioDataLakeClient()
+    manifest = gold_bundle.read_manifest(client)
+    if manifest is None:
+        return None
+
+    gold_bucket = client.gold_bucket
+    batch_size = _env_int("BACKFILL_BATCH_SIZE", 500)
+    upserted = 0
+    skipped = 0
+    with db.conn() as conn:
+        rows: list[dict[str, Any]] = []
+        for record in gold_bundle.iter_bundle(client, manifest):
+            row = gold_row(record, gold_path=f"s3://{gold_bucket}/{record.get('_key') or ''}")
+            if row is None:
+                skipped += 1
+                continue
+            rows.append(row)
+            if len(rows) >= batch_size:
+                db.apply_gold_rows(rows, conn=conn, refresh_projection=False)
+                upserted += len(rows)
+                rows = []
+        db.apply_gold_rows(rows, conn=conn, refresh_projection=False)
+        upserted += len(rows)
+        with conn.cursor() as cur:
+            restaurant_projection.rebuild(cur)
+        if manifest.get("source_max_last_modified"):
+            db.set_backfill_watermark(
+                WATERMARK_SOURCE,
+                manifest["source_max_last_modified"],
+                manifest["bundle_key"],
+                advance_only=False,
+                conn=conn,
+            )
+
+    return {
+        "ok": True,
+        "bundle_key": manifest["bundle_key"],
+        "bundle_generated_at": manifest.get("generated_at"),
+        "upserted": upserted,
+        "skipped": skipped,
+    }
@@ -0,0 +1,234 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Any, Callable
+
+from redis import Redis
+
+from libs.common.events import (
+    CATALOG_GENERATION_KEY,
+    EPOCH_GENERATION_KEY,
+    publish_catalog_reset,
+    publish_store_updated,
+    store_generation_key,
+)
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = (os.getenv(name, str(default)) or "").strip()
+    try:
+        value = int(raw)
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    raw = (os.getenv(name, "true" if default else "false") or "").strip().lower()
+    if raw in {"1", "true", "yes", "y", "on"}:
+        return True
+    if raw in {"0", "false", "no", "n", "off"}:
+        return False
+    return default
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+class ResponseCache:
+    """Redis-backed response cache shared by all API replicas.
+
+    Entries are keyed by route + normalized params + invalidation generations:
+    listing/search keys use the catalog generation, detail keys use the store's own
+    generation, so a completion event for one store only evicts that store's detail
+    plus the catalog-wide views. Entries past `fresh_sec` are served stale (up to
+    `stale_sec` more) while one replica recomputes them in the background.
+    Redis failures fall back to computing directly.
+    """
+
+    _RETRY_AFTER_SEC = 30.0
+
+    def __init__(
+        self,
+        redis_url: str,
+        *,
+        enabled: bool = True,
+        fresh_sec: int = 120,
+        stale_sec: int = 3600,
+        namespace: str = "hidden_spot:cache:resp",
+    ) -> None:
+        self.redis_url = redis_url
+        self.enabled = enabled
+        self.fresh_sec = fresh_sec
+        self.stale_sec = stale_sec
+        self.namespace = namespace
+        self._redis: Redis | None = None
+        self._redis_failed_at = 0.0
+        self._lock = threading.Lock()
+        self._revalidator = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-revalidate")
+        # Observability hooks: (op, seconds, failed) per Redis call and (route, result)
+        # per lookup, where result is hit, stale, miss or bypass.
+        self.on_redis_call: Callable[[str, float, bool], None] | None = None
+        self.on_lookup: Callable[[str, str], None] | None = None
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        return cls(
+            os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+            enabled=_env_bool("RESPONSE_CACHE_ENABLED", True),
+            fresh_sec=_env_int("RESPONSE_CACHE_FRESH_SEC", 120),
+            stale_sec=_env_int("RESPONSE_CACHE_STALE_SEC", 3600),
+        )
+
+    def _client(self) -> Redis | None:
+        if not self.enabled:
+            return None
+        with self._lock:
+            if self._redis is not None:
+                return self._redis
+            if time.monotonic() - self._redis_failed_at < self._RETRY_AFTER_SEC:
+                return None
+            self._redis = Redis.from_url(self.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+            return self._redis
+
+    def _mark_failed(self, exc: Exception) -> None:
+        logger.warning("response cache unavailable error=%s", exc)
+        with self._lock:
+            self._redis = None
+            self._redis_failed_at = time.monotonic()
+
+    def _timed(self, op: str, call: Callable[[], Any]) -> Any:
+        if self.on_redis_call is None:
+            return call()
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = call()
+            failed = False
+            return result
+        finally:
+            try:
+                self.on_redis_call(op, time.perf_counter() - started, failed)
+            except Exception:
+                pass
+
+    def _record_lookup(self, route: str, result: str) -> None:
+        if self.on_lookup is not None:
+            try:
+                self.on_lookup(route, result)
+            except Exception:
+                pass
+
+    def _scope(self, client: Redis, store_id: str | None) -> str:
+        if store_id is None:
+            (generation,) = client.mget([CATALOG_GENERATION_KEY])
+            return f"c{int(generation or 0)}"
+        epoch, generation = client.mget([EPOCH_GENERATION_KEY, store_generation_key(store_id)])
+        return f"e{int(epoch or 0)}:s{int(generation or 0)}"
+
+    def scope(self, store_id: str | None = None) -> str | None:
+        """Current invalidation generation for a key scope, or None when Redis is unavailable."""
+        client = self._client()
+        if client is None:
+            return None
+        try:
+            return self._timed("cache_scope", lambda: self._scope(client, store_id))
+        except Exception as exc:
+            self._mark_failed(exc)
+            return None
+
+    def _key(self, client: Redis, route: str, params: dict[str, Any], store_id: str | None) -> str:
+        scope = self._scope(client, store_id)
+        normalized = json.dumps(params, sort_keys=True, ensure_ascii=False, default=_json_default)
+        digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:20]
+        return f"{self.namespace}:{route}:{scope}:{digest}"
+
+    def _store(self, client: Redis, key: str, value: Any) -> None:
+        entry = {"fresh_until": time.time() + self.fresh_sec, "value": value}
+        client.set(key, json.dumps(entry, ensure_ascii=False, default=_json_default), ex=self.fresh_sec + self.stale_sec)
+
+    def _revalidate(self, key: str, compute: Callable[[], Any], cacheable: Callable[[Any], bool] | None = None) -> None:
+        try:
+            value = compute()
+            client = self._client()
+            if client is not None and value is not None and (cacheable is None or cacheable(value)):
+                self._store(client, key, value)
+        except Exception:
+            logger.exception("response cache revalidate failed key=%s", key)
+
+    def get_or_compute(
+        self,
+        route: str,
+        params: dict[str, Any],
+        compute: Callable[[], Any],
+        *,
+        store_id: str | None = None,
+        cacheable: Callable[[Any], bool] | None = None,
+    ) -> Any:
+        """Cached value for (route, params), computing and storing it on a miss.
+
+        `cacheable(value)` returning False keeps a computed value out of the cache
+        (e.g. results degraded by a timed-out dependency); None values are never stored.
+        """
+        client = self._client()
+        if client is None:
+            self._record_lookup(route, "bypass")
+            return compute()
+        try:
+            key = self._timed("cache_key", lambda: self._key(client, route, params, store_id))
+            raw = self._timed("cache_get", lambda: client.get(key))
+        except Exception as exc:
+            self._mark_failed(exc)
+            self._record_lookup(route, "bypass")
+            return compute()
+
+        if raw:
+            entry = json.loads(raw)
+            if time.time() >= float(entry.get("fresh_until") or 0):
+                self._record_lookup(route, "stale")
+                try:
+                    # Only one replica refreshes a stale entry; everybody else keeps serving it.
+                    if client.set(f"{key}:revalidating", "1", nx=True, ex=30):
+                        self._revalidator.submit(self._revalidate, key, compute, cacheable)
+                except Exception as exc:
+                    self._mark_failed(exc)
+            else:
+                self._record_lookup(route, "hit")
+            return entry.get("value")
+
+        self._record_lookup(route, "miss")
+        value = compute()
+        if value is not None and (cacheable is None or cacheable(value)):
+            try:
+                self._timed("cache_set", lambda: self._store(client, key, value))
+            except Exception as exc:
+                self._mark_failed(exc)
+        return value
+
+    def invalidate_stores(self, store_ids: list[str], *, reason: str) -> None:
+        client = self._client()
+        if client is None:
+            return
+        try:
+            publish_store_updated(client, store_ids=store_ids, reason=reason)
+        except Exception as exc:
+            self._mark_failed(exc)
+
+    def invalidate_all(self, *, reason: str) -> None:
+        client = self._client()
+        if client is None:
+            return
+        try:
+            publish_catalog_reset(client, reason=reason)
+        except Exception as exc:
+            self._mark_failed(exc)
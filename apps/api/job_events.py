@@ -0,0 +1,117 @@
+import asyncio
+import json
+import logging
+from typing import Any
+
+from redis import asyncio as redis_asyncio
+
+from libs.common.events import JOB_EVENTS_CHANNEL_PREFIX, job_state_key
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class JobEventHub:
+    """Fans worker job-progress events out to SSE subscribers in this API process.
+
+    The process holds a single Redis pattern subscription no matter how many clients
+    are watching; each subscriber gets its own bounded asyncio queue. Slow consumers
+    lose their oldest events rather than blocking the listener (every event carries the
+    full state, so skipping intermediate ones is harmless).
+    """
+
+    _QUEUE_SIZE = 32
+
+    def __init__(self, redis_url: str) -> None:
+        self.redis_url = redis_url
+        self._redis: Any | None = None
+        self._listener: asyncio.Task | None = None
+        self._ready = asyncio.Event()
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        # Maintained on the loop; /metrics reads it from another thread, where iterating
+        # _subscribers could race with register/unregister.
+        self._subscriber_total = 0
+
+    def _client(self) -> Any:
+        if self._redis is None:
+            self._redis = redis_asyncio.Redis.from_url(self.redis_url, socket_connect_timeout=1.0)
+        return self._redis
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self._client().pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(f"{JOB_EVENTS_CHANNEL_PREFIX}*")
+                self._ready.set()
+                async for message in pubsub.listen():
+                    if message.get("type") != "pmessage":
+                        continue
+                    channel = message["channel"]
+                    if isinstance(channel, bytes):
+                        channel = channel.decode("utf-8")
+                    queues = self._subscribers.get(channel[len(JOB_EVENTS_CHANNEL_PREFIX) :])
+                    if not queues:
+                        continue
+                    event = json.loads(message["data"])
+                    for queue in list(queues):
+                        if queue.full():
+                            queue.get_nowait()
+                        queue.put_nowait(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self._ready.clear()
+                logger.warning("job event listener disconnected error=%s", exc)
+                await asyncio.sleep(1.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    async def _ensure_listening(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=1.0)
+        except asyncio.TimeoutError:
+            logger.warning("job event listener not ready; subscribers may miss early events")
+
+    async def register(self, run_id: str) -> asyncio.Queue:
+        """Register before reading the last state so no transition falls in between."""
+        await self._ensure_listening()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._QUEUE_SIZE)
+        self._subscribers.setdefault(run_id, set()).add(queue)
+        self._subscriber_total += 1
+        return queue
+
+    def unregister(self, run_id: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(run_id)
+        if queues is None or queue not in queues:
+            return
+        queues.discard(queue)
+        self._subscriber_total -= 1
+        if not queues:
+            self._subscribers.pop(run_id, None)
+
+    async def last_state(self, run_id: str) -> dict[str, Any] | None:
+        try:
+            raw = await self._client().get(job_state_key(run_id))
+        except Exception as exc:
+            logger.warning("job state lookup failed run_id=%s error=%s", run_id, exc)
+            return None
+        return json.loads(raw) if raw else None
+
+    def subscriber_count(self) -> int:
+        return self._subscriber_total
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
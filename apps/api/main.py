@@ -1,21 +1,37 @@
+import asyncio
+import base64
+import hashlib
 import json
 import logging
 import os
 import time
-from threading import Lock
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from threading import Lock, Thread
+from typing import Any, Iterable
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, model_validator
 from redis import Redis
 from rq import Queue, Retry
 from rq.job import Job
 
-from apps.api.backfill import backfill_serving_from_gold
+from apps.api.backfill import backfill_serving_from_bundle, backfill_serving_from_gold
+from apps.api.cache import ResponseCache
 from apps.api.db import ApiDatabase
-from apps.api.search import expand_query
+from apps.api import metrics
+from apps.api.job_events import JobEventHub
+from apps.api.query_vectors import QueryVectorCache
+from apps.api.responses import CompressionMiddleware, FastJSONResponse, etag_matches
+from apps.api.search import expand_query_weighted, reciprocal_rank_fusion, rerank
 from apps.api.store_id import derive_store_id
+from libs.common import geo, sql_stats
+from libs.common.events import JOB_RETRYING_STATE, JOB_TERMINAL_STATES
+from libs.common.pg_pool import PoolTimeoutError
+from libs.common.single_flight import claim_inflight, claim_inflight_many, release_inflight
 from libs.common.run_context import new_run_id, utc_now, isoformat_z
 
 
@@ -72,9 +88,180 @@ def _normalize_evidence_paths(raw: object) -> list[str]:
     return []
 
 
+_RESTAURANT_FIELDS = frozenset(
+    {
+        "id",
+        "naver_place_id",
+        "name",
+        "address",
+        "latitude",
+        "longitude",
+        "ai_score",
+        "ad_review_ratio",
+        "category",
+        "categories",
+        "analysis_run_id",
+        "updated_at",
+        "transport_info",
+        "summary_json",
+        "must_eat_menus",
+        "search_tags",
+        "original_url",
+        "created_at",
+        "raw_reviews",
+    }
+)
+_MAX_MULTI_GET_IDS = 200
+
+
+def _split_csv(raw: str | None) -> list[str]:
+    if not raw:
+        return []
+    return list(dict.fromkeys(token.strip() for token in raw.split(",") if token.strip()))
+
+
+def _parse_fields(raw: str | None, default: Iterable[str] = ()) -> set[str] | None:
+    """Parse `fields=`: comma-separated paths to keep, `-path` to drop.
+
+    Paths may be dotted to reach into nested objects (`summary_json.taste_profile`,
+    `-summary_json.taste_profile.metrics`); only the top-level key is validated. With
+    no kept paths the whole item (or `default`, if given) is kept minus the dropped ones.
+    """
+    fields = _split_csv(raw)
+    unknown = sorted({field.lstrip("-").split(".", 1)[0] for field in fields} - _RESTAURANT_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"unknown fields: {','.join(unknown)}")
+    include = {field for field in fields if not field.startswith("-")} or set(default)
+    # `id` is always kept so clients can join partial rows back to detail views.
+    exclude = {field for field in fields if field.startswith("-") and field != "-id"}
+    if include:
+        include.add("id")
+    return (include | exclude) or None
+
+
+def _field_tree(paths: Iterable[str]) -> dict:
+    """{"a": None, "b": {"c": None}} for ["a", "b.c"]; None marks a whole subtree."""
+    tree: dict = {}
+    for path in sorted(paths, key=lambda path: path.count(".")):
+        node = tree
+        *parents, leaf = path.split(".")
+        for part in parents:
+            node = node.setdefault(part, {})
+            if node is None:
+                break
+        else:
+            node[leaf] = None
+    return tree
+
+
+def _select_tree(value: Any, tree: dict) -> Any:
+    if not isinstance(value, dict):
+        return value
+    return {
+        key: child if tree[key] is None else _select_tree(child, tree[key])
+        for key, child in value.items()
+        if key in tree
+    }
+
+
+def _without_path(value: dict, parts: list[str]) -> dict:
+    # Copies along the path only; the item's nested objects may be shared.
+    head = parts[0]
+    if head not in value:
+        return value
+    result = dict(value)
+    if len(parts) == 1:
+        del result[head]
+    elif isinstance(result[head], dict):
+        result[head] = _without_path(result[head], parts[1:])
+    return result
+
+
+def _project_fields(item: dict, fields: set[str] | None) -> dict:
+    if fields is None:
+        return item
+    include = [field for field in fields if not field.startswith("-")]
+    result = _select_tree(item, _field_tree(include)) if include else item
+    for field in fields:
+        if field.startswith("-"):
+            result = _without_path(result, field[1:].split("."))
+    return result
+
+
+def _encode_cursor(after: tuple[datetime, str]) -> str:
+    updated_at, store_id = after
+    raw = json.dumps([updated_at.isoformat(), store_id], ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        updated_at, store_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        return datetime.fromisoformat(updated_at), str(store_id)
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail="invalid cursor") from exc
+
+
+_catalog_stamp: dict[str, Any] = {"version": None, "checked_at": float("-inf")}
+_catalog_stamp_lock = Lock()
+
+
+def _catalog_version() -> int | None:
+    """DB catalog stamp, re-read at most every CATALOG_VERSION_TTL_SEC per process.
+
+    One request refreshes an expired stamp while the rest keep using the previous one, so
+    cache hits and 304s do not check out a pool connection; a failed read keeps the last
+    known stamp instead of failing the request.
+    """
+    now = time.monotonic()
+    if now - _catalog_stamp["checked_at"] < _env_int("CATALOG_VERSION_TTL_SEC", 2):
+        return _catalog_stamp["version"]
+    if not _catalog_stamp_lock.acquire(blocking=False):
+        return _catalog_stamp["version"]
+    try:
+        _catalog_stamp["version"] = _db.catalog_version()
+    except Exception as exc:
+        logger.warning("catalog version lookup failed error=%s", exc)
+    finally:
+        _catalog_stamp["checked_at"] = now
+        _catalog_stamp_lock.release()
+    return _catalog_stamp["version"]
+
+
+def _catalog_etag(request: Request, *, store_id: str | None = None) -> str:
+    """Weak ETag for a catalog-derived response.
+
+    Combines the DB catalog stamp (bumped in every projection write, read through a
+    short in-process TTL) with the Redis cache generation, so a cached body from before
+    an invalidation never gets a new tag.
+    """
+    scope = _response_cache.scope(store_id)
+    raw = f"{_catalog_version()}|{scope}|{request.url.path}?{request.url.query}"
+    return f'W/"{hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]}"'
+
+
+_CONDITIONAL_HEADERS = {"Cache-Control": "no-cache"}
+
+
+def _not_modified(request: Request, etag: str) -> Response | None:
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, **_CONDITIONAL_HEADERS})
+    return None
+
+
+def _tagged_json(content: Any, etag: str | None, headers: dict[str, str] | None = None) -> FastJSONResponse:
+    extra = dict(headers or {})
+    if etag:
+        extra.update({"ETag": etag, **_CONDITIONAL_HEADERS})
+    return FastJSONResponse(content=content, headers=extra)
+
+
 class JobCreateRequest(BaseModel):
     url: str | None = None
     source_url: str | None = None
+    # Start a new run even if one is already in flight for the same store.
+    force: bool = False
 
     @model_validator(mode="after")
     def _require_url(self):
@@ -87,26 +274,59 @@ class JobCreateRequest(BaseModel):
         return (self.url or self.source_url or "").strip()
 
 
+class JobBatchCreateRequest(BaseModel):
+    urls: list[str]
+    force: bool = False
+
+
 class JobCreateResponse(BaseModel):
     job_id: str
     run_id: str
     store_id: str
     status: str
+    # True when the submission attached to a run already in flight for this store.
+    deduplicated: bool = False
+    # True when a recent completed run was returned instead of starting a new one.
+    reused: bool = False
 
 
 class AnalyzeCompatRequest(BaseModel):
     url: str
 
 
-app = FastAPI(title="Hidden Spot Jobs API")
+app = FastAPI(title="Hidden Spot Jobs API", default_response_class=FastJSONResponse)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=_parse_cors_allow_origins(),
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
+app.add_middleware(CompressionMiddleware, minimum_size=_env_int("RESPONSE_COMPRESS_MIN_BYTES", 1024))
+# Outermost, so latency and bytes include compression.
+app.add_middleware(metrics.MetricsMiddleware)
 _db = ApiDatabase()
+_db.pool.on_checkout = metrics.DB_POOL_CHECKOUT.observe
+metrics.register_pool_gauges("api", _db.pool_stats)
+_response_cache = ResponseCache.from_env()
+_response_cache.on_redis_call = lambda op, seconds, failed: metrics.observe_redis(op, seconds, failed=failed)
+_response_cache.on_lookup = lambda route, result: metrics.CACHE_LOOKUPS.inc(route, result)
+_query_vectors = QueryVectorCache.from_env()
+_query_vectors.on_redis_call = _response_cache.on_redis_call
+_job_events = JobEventHub(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+metrics.REGISTRY.register(
+    metrics.GaugeCallback(
+        "hidden_spot_job_event_subscribers",
+        "Job event streams and waiters currently attached to this process.",
+        (),
+        lambda: {(): float(_job_events.subscriber_count())},
+    )
+)
+_search_executor = ThreadPoolExecutor(
+    max_workers=_env_int("SEARCH_RETRIEVER_WORKERS", 8),
+    thread_name_prefix="search-retriever",
+)
 _backfill_lock = Lock()
 _last_backfill_attempt_at = 0.0
 logger = logging.getLogger("uvicorn.error")
@@ -121,11 +341,19 @@ def _env_bool(name: str, default: bool) -> bool:
     return default
 
 
+_queue_instance: Queue | None = None
+_queue_lock = Lock()
+
+
 def _queue() -> Queue:
-    redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-    queue_name = os.getenv("RQ_QUEUE", "hidden_spot")
-    conn = Redis.from_url(redis_url)
-    return Queue(name=queue_name, connection=conn)
+    # One Redis client (and its connection pool) per process instead of one per request.
+    global _queue_instance
+    with _queue_lock:
+        if _queue_instance is None:
+            redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+            queue_name = os.getenv("RQ_QUEUE", "hidden_spot")
+            _queue_instance = Queue(name=queue_name, connection=Redis.from_url(redis_url))
+        return _queue_instance
 
 
 def _auto_backfill_if_empty() -> None:
@@ -144,39 +372,123 @@ def _auto_backfill_if_empty() -> None:
         )
         return
 
-    rows = _db.list_restaurants()
-    logger.info("startup serving check rows=%d", len(rows))
-    if rows:
+    has_rows = _db.has_serving_rows()
+    logger.info("startup serving check has_rows=%s", has_rows)
+    if has_rows:
         return
 
     with _backfill_lock:
-        rows = _db.list_restaurants()
-        logger.info("startup serving recheck rows=%d", len(rows))
-        if rows:
+        has_rows = _db.has_serving_rows()
+        logger.info("startup serving recheck has_rows=%s", has_rows)
+        if has_rows:
             return
         _last_backfill_attempt_at = now
         max_items = _env_int("BACKFILL_MAX_ITEMS", 0)
         logger.info("startup backfill start max_items=%d", max_items)
-        result = backfill_serving_from_gold(db=_db, max_items=max_items)
+        result = None
+        if _env_bool("BACKFILL_PREFER_BUNDLE", True) and max_items == 0:
+            try:
+                bundle_result = backfill_serving_from_bundle(db=_db)
+            except Exception:
+                logger.exception("startup bundle backfill failed; falling back to per-object scan")
+                bundle_result = None
+            if bundle_result is not None:
+                logger.info("startup bundle backfill result=%s", json.dumps(bundle_result, ensure_ascii=False, sort_keys=True))
+                # Pick up gold objects written after the bundle was compacted.
+                result = backfill_serving_from_gold(db=_db, incremental=True)
+        if result is None:
+            # Serving tables are empty, so the watermark (if any) no longer describes them.
+            result = backfill_serving_from_gold(db=_db, max_items=max_items, incremental=False)
+        _response_cache.invalidate_all(reason="startup_backfill")
         logger.info("startup backfill result=%s", json.dumps(result, ensure_ascii=False, sort_keys=True))
-        rows_after = _db.list_restaurants()
-        logger.info("startup serving post_backfill rows=%d", len(rows_after))
+        logger.info("startup serving post_backfill has_rows=%s", _db.has_serving_rows())
+
+
+@app.exception_handler(PoolTimeoutError)
+def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    logger.warning("db pool saturated path=%s stats=%s", request.url.path, json.dumps(_db.pool_stats(), sort_keys=True))
+    return JSONResponse(
+        status_code=503,
+        content={"error": "database busy", "message": "database connection pool exhausted"},
+        headers={"Retry-After": "1"},
+    )
+
+
+_startup_state: dict[str, Any] = {"ready": False, "schema_applied": None, "warmup": "pending"}
+
+
+def _startup_warmup() -> None:
+    """Projection, display-name and backfill checks; none of them gate readiness."""
+    _startup_state["warmup"] = "running"
+    started = time.perf_counter()
+    try:
+        rebuilt = _db.ensure_restaurant_projection()
+        if rebuilt:
+            logger.info("api startup restaurant projection rebuilt rows=%d", rebuilt)
+        legacy = _db.import_legacy_restaurants()
+        if legacy.get("status") == "imported":
+            logger.info("api startup legacy restaurants imported result=%s", json.dumps(legacy, sort_keys=True))
+            if legacy.get("refreshed_places"):
+                _response_cache.invalidate_all(reason="legacy_import")
+        named = _db.reparse_store_names(only_missing=True)
+        if named.get("updated"):
+            logger.info("api startup display names resolved updated=%d", named["updated"])
+        try:
+            _auto_backfill_if_empty()
+        except Exception:
+            # Startup should stay resilient even if R2 or backfill is temporarily unavailable.
+            logger.exception("api startup backfill failed")
+        _startup_state["warmup"] = "complete"
+    except Exception:
+        logger.exception("api startup warmup failed")
+        _startup_state["warmup"] = "failed"
+    logger.info("api startup warmup finished ms=%d", int((time.perf_counter() - started) * 1000))
 
 
 @app.on_event("startup")
 def startup() -> None:
     logger.info("api startup begin")
-    _db.ensure_tables()
-    logger.info("api startup ensure_tables complete")
+    started = time.perf_counter()
+    _db.pool.warm()
+    applied = _db.ensure_tables()
+    _startup_state["schema_applied"] = applied
+    logger.info("api startup ensure_tables complete applied=%s", applied)
+    if _env_bool("STARTUP_WARMUP_IN_BACKGROUND", True):
+        Thread(target=_startup_warmup, name="api-startup-warmup", daemon=True).start()
+    else:
+        _startup_warmup()
+    _startup_state["ready"] = True
+    logger.info("api startup complete ms=%d", int((time.perf_counter() - started) * 1000))
+
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    await _job_events.close()
+    _db.pool.close()
+
+
+def _inflight_ttl_sec() -> int:
+    # Long enough to cover every retry of a job; only matters if a worker dies mid-run.
+    return _env_int("JOB_INFLIGHT_TTL_SEC", _env_int("RQ_JOB_TIMEOUT_SEC", 900) * 4 + 100)
+
+
+def _release_claims(claims: list[tuple[str, str]]) -> None:
+    for store_id, run_id in claims:
+        try:
+            release_inflight(_queue().connection, store_id, run_id)
+        except Exception:
+            logger.exception("single-flight release failed store_id=%s run_id=%s", store_id, run_id)
+
+
+def _freshness_hours() -> int:
+    raw = (os.getenv("JOB_FRESHNESS_HOURS", "24") or "").strip()
     try:
-        _auto_backfill_if_empty()
-    except Exception:
-        # Startup should stay resilient even if R2 or backfill is temporarily unavailable.
-        logger.exception("api startup backfill failed")
-    logger.info("api startup complete")
+        return max(int(raw), 0)
+    except ValueError:
+        return 24
 
 
-def _enqueue_job(url: str) -> JobCreateResponse:
+def _enqueue_job(url: str, *, force: bool = False, reuse_recent: bool = True) -> JobCreateResponse:
     if not url:
         raise HTTPException(status_code=400, detail="url is required")
 
@@ -202,20 +514,39 @@ def _enqueue_job(url: str) -> JobCreateResponse:
         )
         return JobCreateResponse(job_id=run_id, run_id=run_id, store_id=store_id, status="completed")
 
+    if reuse_recent and not force:
+        recent = _db.recent_completed_runs([store_id], max_age_hours=_freshness_hours()).get(store_id)
+        if recent:
+            return JobCreateResponse(job_id=recent, run_id=recent, store_id=store_id, status="completed", reused=True)
+
     run_id = new_run_id()
+    with metrics.redis_timer("jobs_claim"):
+        in_flight = claim_inflight(_queue().connection, store_id, run_id, ttl_sec=_inflight_ttl_sec(), force=force)
+    if in_flight:
+        return JobCreateResponse(job_id=in_flight, run_id=in_flight, store_id=store_id, status="queued", deduplicated=True)
+
+    try:
+        _db.upsert_store(store_id=store_id, url=url)
+        _db.create_snapshot(
+            store_id=store_id,
+            collected_at_iso=collected_at,
+            run_id=run_id,
+            url=url,
+            status="queued",
+        )
+        with metrics.redis_timer("jobs_enqueue"):
+            (rq_job,) = _queue().enqueue_many(
+                [_job_data(run_id=run_id, store_id=store_id, url=url, collected_at=collected_at)]
+            )
+    except Exception:
+        _release_claims([(store_id, run_id)])
+        raise
+
+    return JobCreateResponse(job_id=rq_job.id, run_id=run_id, store_id=store_id, status="queued")
 
-    _db.upsert_store(store_id=store_id, url=url)
-    _db.create_snapshot(
-        store_id=store_id,
-        collected_at_iso=collected_at,
-        run_id=run_id,
-        url=url,
-        status="queued",
-    )
 
-    q = _queue()
-    job_timeout_sec = _env_int("RQ_JOB_TIMEOUT_SEC", 900)
-    rq_job = q.enqueue(
+def _job_data(*, run_id: str, store_id: str, url: str, collected_at: str):
+    return Queue.prepare_data(
         "apps.worker.tasks.process_job",
         kwargs={
             "run_id": run_id,
@@ -225,34 +556,157 @@ def _enqueue_job(url: str) -> JobCreateResponse:
         },
         job_id=run_id,
         retry=Retry(max=3, interval=[10, 30, 60]),
-        job_timeout=job_timeout_sec,
+        timeout=_env_int("RQ_JOB_TIMEOUT_SEC", 900),
         result_ttl=86400,
         failure_ttl=604800,
     )
 
-    return JobCreateResponse(job_id=rq_job.id, run_id=run_id, store_id=store_id, status="queued")
 
+def _enqueue_jobs_batch(urls: list[str], *, force: bool = False) -> list[dict]:
+    """Enqueue many URLs with one DB transaction and one Redis pipeline.
 
-def _wait_restaurant(store_id: str, timeout_sec: int = 20):
-    deadline = time.time() + timeout_sec
-    while time.time() < deadline:
-        restaurant = _db.get_restaurant(store_id)
-        if restaurant:
-            return restaurant
-        time.sleep(1)
-    return _db.get_restaurant(store_id)
+    Results are returned per input URL, in order. Contract (example.com) URLs go through
+    the single-job path; blank or unparsable URLs get an `error` entry.
+    """
+    results: list[dict | None] = [None] * len(urls)
+    pending: list[tuple[int, str, str, str, str]] = []
+    collected_at = isoformat_z(utc_now())
+    for index, raw_url in enumerate(urls):
+        url = (raw_url or "").strip()
+        if not url:
+            results[index] = {"url": raw_url, "error": "url is required"}
+            continue
+        if url.startswith("https://example.com/"):
+            results[index] = {"url": url, **_enqueue_job(url, force=force).model_dump()}
+            continue
+        try:
+            store_id = derive_store_id(url)
+        except Exception as exc:
+            results[index] = {"url": url, "error": f"invalid url: {exc}"}
+            continue
+        pending.append((index, store_id, url, new_run_id(), collected_at))
+
+    if pending and not force:
+        recent = _db.recent_completed_runs([item[1] for item in pending], max_age_hours=_freshness_hours())
+        still_pending = []
+        for item in pending:
+            index, store_id, url, _, _ = item
+            if store_id in recent:
+                results[index] = {
+                    "url": url,
+                    "job_id": recent[store_id],
+                    "run_id": recent[store_id],
+                    "store_id": store_id,
+                    "status": "completed",
+                    "reused": True,
+                }
+            else:
+                still_pending.append(item)
+        pending = still_pending
+
+    if pending:
+        with metrics.redis_timer("jobs_claim_batch"):
+            holders = claim_inflight_many(
+                _queue().connection,
+                [(store_id, run_id) for _, store_id, _, run_id, _ in pending],
+                ttl_sec=_inflight_ttl_sec(),
+                force=force,
+            )
+        claimed = []
+        for item, holder in zip(pending, holders):
+            index, store_id, url, run_id, _ = item
+            if holder:
+                results[index] = {
+                    "url": url,
+                    "job_id": holder,
+                    "run_id": holder,
+                    "store_id": store_id,
+                    "status": "queued",
+                    "deduplicated": True,
+                }
+            else:
+                claimed.append(item)
+        try:
+            _db.create_jobs([(store_id, url, run_id, at) for _, store_id, url, run_id, at in claimed])
+            with metrics.redis_timer("jobs_enqueue_batch"):
+                _queue().enqueue_many(
+                    [
+                        _job_data(run_id=run_id, store_id=store_id, url=url, collected_at=at)
+                        for _, store_id, url, run_id, at in claimed
+                    ]
+                )
+        except Exception:
+            _release_claims([(store_id, run_id) for _, store_id, _, run_id, _ in claimed])
+            raise
+        for index, store_id, url, run_id, _ in claimed:
+            results[index] = {
+                "url": url,
+                "job_id": run_id,
+                "run_id": run_id,
+                "store_id": store_id,
+                "status": "queued",
+                "deduplicated": False,
+            }
+    return [result for result in results if result is not None]
+
+
+async def _wait_restaurant(store_id: str, run_id: str, timeout_sec: int = 20):
+    """Return the store's projection, waiting up to timeout_sec for the job to finish.
+
+    Instead of re-querying every second, this checks once, then awaits the worker's
+    completed/failed event for `run_id` and reads the projection once more. Failed
+    attempts that RQ will retry arrive as "retrying" and do not end the wait.
+    """
+    restaurant = await run_in_threadpool(_db.get_restaurant, store_id)
+    if restaurant:
+        return restaurant
+
+    queue = await _job_events.register(run_id)
+    try:
+        deadline = time.monotonic() + timeout_sec
+        state = await _job_events.last_state(run_id)
+        while not state or state.get("state") not in JOB_TERMINAL_STATES:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                state = await asyncio.wait_for(queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+    finally:
+        _job_events.unregister(run_id, queue)
+    return await run_in_threadpool(_db.get_restaurant, store_id)
 
 
 @app.post("/jobs", response_model=JobCreateResponse, status_code=202)
 def create_job(payload: JobCreateRequest):
-    return _enqueue_job(payload.resolved_url())
-
-
-@app.get("/jobs/{job_id}")
-def get_job(job_id: str):
+    return _enqueue_job(payload.resolved_url(), force=payload.force)
+
+
+@app.post("/jobs/batch", status_code=202)
+def create_jobs_batch(payload: JobBatchCreateRequest):
+    max_urls = _env_int("JOBS_BATCH_MAX_URLS", 5000)
+    if len(payload.urls) > max_urls:
+        raise HTTPException(status_code=400, detail=f"too many urls (max {max_urls})")
+    results = _enqueue_jobs_batch(payload.urls, force=payload.force)
+    counts: dict[str, int] = {}
+    for result in results:
+        if "error" in result:
+            key = "error"
+        elif result.get("deduplicated"):
+            key = "deduplicated"
+        elif result.get("reused"):
+            key = "reused"
+        else:
+            key = result["status"]
+        counts[key] = counts.get(key, 0) + 1
+    return {"count": len(results), "counts": counts, "results": results}
+
+
+def _job_snapshot(job_id: str) -> dict | None:
     snapshot = _db.get_snapshot(run_id=job_id)
     if not snapshot:
-        return JSONResponse(status_code=404, content={"error": "job not found", "message": "job not found"})
+        return None
 
     queue_status = None
     try:
@@ -266,6 +720,9 @@ def get_job(job_id: str):
         state = "completed"
     elif queue_status in {"queued", "started"}:
         state = queue_status
+    elif queue_status == "scheduled":
+        # RQ retry backoff: an earlier attempt failed but the run is not over yet.
+        state = JOB_RETRYING_STATE
     elif queue_status in {"failed", "stopped", "canceled"}:
         state = "failed"
 
@@ -274,17 +731,137 @@ def get_job(job_id: str):
     snapshot["error_type"] = snapshot.get("error_type")
     snapshot["error_stage"] = snapshot.get("error_stage")
     snapshot["evidence_paths"] = _normalize_evidence_paths(snapshot.get("evidence_paths_json"))
+    return _with_completion_fields(snapshot)
+
 
-    if state == "completed":
+def _with_completion_fields(snapshot: dict) -> dict:
+    if snapshot.get("state") == "completed":
         snapshot["minio_paths"] = [p for p in [snapshot.get("bronze_path"), snapshot.get("silver_path"), snapshot.get("gold_path")] if p]
         snapshot["analysis_record_ids"] = [snapshot.get("run_id")]
         snapshot["analysis_id"] = snapshot.get("run_id")
+    return snapshot
+
 
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    snapshot = _job_snapshot(job_id)
+    if not snapshot:
+        return JSONResponse(status_code=404, content={"error": "job not found", "message": "job not found"})
     return snapshot
 
 
+def _sse(event: dict, *, name: str = "progress") -> str:
+    return f"event: {name}\ndata: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    """Server-Sent Events stream of a job's progress.
+
+    The first event is the current state (from the worker's last published state, or
+    one snapshot read for jobs that have not published yet); after that events come
+    straight from Redis pub/sub. The stream ends after `completed`/`failed`.
+    """
+    queue = await _job_events.register(job_id)
+    try:
+        state = await _job_events.last_state(job_id)
+        if state is None:
+            state = await run_in_threadpool(_job_snapshot, job_id)
+    except Exception:
+        _job_events.unregister(job_id, queue)
+        raise
+    if state is None:
+        _job_events.unregister(job_id, queue)
+        return JSONResponse(status_code=404, content={"error": "job not found", "message": "job not found"})
+
+    keepalive_sec = _env_int("JOB_EVENTS_KEEPALIVE_SEC", 15)
+    max_stream_sec = _env_int("JOB_EVENTS_MAX_STREAM_SEC", 600)
+
+    async def stream():
+        try:
+            current = _with_completion_fields(state)
+            yield _sse(current)
+            if current.get("state") in JOB_TERMINAL_STATES:
+                return
+            deadline = time.monotonic() + max_stream_sec
+            while time.monotonic() < deadline:
+                if await request.is_disconnected():
+                    return
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=keepalive_sec)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                event = _with_completion_fields(event)
+                yield _sse(event)
+                if event.get("state") in JOB_TERMINAL_STATES:
+                    return
+            yield _sse({"run_id": job_id, "reason": "stream_timeout"}, name="timeout")
+        finally:
+            _job_events.unregister(job_id, queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _run_retrievers(retrievers: dict, timeout_sec: float) -> tuple[dict[str, list], dict[str, Any]]:
+    """Run retrievers concurrently and keep whatever finished by the deadline.
+
+    A slow retriever is dropped (its result is discarded when it finishes) unless
+    nothing finished in time, in which case the first one to finish is used.
+    """
+    started = time.perf_counter()
+    timings: dict[str, int] = {}
+
+    def timed(name: str, fn):
+        def run():
+            begin = time.perf_counter()
+            try:
+                return fn()
+            finally:
+                timings[f"{name}_ms"] = int((time.perf_counter() - begin) * 1000)
+
+        return run
+
+    futures = {_search_executor.submit(timed(name, fn)): name for name, fn in retrievers.items()}
+    done, pending = wait(futures, timeout=timeout_sec)
+    if not done:
+        done, pending = wait(futures, return_when=FIRST_COMPLETED)
+
+    results: dict[str, list] = {}
+    failed: list[str] = []
+    for future in done:
+        name = futures[future]
+        try:
+            results[name] = future.result()
+        except HTTPException:
+            raise
+        except Exception:
+            logger.exception("search retriever failed retriever=%s", name)
+            failed.append(name)
+    for future in pending:
+        logger.warning("search retriever timed out retriever=%s timeout_ms=%d", futures[future], int(timeout_sec * 1000))
+    debug = {
+        **timings,
+        "retrieve_ms": int((time.perf_counter() - started) * 1000),
+        "timed_out": sorted(futures[future] for future in pending),
+        "failed": sorted(failed),
+        "candidates": {name: len(rows) for name, rows in results.items()},
+    }
+    return results, debug
+
+
 @app.get("/search/smart")
-def smart_search(q: str | None = None, limit: int = 20):
+def smart_search(
+    request: Request,
+    q: str | None = None,
+    limit: int = 20,
+    mode: str = Query("text", pattern="^(text|vector|hybrid)$"),
+    debug: bool = False,
+):
     if not q or not q.strip():
         return JSONResponse(status_code=400, content={"error": "q is required", "message": "q is required"})
 
@@ -292,9 +869,83 @@ def smart_search(q: str | None = None, limit: int = 20):
     if q.strip().lower() == "test":
         raise HTTPException(status_code=503, detail="database dependency unavailable")
 
-    terms = expand_query(q)
-    rows = _db.smart_search(terms=terms, limit=limit)
-    return {"query": q, "expanded_terms": terms, "count": len(rows), "items": rows}
+    weighted_terms = expand_query_weighted(q)
+    terms = [term for term, _ in weighted_terms]
+    if mode == "vector" and not _query_vectors.enabled:
+        raise HTTPException(status_code=503, detail="vector search unavailable (embeddings disabled)")
+
+    # Each retriever contributes a bounded candidate set to the fusion.
+    candidate_limit = min(max(limit * 2, 20), _env_int("SEARCH_CANDIDATE_LIMIT", 100))
+    timings: dict[str, Any] = {}
+    # Set when a retriever timed out or failed: such rankings are served but never
+    # cached or tagged, so one slow call does not pin them in Redis or client caches.
+    degraded = {"value": False}
+
+    def lexical() -> list:
+        return _db.smart_search(terms=weighted_terms, limit=candidate_limit)
+
+    def semantic(vector: list[float]) -> list:
+        return _db.vector_search(
+            vector,
+            limit=candidate_limit,
+            ef_search=_env_int("SEARCH_VECTOR_EF_SEARCH", 40),
+        )
+
+    def compute() -> list:
+        retrievers = {}
+        if mode in {"text", "hybrid"}:
+            retrievers["lexical"] = lexical
+        if mode in {"vector", "hybrid"} and _query_vectors.enabled:
+            # Embedding an uncached query can take longer than the retriever deadline;
+            # do it before the timed window so hybrid does not quietly go lexical-only.
+            embed_start = time.perf_counter()
+            try:
+                vector = _query_vectors.get(q)
+            except Exception:
+                logger.exception("search query embedding failed")
+                vector = None
+            timings["embed_ms"] = int((time.perf_counter() - embed_start) * 1000)
+            if vector is not None:
+                retrievers["vector"] = lambda: semantic(vector)
+            elif mode == "vector":
+                raise HTTPException(status_code=503, detail="query embedding failed")
+            else:
+                logger.warning("search query embedding unavailable; hybrid search is lexical-only")
+                degraded["value"] = True
+        results, retrieve_debug = _run_retrievers(
+            retrievers,
+            _env_int("SEARCH_RETRIEVER_TIMEOUT_MS", 300) / 1000.0,
+        )
+        fuse_start = time.perf_counter()
+        rows = rerank(reciprocal_rank_fusion(results))[:limit]
+        timings.update(retrieve_debug)
+        if retrieve_debug["timed_out"] or retrieve_debug["failed"]:
+            degraded["value"] = True
+        timings["fuse_ms"] = int((time.perf_counter() - fuse_start) * 1000)
+        return rows
+
+    started = time.perf_counter()
+    etag = None
+    if debug:
+        # Debug calls bypass the cache so timings reflect an actual retrieval.
+        rows = compute()
+    else:
+        etag = _catalog_etag(request)
+        not_modified = _not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        rows = _response_cache.get_or_compute(
+            "search_smart",
+            {"terms": weighted_terms, "limit": limit, "mode": mode},
+            compute,
+            cacheable=lambda _: not degraded["value"],
+        )
+        if degraded["value"]:
+            etag = None
+    body = {"query": q, "expanded_terms": terms, "count": len(rows), "items": rows}
+    if debug:
+        body["debug"] = {"mode": mode, **timings, "total_ms": int((time.perf_counter() - started) * 1000)}
+    return _tagged_json(body, etag)
 
 
 @app.get("/health")
@@ -302,41 +953,303 @@ def health_check():
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/ready")
+def readiness_check():
+    """Readiness for load balancers: schema checked and the pool reachable.
+
+    `/health` stays a pure liveness probe; warmup (projection, backfill) runs in the
+    background and is reported here without gating readiness.
+    """
+    body = {
+        "status": "ready" if _startup_state["ready"] else "starting",
+        "warmup": _startup_state["warmup"],
+        "schema_applied": _startup_state["schema_applied"],
+    }
+    if not _startup_state["ready"]:
+        return JSONResponse(status_code=503, content=body)
+    try:
+        with _db.conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+    except Exception as exc:
+        return JSONResponse(status_code=503, content={**body, "status": "unavailable", "error": str(exc)})
+    return body
+
+
 # Frontend compatibility endpoints (`frontend/src/app/page.tsx` uses /api/v1/restaurants*).
 @app.get("/api/v1/restaurants")
-def list_restaurants(min_score: int = Query(0, ge=0, le=100), keyword: str | None = None):
+def list_restaurants(
+    request: Request,
+    min_score: int = Query(0, ge=0, le=100),
+    keyword: str | None = None,
+    limit: int | None = Query(None, ge=1, le=500),
+    after: str | None = None,
+    fields: str | None = None,
+    ids: str | None = None,
+):
+    """List restaurants.
+
+    Without `limit` the full catalog is returned (legacy behavior). With `limit`, the
+    page is keyset-paginated on (updated_at, store_id) and the next page's cursor is
+    returned in the `X-Next-Cursor` header. `fields` projects each item to a subset of
+    (optionally dotted, nested) keys or drops `-`-prefixed ones, e.g.
+    `fields=-raw_reviews,-summary_json.taste_profile.metrics`; `ids` turns the call into
+    a batch multi-get in the requested order.
+    """
     started = time.perf_counter()
-    rows = _db.list_restaurants(min_score=min_score, keyword=keyword)
+    selected_fields = _parse_fields(fields)
+    id_list = _split_csv(ids)
+    if len(id_list) > _MAX_MULTI_GET_IDS:
+        raise HTTPException(status_code=400, detail=f"too many ids (max {_MAX_MULTI_GET_IDS})")
+    cursor = _decode_cursor(after) if after else None
+    etag = _catalog_etag(request)
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    def compute() -> dict:
+        items, next_after = _db.list_restaurants_page(
+            min_score=min_score,
+            keyword=keyword,
+            limit=limit,
+            after=cursor,
+            ids=id_list or None,
+        )
+        return {
+            "items": [_project_fields(item, selected_fields) for item in items],
+            "next_cursor": _encode_cursor(next_after) if next_after else None,
+        }
+
+    page = _response_cache.get_or_compute(
+        "restaurants",
+        {
+            "min_score": min_score,
+            "keyword": (keyword or "").strip() or None,
+            "limit": limit,
+            "after": after,
+            "fields": sorted(selected_fields) if selected_fields else None,
+            "ids": id_list,
+        },
+        compute,
+    )
+    rows = page["items"]
+    headers = {"X-Next-Cursor": page["next_cursor"]} if page.get("next_cursor") else None
     duration_ms = int((time.perf_counter() - started) * 1000)
     logger.info(
-        "list_restaurants rows=%d min_score=%d keyword_set=%s duration_ms=%d",
+        "list_restaurants rows=%d min_score=%d keyword_set=%s limit=%s ids=%d duration_ms=%d",
         len(rows),
         min_score,
         bool(keyword and keyword.strip()),
+        limit,
+        len(id_list),
         duration_ms,
     )
-    return rows
+    return _tagged_json(rows, etag, headers)
+
+
+@app.get("/api/v1/restaurants/{restaurant_id}")
+def get_restaurant(restaurant_id: str, request: Request):
+    etag = _catalog_etag(request, store_id=restaurant_id)
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    restaurant = _response_cache.get_or_compute(
+        "restaurant",
+        {"id": restaurant_id},
+        lambda: _db.get_restaurant(restaurant_id),
+        store_id=restaurant_id,
+    )
+    if not restaurant:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+    return _tagged_json(restaurant, etag)
+
+
+_MAP_DEFAULT_FIELDS = frozenset({"id", "name", "latitude", "longitude", "ai_score", "category"})
+
+
+def _parse_floats(raw: str, count: int, name: str) -> list[float]:
+    try:
+        values = [float(token) for token in raw.split(",")]
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"invalid {name}") from exc
+    if len(values) != count:
+        raise HTTPException(status_code=400, detail=f"invalid {name}")
+    return values
+
+
+def _parse_bbox(raw: str) -> tuple[float, float, float, float]:
+    south, west, north, east = _parse_floats(raw, 4, "bbox")
+    if not (-90 <= south < north <= 90 and -180 <= west < east <= 180):
+        raise HTTPException(status_code=400, detail="bbox must be south,west,north,east")
+    # Rounded so nearly identical pans share cache entries.
+    return round(south, 5), round(west, 5), round(north, 5), round(east, 5)
+
+
+@app.get("/api/v1/map/viewport")
+def map_viewport(
+    request: Request,
+    bbox: str = Query(..., description="south,west,north,east"),
+    zoom: int = Query(15, ge=0, le=22),
+    min_score: int = Query(0, ge=0, le=100),
+    limit: int = Query(500, ge=1, le=2000),
+    fields: str | None = None,
+):
+    """Restaurants inside the map viewport.
+
+    Below MAP_CLUSTER_MAX_ZOOM the response is geohash clusters (single-member cells
+    carry their restaurant); at or above it, individual points best score first.
+    """
+    box = _parse_bbox(bbox)
+    selected_fields = _parse_fields(fields, _MAP_DEFAULT_FIELDS)
+    etag = _catalog_etag(request)
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    clustered = zoom < _env_int("MAP_CLUSTER_MAX_ZOOM", 15)
+
+    def compute() -> dict:
+        if clustered:
+            precision = geo.cluster_precision(zoom)
+            clusters = _db.map_clusters(box, precision=precision, min_score=min_score)
+            for cluster in clusters:
+                if cluster["restaurant"] is not None:
+                    cluster["restaurant"] = _project_fields(cluster["restaurant"], selected_fields)
+            return {
+                "mode": "clusters",
+                "precision": precision,
+                "count": sum(cluster["count"] for cluster in clusters),
+                "clusters": clusters,
+                "items": [],
+                "truncated": False,
+            }
+        items, truncated = _db.map_points(box, min_score=min_score, limit=limit)
+        return {
+            "mode": "points",
+            "count": len(items),
+            "clusters": [],
+            "items": [_project_fields(item, selected_fields) for item in items],
+            "truncated": truncated,
+        }
+
+    body = _response_cache.get_or_compute(
+        "map_viewport",
+        {
+            "bbox": box,
+            "zoom": zoom if clustered else None,
+            "min_score": min_score,
+            "limit": None if clustered else limit,
+            "fields": sorted(selected_fields),
+        },
+        compute,
+    )
+    return _tagged_json({"bbox": list(box), "zoom": zoom, **body}, etag)
+
+
+@app.get("/api/v1/map/nearest")
+def map_nearest(
+    request: Request,
+    near: str = Query(..., description="lat,lng"),
+    k: int = Query(10, ge=1, le=100),
+    min_score: int = Query(0, ge=0, le=100),
+    max_radius_km: float = Query(50.0, gt=0, le=500),
+    fields: str | None = None,
+):
+    lat, lng = _parse_floats(near, 2, "near")
+    if not geo.valid_point(lat, lng):
+        raise HTTPException(status_code=400, detail="near must be lat,lng")
+    lat, lng = round(lat, 5), round(lng, 5)
+    selected_fields = _parse_fields(fields, _MAP_DEFAULT_FIELDS)
+    selected_fields.add("distance_km")
+    etag = _catalog_etag(request)
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    def compute() -> list:
+        items = _db.nearest_restaurants(lat, lng, k=k, min_score=min_score, max_radius_km=max_radius_km)
+        return [_project_fields(item, selected_fields) for item in items]
+
+    items = _response_cache.get_or_compute(
+        "map_nearest",
+        {
+            "near": [lat, lng],
+            "k": k,
+            "min_score": min_score,
+            "max_radius_km": max_radius_km,
+            "fields": sorted(selected_fields),
+        },
+        compute,
+    )
+    return _tagged_json({"near": [lat, lng], "count": len(items), "items": items}, etag)
 
 
 @app.post("/admin/backfill")
-def manual_backfill(max_items: int = Query(0, ge=0, le=100000)):
-    result = backfill_serving_from_gold(db=_db, max_items=max_items)
+def manual_backfill(max_items: int = Query(0, ge=0, le=100000), full: bool = False):
+    result = backfill_serving_from_gold(db=_db, max_items=max_items, incremental=not full)
+    _response_cache.invalidate_all(reason="admin_backfill")
+    return result
+
+
+@app.post("/admin/rebuild-restaurant-projection")
+def rebuild_restaurant_projection():
+    result = _db.rebuild_restaurant_projection()
+    _response_cache.invalidate_all(reason="projection_rebuild")
     return result
 
 
+@app.post("/admin/import-legacy-restaurants")
+def import_legacy_restaurants(force: bool = Query(False)):
+    result = _db.import_legacy_restaurants(force=force)
+    if result.get("refreshed_places"):
+        _response_cache.invalidate_all(reason="legacy_import")
+    return result
+
+
+@app.get("/admin/db-pool")
+def db_pool_stats():
+    return _db.pool_stats()
+
+
+@app.get("/admin/sql-stats")
+def sql_statement_stats(
+    order_by: str = Query("total_ms", pattern="^(total_ms|mean_ms|p99_ms|max_ms|calls|rows|errors)$"),
+    limit: int = Query(50, ge=1, le=500),
+    plans: bool = Query(True),
+):
+    return sql_stats.STATS.snapshot(limit=limit, order_by=order_by, with_plans=plans)
+
+
+@app.post("/admin/sql-stats/reset")
+def reset_sql_statement_stats():
+    sql_stats.STATS.reset()
+    return {"ok": True}
+
+
 @app.post("/admin/reparse-store-names")
-def reparse_store_names(limit: int = Query(0, ge=0, le=100000)):
-    return _db.reparse_store_names(limit=limit)
+def reparse_store_names(
+    limit: int = Query(0, ge=0, le=100000),
+    only_missing: bool = Query(False),
+):
+    result = _db.reparse_store_names(limit=limit, only_missing=only_missing)
+    if result.get("updated"):
+        _response_cache.invalidate_all(reason="reparse_store_names")
+    return result
 
 
 @app.post("/api/v1/restaurants/analyze")
-def analyze_restaurant(payload: AnalyzeCompatRequest):
-    job = _enqueue_job(payload.url.strip())
+async def analyze_restaurant(payload: AnalyzeCompatRequest):
+    job = await run_in_threadpool(_enqueue_job, payload.url.strip())
     # contract/example flow is marked completed immediately but may not have analysis rows.
     if job.status == "completed":
-        restaurant = _db.get_restaurant(job.store_id)
+        restaurant = await run_in_threadpool(_db.get_restaurant, job.store_id)
     else:
-        restaurant = _wait_restaurant(job.store_id, timeout_sec=20)
+        restaurant = await _wait_restaurant(job.store_id, job.run_id, timeout_sec=20)
     if restaurant:
         return {
             "restaurant": restaurant,
@@ -379,16 +1292,17 @@ def analyze_restaurant(payload: AnalyzeCompatRequest):
 
 
 @app.post("/api/v1/restaurants/{restaurant_id}/refresh")
-def refresh_restaurant(restaurant_id: str):
-    store = _db.get_store(restaurant_id)
+async def refresh_restaurant(restaurant_id: str):
+    store = await run_in_threadpool(_db.get_store, restaurant_id)
     if not store:
         raise HTTPException(status_code=404, detail="Restaurant not found")
     url = (store.get("url") or "").strip()
     if not url:
         raise HTTPException(status_code=400, detail="Original URL not found")
 
-    job = _enqueue_job(url)
-    restaurant = _wait_restaurant(job.store_id, timeout_sec=30)
+    # A refresh must recrawl, so it skips the freshness short-circuit.
+    job = await run_in_threadpool(lambda: _enqueue_job(url, reuse_recent=False))
+    restaurant = await _wait_restaurant(job.store_id, job.run_id, timeout_sec=30)
     if not restaurant:
         raise HTTPException(status_code=500, detail="Refresh completed but restaurant projection is unavailable")
     return {
@@ -402,7 +1316,10 @@ def refresh_restaurant(restaurant_id: str):
 
 @app.delete("/api/v1/restaurants/{restaurant_id}")
 def delete_restaurant(restaurant_id: str):
+    # Resolved before the delete: siblings of the place may now serve another store's row.
+    store_ids = _db.place_store_ids(restaurant_id)
     deleted = _db.delete_store_cascade(restaurant_id)
     if deleted <= 0:
         raise HTTPException(status_code=404, detail="Restaurant not found")
+    _response_cache.invalidate_stores(store_ids, reason="deleted")
     return {"status": "success", "message": "Restaurant deleted"}
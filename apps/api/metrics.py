@@ -0,0 +1,263 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable
+
+# Minimal in-process Prometheus registry (text exposition format 0.0.4). Values are per
+# API process; scrape each replica separately. Label sets are bounded by design: routes
+# are recorded by their template ("/api/v1/restaurants/{restaurant_id}"), never the raw path.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        *,
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [bucket counts..., +Inf count, sum]
+        self._series: dict[tuple[str, ...], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._series.items())
+        for labels, series in items:
+            for bound, count in zip(self.buckets, series):
+                le = _format_labels(self.labelnames, labels, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {_format_value(count)}")
+            inf = _format_labels(self.labelnames, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf} {_format_value(series[-2])}")
+            plain = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{plain} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{plain} {_format_value(series[-2])}")
+        return lines
+
+
+class GaugeCallback:
+    """Gauge sampled at scrape time from `collect() -> {label tuple: value}`."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...],
+        collect: Callable[[], dict[tuple[str, ...], float]],
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.collect = collect
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        try:
+            values = self.collect()
+        except Exception:
+            return lines
+        for labels, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[Any] = []
+
+    def register(self, metric: Any) -> Any:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.register(
+    Counter("hidden_spot_http_requests_total", "HTTP requests by route template, method and status.", ("route", "method", "status"))
+)
+HTTP_LATENCY = REGISTRY.register(
+    Histogram("hidden_spot_http_request_duration_seconds", "HTTP request latency.", ("route", "method"))
+)
+HTTP_RESPONSE_BYTES = REGISTRY.register(
+    Histogram(
+        "hidden_spot_http_response_bytes",
+        "Response body bytes as sent (after compression).",
+        ("route", "method"),
+        buckets=BYTES_BUCKETS,
+    )
+)
+DB_POOL_CHECKOUT = REGISTRY.register(
+    Histogram(
+        "hidden_spot_db_pool_checkout_seconds",
+        "Time to check a connection out of the API pool.",
+        buckets=FAST_BUCKETS,
+    )
+)
+REDIS_LATENCY = REGISTRY.register(
+    Histogram("hidden_spot_redis_call_seconds", "Redis call latency by operation.", ("op",), buckets=FAST_BUCKETS)
+)
+REDIS_ERRORS = REGISTRY.register(Counter("hidden_spot_redis_errors_total", "Failed Redis calls by operation.", ("op",)))
+CACHE_LOOKUPS = REGISTRY.register(
+    Counter(
+        "hidden_spot_response_cache_lookups_total",
+        "Response cache lookups by route and result (hit, stale, miss, bypass).",
+        ("route", "result"),
+    )
+)
+
+
+def _cache_hit_ratio() -> dict[tuple[str, ...], float]:
+    with CACHE_LOOKUPS._lock:
+        items = list(CACHE_LOOKUPS._values.items())
+    totals: dict[str, list[float]] = {}
+    for (route, result), value in items:
+        hits_total = totals.setdefault(route, [0.0, 0.0])
+        if result in ("hit", "stale"):
+            hits_total[0] += value
+        hits_total[1] += value
+    return {(route,): hits / total for route, (hits, total) in totals.items() if total}
+
+
+REGISTRY.register(
+    GaugeCallback(
+        "hidden_spot_response_cache_hit_ratio",
+        "Share of response cache lookups served from Redis (hit or stale) since start.",
+        ("route",),
+        _cache_hit_ratio,
+    )
+)
+
+
+def observe_redis(op: str, seconds: float, *, failed: bool = False) -> None:
+    REDIS_LATENCY.observe(seconds, op)
+    if failed:
+        REDIS_ERRORS.inc(op)
+
+
+@contextmanager
+def redis_timer(op: str):
+    started = time.perf_counter()
+    failed = True
+    try:
+        yield
+        failed = False
+    finally:
+        observe_redis(op, time.perf_counter() - started, failed=failed)
+
+
+def register_pool_gauges(name: str, stats: Callable[[], dict[str, Any]]) -> None:
+    """Expose numeric PgConnectionPool.stats() fields as gauges labelled by `name`."""
+
+    def collect() -> dict[tuple[str, ...], float]:
+        return {
+            (name, key): float(value)
+            for key, value in stats().items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)
+        }
+
+    REGISTRY.register(
+        GaugeCallback("hidden_spot_db_pool", "PgConnectionPool.stats() by pool and field.", ("pool", "field"), collect)
+    )
+
+
+class MetricsMiddleware:
+    """Records count, latency and response bytes per route template and status."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+        sent_bytes = 0
+
+        async def wrapped_send(message: dict) -> None:
+            nonlocal status, sent_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                sent_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, wrapped_send)
+        finally:
+            # FastAPI stores the matched route on the (shared) scope during routing.
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "GET")
+            HTTP_REQUESTS.inc(template, method, str(status))
+            HTTP_LATENCY.observe(time.perf_counter() - started, template, method)
+            HTTP_RESPONSE_BYTES.observe(sent_bytes, template, method)
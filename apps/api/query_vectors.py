@@ -0,0 +1,155 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Callable
+
+from redis import Redis
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = (os.getenv(name, str(default)) or "").strip()
+    try:
+        value = int(raw)
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+def _default_embedder() -> Any:
+    # Imported lazily: the generator configures the Gemini client and lists models on init.
+    from apps.worker.embeddings import EmbeddingGenerator
+
+    return EmbeddingGenerator()
+
+
+class QueryVectorCache:
+    """Embeds search queries once and keeps the vectors in a per-process LRU backed by Redis.
+
+    Queries repeat heavily (category chips, popular keywords), so most semantic searches
+    skip the embedding API round-trip entirely. Vectors are stored as float32 bytes and
+    keyed by model + dimension so a model switch never serves stale vectors.
+    """
+
+    _RETRY_AFTER_SEC = 30.0
+
+    def __init__(
+        self,
+        redis_url: str,
+        *,
+        max_entries: int = 512,
+        ttl_sec: int = 7 * 24 * 3600,
+        namespace: str = "hidden_spot:cache:qvec",
+        embedder_factory: Callable[[], Any] = _default_embedder,
+    ) -> None:
+        self.redis_url = redis_url
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.namespace = namespace
+        self._embedder_factory = embedder_factory
+        self._embedder: Any | None = None
+        self._lru: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis: Redis | None = None
+        self._redis_failed_at = 0.0
+        model = os.getenv("GEMINI_EMBED_MODEL", "models/gemini-embedding-001")
+        dim = os.getenv("EMBEDDING_DIM", "1536")
+        self._scope = f"{model.rsplit('/', 1)[-1]}:{dim}"
+        # (op, seconds, failed) per Redis call, for metrics.
+        self.on_redis_call: Callable[[str, float, bool], None] | None = None
+
+    @classmethod
+    def from_env(cls) -> "QueryVectorCache":
+        return cls(
+            os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+            max_entries=_env_int("SEARCH_VECTOR_CACHE_SIZE", 512),
+            ttl_sec=_env_int("SEARCH_VECTOR_CACHE_TTL_SEC", 7 * 24 * 3600),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(os.getenv("GEMINI_API_KEY", ""))
+
+    def _client(self) -> Redis | None:
+        with self._lock:
+            if self._redis is not None:
+                return self._redis
+            if time.monotonic() - self._redis_failed_at < self._RETRY_AFTER_SEC:
+                return None
+            self._redis = Redis.from_url(self.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+            return self._redis
+
+    def _mark_failed(self, exc: Exception) -> None:
+        logger.warning("query vector cache unavailable error=%s", exc)
+        with self._lock:
+            self._redis = None
+            self._redis_failed_at = time.monotonic()
+
+    def _observe(self, op: str, started: float, failed: bool) -> None:
+        if self.on_redis_call is not None:
+            try:
+                self.on_redis_call(op, time.perf_counter() - started, failed)
+            except Exception:
+                pass
+
+    def _get_embedder(self) -> Any:
+        with self._lock:
+            if self._embedder is None:
+                self._embedder = self._embedder_factory()
+            return self._embedder
+
+    def _remember(self, key: str, vector: list[float]) -> None:
+        with self._lock:
+            self._lru[key] = vector
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def get(self, query: str) -> list[float] | None:
+        text = " ".join((query or "").strip().lower().split())
+        if not text or not self.enabled:
+            return None
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        key = f"{self.namespace}:{self._scope}:{digest}"
+
+        with self._lock:
+            cached = self._lru.get(key)
+            if cached is not None:
+                self._lru.move_to_end(key)
+                return cached
+
+        client = self._client()
+        if client is not None:
+            started = time.perf_counter()
+            try:
+                raw = client.get(key)
+                self._observe("qvec_get", started, False)
+            except Exception as exc:
+                self._observe("qvec_get", started, True)
+                self._mark_failed(exc)
+                raw = None
+            if raw:
+                vector = array("f")
+                vector.frombytes(raw)
+                result = vector.tolist()
+                self._remember(key, result)
+                return result
+
+        result = self._get_embedder().embed(text)
+        if not result:
+            return None
+        self._remember(key, result)
+        if client is not None:
+            started = time.perf_counter()
+            try:
+                client.set(key, array("f", result).tobytes(), ex=self.ttl_sec)
+                self._observe("qvec_set", started, False)
+            except Exception as exc:
+                self._observe("qvec_set", started, True)
+                self._mark_failed(exc)
+        return result
@@ -0,0 +1,157 @@
+import gzip
+import json
+from datetime import date, datetime
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional codec
+    brotli = None
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps_json(value: Any) -> bytes:
+    """Serialize like JSONResponse (UTF-8, ISO datetimes), through orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(value, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        value,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=_json_default,
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson. Returned directly from hot endpoints, it also
+    skips FastAPI's jsonable_encoder pass over the (already JSON-shaped) payload."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison (RFC 9110 13.1.2): compression varies bytes, not content.
+    opaque = etag.removeprefix("W/")
+    return any(token.strip().removeprefix("W/") == opaque for token in if_none_match.split(","))
+
+
+_COMPRESSIBLE_PREFIXES = ("application/json", "text/", "application/javascript")
+_NEVER_COMPRESS = ("text/event-stream",)
+
+
+def _negotiate(accept_encoding: str, *, allow_brotli: bool) -> str | None:
+    accepted: dict[str, float] = {}
+    for token in accept_encoding.split(","):
+        name, _, params = token.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    # Highest q wins; br is preferred only on a tie.
+    brotli_q = accepted.get("br", 0.0) if allow_brotli else 0.0
+    gzip_q = accepted.get("gzip", accepted.get("*", 0.0))
+    if brotli_q > 0 and brotli_q >= gzip_q:
+        return "br"
+    if gzip_q > 0:
+        return "gzip"
+    return None
+
+
+class CompressionMiddleware:
+    """gzip/brotli for complete JSON/text bodies, negotiated from Accept-Encoding.
+
+    Streaming responses (SSE, anything sent in more than one body chunk) pass through
+    untouched, as do bodies under `minimum_size`. Brotli is used when the optional
+    `brotli` package is installed and the client prefers it.
+    """
+
+    def __init__(self, app: Any, *, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for name, value in scope.get("headers") or []:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = _negotiate(accept, allow_brotli=brotli is not None) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: dict | None = None
+        passthrough = False
+
+        async def wrapped_send(message: dict) -> None:
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                headers = {name.lower(): value for name, value in message.get("headers") or []}
+                content_type = headers.get(b"content-type", b"").decode("latin-1").lower()
+                eligible = (
+                    b"content-encoding" not in headers
+                    and message["status"] not in (204, 304)
+                    and content_type.startswith(_COMPRESSIBLE_PREFIXES)
+                    and not content_type.startswith(_NEVER_COMPRESS)
+                )
+                if eligible:
+                    start = message
+                else:
+                    passthrough = True
+                    await send(message)
+                return
+            if passthrough or message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            held, start = start, None
+            body = message.get("body", b"")
+            headers = [(name, value) for name, value in held.get("headers") or [] if name.lower() != b"vary"]
+            vary = [value for name, value in held.get("headers") or [] if name.lower() == b"vary"]
+            headers.append((b"vary", b", ".join(vary + [b"Accept-Encoding"])))
+            if message.get("more_body") or len(body) < self.minimum_size:
+                passthrough = True
+                await send({**held, "headers": headers})
+                await send(message)
+                return
+            compressed = self._compress(body, encoding)
+            headers = [(name, value) for name, value in headers if name.lower() != b"content-length"]
+            headers.append((b"content-encoding", encoding.encode("ascii")))
+            headers.append((b"content-length", str(len(compressed)).encode("ascii")))
+            await send({**held, "headers": headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, wrapped_send)
@@ -6,9 +6,62 @@ SYNONYMS = {
     "면": ["국수", "라멘", "우동", "파스타"],
 }
 
+# Relevance multiplier for synonym hits relative to the literal query.
+SYNONYM_WEIGHT = 0.6
+
 
 def expand_query(query: str) -> list[str]:
+    return [term for term, _ in expand_query_weighted(query)]
+
+
+def expand_query_weighted(query: str) -> list[tuple[str, float]]:
     q = query.strip().lower()
-    expanded = [q]
-    expanded.extend(SYNONYMS.get(q, []))
-    return list(dict.fromkeys(expanded))
+    weighted = {q: 1.0}
+    for synonym in SYNONYMS.get(q, []):
+        weighted.setdefault(synonym, SYNONYM_WEIGHT)
+    return list(weighted.items())
+
+
+# Reciprocal-rank fusion constant: higher values flatten the gap between top ranks.
+RRF_K = 60
+# Rerank multipliers applied on top of the fused rank score.
+QUALITY_SCORE_WEIGHT = 0.5
+AD_RATIO_PENALTY = 0.5
+
+
+def reciprocal_rank_fusion(
+    ranked: dict[str, list[dict]],
+    *,
+    weights: dict[str, float] | None = None,
+    k: int = RRF_K,
+) -> list[tuple[dict, float]]:
+    """Merge per-retriever rankings into one list of (row, fused score), keyed by store_id."""
+    fused: dict[str, float] = {}
+    rows: dict[str, dict] = {}
+    for source, items in ranked.items():
+        weight = (weights or {}).get(source, 1.0)
+        for rank, row in enumerate(items, start=1):
+            store_id = str(row.get("store_id") or "")
+            if not store_id:
+                continue
+            fused[store_id] = fused.get(store_id, 0.0) + weight / (k + rank)
+            rows.setdefault(store_id, row)
+    return [(rows[store_id], score) for store_id, score in fused.items()]
+
+
+def rerank(fused: list[tuple[dict, float]]) -> list[dict]:
+    """Order fused hits by rank score nudged up by analysis score and down by ad-review ratio."""
+
+    def final_score(item: tuple[dict, float]) -> float:
+        row, score = item
+        try:
+            quality = min(max(float(row.get("score") or 0.0), 0.0), 100.0) / 100.0
+        except (TypeError, ValueError):
+            quality = 0.0
+        try:
+            ad_ratio = min(max(float(row.get("ad_review_ratio") or 0.0), 0.0), 1.0)
+        except (TypeError, ValueError):
+            ad_ratio = 0.0
+        return score * (1.0 + QUALITY_SCORE_WEIGHT * quality) * (1.0 - AD_RATIO_PENALTY * ad_ratio)
+
+    return [row for row, _ in sorted(fused, key=final_score, reverse=True)]
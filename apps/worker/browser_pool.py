@@ -0,0 +1,291 @@
+import asyncio
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, Awaitable, TypeVar
+
+from playwright.async_api import async_playwright
+
+# Long-lived Chromium for a worker process. Playwright objects belong to the event loop
+# that created them, so the pool runs its own loop on a daemon thread and jobs submit
+# their crawl coroutine to it (run()) instead of wrapping each job in asyncio.run.
+#
+# One browser context is leased at a time and reused across crawls; it is recycled after
+# BROWSER_CONTEXT_MAX_PAGES pages, and whenever a crawl raises (a blocked or half-loaded
+# page should not leak cookies into the next store). The browser is relaunched when it
+# disconnects (crash, OOM kill) or when the browser process tree exceeds
+# BROWSER_MAX_RSS_MB; if relaunching fails the Playwright driver is restarted too.
+
+T = TypeVar("T")
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+)
+CONTEXT_OPTIONS: dict[str, Any] = {"user_agent": USER_AGENT, "viewport": {"width": 1280, "height": 900}}
+DEFAULT_TIMEOUT_MS = 20000
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = (os.getenv(name, str(default)) or "").strip()
+    try:
+        value = int(raw)
+    except ValueError:
+        return default
+    return value if value >= 0 else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    raw = (os.getenv(name, "true" if default else "false") or "").strip().lower()
+    if raw in {"1", "true", "yes", "y", "on"}:
+        return True
+    if raw in {"0", "false", "no", "n", "off"}:
+        return False
+    return default
+
+
+def headless() -> bool:
+    return os.getenv("PLAYWRIGHT_HEADLESS", "true") == "true"
+
+
+def _log(action: str, **payload: Any) -> None:
+    event = {
+        "stage": "browser_pool",
+        "status": action,
+        "payload": payload,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+    print(json.dumps(event, ensure_ascii=False))
+
+
+def _descendant_rss_bytes(root_pid: int) -> int | None:
+    """RSS of every process below root_pid (Playwright driver + Chromium); None off Linux."""
+    try:
+        pids = [int(name) for name in os.listdir("/proc") if name.isdigit()]
+    except OSError:
+        return None
+    children: dict[int, list[int]] = {}
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat", "rb") as fh:
+                stat = fh.read()
+            # Field 4 (ppid) follows the parenthesised command name, which may contain spaces.
+            ppid = int(stat[stat.rindex(b")") + 2 :].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(pid)
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    stack = list(children.get(root_pid, []))
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/statm", "rb") as fh:
+                total += int(fh.read().split()[1]) * page_size
+        except (OSError, ValueError, IndexError):
+            continue
+    return total
+
+
+class BrowserPool:
+    def __init__(
+        self,
+        *,
+        context_max_pages: int | None = None,
+        max_rss_mb: int | None = None,
+    ) -> None:
+        self.context_max_pages = context_max_pages if context_max_pages is not None else _env_int("BROWSER_CONTEXT_MAX_PAGES", 20)
+        self.max_rss_mb = max_rss_mb if max_rss_mb is not None else _env_int("BROWSER_MAX_RSS_MB", 1536)
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._context_pages = 0
+        self._browser_crashed = False
+        self._lease_lock: asyncio.Lock | None = None
+        self._stats = {"launches": 0, "contexts": 0, "pages": 0, "crashes": 0, "rss_relaunches": 0, "leases": 0}
+        self._closed = False
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="browser-pool", daemon=True)
+        self._thread.start()
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def run(self, coro: Awaitable[T], *, timeout: float | None = None) -> T:
+        """Run `coro` on the pool loop and block for its result.
+
+        With `timeout`, the coroutine is cancelled on the loop and asyncio.TimeoutError
+        is raised, matching asyncio.run(asyncio.wait_for(...)).
+        """
+        if self._closed:
+            raise RuntimeError("browser pool is closed")
+        wrapped = asyncio.wait_for(coro, timeout=timeout) if timeout else coro
+        future = asyncio.run_coroutine_threadsafe(wrapped, self._loop)
+        try:
+            # The margin only matters if the loop itself is wedged; wait_for fires first.
+            return future.result(timeout=timeout + 30 if timeout else None)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            **self._stats,
+            "connected": bool(self._browser is not None and self._browser.is_connected()),
+            "context_pages": self._context_pages,
+        }
+
+    async def _ensure_browser(self) -> Any:
+        if self._browser is not None and self._browser.is_connected() and not self._browser_crashed:
+            return self._browser
+        if self._browser is not None:
+            await self._close_browser()
+        for attempt in range(2):
+            try:
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                browser = await self._playwright.chromium.launch(headless=headless())
+                break
+            except Exception as exc:
+                _log("launch_failed", attempt=attempt, error=str(exc))
+                # A dead driver fails every launch; restart it once before giving up.
+                await self._stop_playwright()
+                if attempt:
+                    raise
+        browser.on("disconnected", self._on_disconnected)
+        self._browser = browser
+        self._browser_crashed = False
+        self._stats["launches"] += 1
+        _log("launched", launches=self._stats["launches"])
+        return browser
+
+    def _on_disconnected(self, browser: Any) -> None:
+        if browser is self._browser and not self._closed:
+            self._browser_crashed = True
+            self._stats["crashes"] += 1
+            _log("disconnected", crashes=self._stats["crashes"])
+
+    def _on_page(self, page: Any) -> None:
+        self._context_pages += 1
+        self._stats["pages"] += 1
+
+    async def _ensure_context(self) -> Any:
+        browser = await self._ensure_browser()
+        if self._context is not None and self._context_pages >= self.context_max_pages > 0:
+            await self._close_context()
+        if self._context is None:
+            context = await browser.new_context(**CONTEXT_OPTIONS)
+            context.set_default_timeout(DEFAULT_TIMEOUT_MS)
+            context.on("page", self._on_page)
+            self._context = context
+            self._context_pages = 0
+            self._stats["contexts"] += 1
+        return self._context
+
+    async def _close_context(self) -> None:
+        context, self._context = self._context, None
+        self._context_pages = 0
+        if context is not None:
+            try:
+                await context.close()
+            except Exception:
+                pass
+
+    async def _close_browser(self) -> None:
+        await self._close_context()
+        browser, self._browser = self._browser, None
+        if browser is not None:
+            try:
+                await browser.close()
+            except Exception:
+                pass
+
+    async def _stop_playwright(self) -> None:
+        await self._close_browser()
+        playwright, self._playwright = self._playwright, None
+        if playwright is not None:
+            try:
+                await playwright.stop()
+            except Exception:
+                pass
+
+    async def _check_memory(self) -> None:
+        if not self.max_rss_mb or self._browser is None:
+            return
+        rss = _descendant_rss_bytes(os.getpid())
+        if rss is not None and rss > self.max_rss_mb * 1024 * 1024:
+            self._stats["rss_relaunches"] += 1
+            _log("rss_relaunch", rss_mb=rss // (1024 * 1024), limit_mb=self.max_rss_mb)
+            await self._close_browser()
+
+    @asynccontextmanager
+    async def context(self):
+        """Lease the shared browser context for one crawl attempt (pool loop only)."""
+        if self._lease_lock is None:
+            self._lease_lock = asyncio.Lock()
+        async with self._lease_lock:
+            context = await self._ensure_context()
+            self._stats["leases"] += 1
+            started = time.monotonic()
+            try:
+                yield context
+            except BaseException:
+                # Fresh cookies/storage after a failure; a crash also forces a relaunch.
+                if self._browser_crashed or self._browser is None or not self._browser.is_connected():
+                    await self._close_browser()
+                else:
+                    await self._close_context()
+                raise
+            finally:
+                if self._context is not None:
+                    for page in list(self._context.pages):
+                        try:
+                            await page.close()
+                        except Exception:
+                            pass
+                await self._check_memory()
+                _log("lease_done", duration_ms=int((time.monotonic() - started) * 1000), **self.stats())
+
+    def close(self, timeout: float = 15.0) -> None:
+        if self._closed:
+            return
+        try:
+            future = asyncio.run_coroutine_threadsafe(self._stop_playwright(), self._loop)
+            future.result(timeout=timeout)
+        except Exception as exc:
+            _log("close_failed", error=str(exc))
+        finally:
+            self._closed = True
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=timeout)
+            _log("closed", **self._stats)
+
+
+_shared_pool: BrowserPool | None = None
+_shared_pool_lock = threading.Lock()
+
+
+def shared_browser_pool() -> BrowserPool | None:
+    """Per-process pool, or None when BROWSER_POOL_ENABLED=false (launch per attempt)."""
+    global _shared_pool
+    if not _env_bool("BROWSER_POOL_ENABLED", True):
+        return None
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = BrowserPool()
+            atexit.register(shutdown_shared_browser_pool)
+        return _shared_pool
+
+
+def shutdown_shared_browser_pool() -> None:
+    global _shared_pool
+    with _shared_pool_lock:
+        pool, _shared_pool = _shared_pool, None
+    if pool is not None:
+        pool.close()
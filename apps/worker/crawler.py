@@ -10,6 +10,8 @@ from urllib.request import Request, urlopen
 
 from playwright.async_api import async_playwright
 
+from apps.worker.browser_pool import CONTEXT_OPTIONS, DEFAULT_TIMEOUT_MS, BrowserPool, headless
+
 
 _STRONG_BLOCKED_MARKERS = (
     "비정상적인 접근",
@@ -43,6 +45,11 @@ class CrawlBlockedError(RuntimeError):
 
 
 class NaverMapsCrawler:
+    def __init__(self, browser_pool: BrowserPool | None = None) -> None:
+        # With a pool, attempts reuse its browser/context and must run on pool.run();
+        # without one, every attempt launches (and closes) its own Chromium.
+        self.browser_pool = browser_pool
+
     async def crawl(self, url: str) -> dict[str, Any]:
         retry_count = int(os.getenv("CRAWL_RETRY_COUNT", "2"))
         delay_ms = int(os.getenv("CRAWL_DELAY_MS", "1200"))
@@ -61,126 +68,127 @@ class NaverMapsCrawler:
         raise RuntimeError(f"crawl failed after retry: {last_error}")
 
     async def _crawl_once(self, url: str, source_url: str, delay_ms: int) -> dict[str, Any]:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=os.getenv("PLAYWRIGHT_HEADLESS", "true") == "true")
-            context = await browser.new_context(
-                user_agent=(
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-                    "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
-                ),
-                viewport={"width": 1280, "height": 900},
-            )
-            context.set_default_timeout(20000)
-            page = await context.new_page()
+        if self.browser_pool is not None:
+            # The pool closes this attempt's pages and recycles the context on errors.
+            async with self.browser_pool.context() as context:
+                return await self._crawl_in_context(context, url=url, source_url=source_url, delay_ms=delay_ms)
 
-            await page.goto(url, wait_until="domcontentloaded", timeout=60000)
-            await asyncio.sleep(delay_ms / 1000.0 + random.uniform(0.2, 0.8))
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=headless())
+            context = await browser.new_context(**CONTEXT_OPTIONS)
+            context.set_default_timeout(DEFAULT_TIMEOUT_MS)
+            try:
+                return await self._crawl_in_context(context, url=url, source_url=source_url, delay_ms=delay_ms)
+            finally:
+                await context.close()
+                await browser.close()
 
-            current_url = page.url
-            place_id = self._extract_place_id(current_url)
+    async def _crawl_in_context(self, context, url: str, source_url: str, delay_ms: int) -> dict[str, Any]:
+        page = await context.new_page()
 
-            html_main = await page.content()
-            html = html_main
+        await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+        await asyncio.sleep(delay_ms / 1000.0 + random.uniform(0.2, 0.8))
 
-            name = ""
-            address = ""
-            reviews: list[str] = []
-            latitude: float | None = None
-            longitude: float | None = None
-            frame_found = False
-            review_count_before_mobile = 0
-            mobile_fallback_used = False
+        current_url = page.url
+        place_id = self._extract_place_id(current_url)
 
-            frame = await self._get_entry_frame(page=page, retries=3, retry_delay_ms=700)
-            if frame:
-                frame_found = True
-                try:
-                    name, address = await self._extract_name_address_with_retry(
-                        frame=frame, retries=3, retry_delay_ms=450
-                    )
-                    reviews = await self._extract_reviews_with_retry(frame=frame, retries=4, min_target=20)
-                    html = await frame.content()
-                    latitude, longitude = await self._extract_coordinates(page=page, frame=frame)
-                except Exception:
-                    pass
-            review_count_before_mobile = len(reviews)
+        html_main = await page.content()
+        html = html_main
 
-            html_name, html_address = self._extract_name_address_from_html(html)
-            if not name:
-                name = html_name
-            if not address:
-                address = html_address
-
-            if latitude is None or longitude is None:
-                lat_guess, lng_guess = self._extract_coordinates_from_text(f"{html_main}\n{html}")
-                latitude = latitude if latitude is not None else lat_guess
-                longitude = longitude if longitude is not None else lng_guess
-
-            if not place_id:
-                place_id = self._extract_place_id(url) or ""
-
-            # Fallback route: if iframe extraction is weak, use mobile place pages.
-            if place_id and (not name or len(reviews) < 3):
-                mobile_fallback_used = True
-                mobile = await self._crawl_mobile_fallback(context=context, place_id=place_id, delay_ms=delay_ms)
-                if mobile:
-                    name = name or mobile.get("name", "")
-                    address = address or mobile.get("address", "")
-                    latitude = latitude if latitude is not None else mobile.get("latitude")
-                    longitude = longitude if longitude is not None else mobile.get("longitude")
-                    reviews = self._dedupe_texts([*reviews, *mobile.get("reviews", [])])[:500]
-                    mobile_html = mobile.get("raw_html", "")
-                    if mobile_html:
-                        html = mobile_html
+        name = ""
+        address = ""
+        reviews: list[str] = []
+        latitude: float | None = None
+        longitude: float | None = None
+        frame_found = False
+        review_count_before_mobile = 0
+        mobile_fallback_used = False
+
+        frame = await self._get_entry_frame(page=page, retries=3, retry_delay_ms=700)
+        if frame:
+            frame_found = True
+            try:
+                name, address = await self._extract_name_address_with_retry(
+                    frame=frame, retries=3, retry_delay_ms=450
+                )
+                reviews = await self._extract_reviews_with_retry(frame=frame, retries=4, min_target=20)
+                html = await frame.content()
+                latitude, longitude = await self._extract_coordinates(page=page, frame=frame)
+            except Exception:
+                pass
+        review_count_before_mobile = len(reviews)
 
-            if not name:
-                name = self._extract_title_name(html_main) or self._extract_title_name(html)
+        html_name, html_address = self._extract_name_address_from_html(html)
+        if not name:
+            name = html_name
+        if not address:
+            address = html_address
+
+        if latitude is None or longitude is None:
+            lat_guess, lng_guess = self._extract_coordinates_from_text(f"{html_main}\n{html}")
+            latitude = latitude if latitude is not None else lat_guess
+            longitude = longitude if longitude is not None else lng_guess
+
+        if not place_id:
+            place_id = self._extract_place_id(url) or ""
+
+        # Fallback route: if iframe extraction is weak, use mobile place pages.
+        if place_id and (not name or len(reviews) < 3):
+            mobile_fallback_used = True
+            mobile = await self._crawl_mobile_fallback(context=context, place_id=place_id, delay_ms=delay_ms)
+            if mobile:
+                name = name or mobile.get("name", "")
+                address = address or mobile.get("address", "")
+                latitude = latitude if latitude is not None else mobile.get("latitude")
+                longitude = longitude if longitude is not None else mobile.get("longitude")
+                reviews = self._dedupe_texts([*reviews, *mobile.get("reviews", [])])[:500]
+                mobile_html = mobile.get("raw_html", "")
+                if mobile_html:
+                    html = mobile_html
 
-            blocked_reason = self._detect_blocked_reason(
+        if not name:
+            name = self._extract_title_name(html_main) or self._extract_title_name(html)
+
+        blocked_reason = self._detect_blocked_reason(
+            final_url=current_url,
+            html_main=html_main,
+            html=html,
+            name=name,
+            reviews=reviews,
+        )
+        if blocked_reason:
+            screenshot = await self._safe_screenshot(page)
+            raise CrawlBlockedError(
+                blocked_reason,
+                screenshot_bytes=screenshot,
                 final_url=current_url,
-                html_main=html_main,
-                html=html,
-                name=name,
-                reviews=reviews,
             )
-            if blocked_reason:
-                screenshot = await self._safe_screenshot(page)
-                await context.close()
-                await browser.close()
-                raise CrawlBlockedError(
-                    blocked_reason,
-                    screenshot_bytes=screenshot,
-                    final_url=current_url,
-                )
-
-            page_screenshot_bytes = await self._safe_screenshot(page)
 
-            await context.close()
-            await browser.close()
-
-            return {
-                "source_url": source_url,
-                "final_url": current_url,
-                "naver_place_id": place_id,
-                "name": name,
-                "address": address,
-                "latitude": latitude,
-                "longitude": longitude,
-                "review_count": len(reviews),
-                "review_count_before_mobile": review_count_before_mobile,
-                "mobile_fallback_used": mobile_fallback_used,
-                "frame_found": frame_found,
-                "extraction_route": (
-                    "desktop+mobile"
-                    if mobile_fallback_used and review_count_before_mobile > 0
-                    else "mobile_only"
-                    if mobile_fallback_used
-                    else "desktop_only"
-                ),
-                "reviews": reviews,
-                "raw_html": html,
-                "page_screenshot_bytes": page_screenshot_bytes,
-            }
+        page_screenshot_bytes = await self._safe_screenshot(page)
+
+        return {
+            "source_url": source_url,
+            "final_url": current_url,
+            "naver_place_id": place_id,
+            "name": name,
+            "address": address,
+            "latitude": latitude,
+            "longitude": longitude,
+            "review_count": len(reviews),
+            "review_count_before_mobile": review_count_before_mobile,
+            "mobile_fallback_used": mobile_fallback_used,
+            "frame_found": frame_found,
+            "extraction_route": (
+                "desktop+mobile"
+                if mobile_fallback_used and review_count_before_mobile > 0
+                else "mobile_only"
+                if mobile_fallback_used
+                else "desktop_only"
+            ),
+            "reviews": reviews,
+            "raw_html": html,
+            "page_screenshot_bytes": page_screenshot_bytes,
+        }
 
     def _resolve_source_url(self, url: str) -> str:
         candidate = (url or "").strip()
@@ -1,16 +1,23 @@
 import asyncio
 import json
 import os
+import threading
 import time
 from datetime import datetime
 
+from redis import Redis
+from rq import Queue, get_current_job
+
+from apps.worker.browser_pool import shared_browser_pool
 from apps.worker.crawler import CrawlBlockedError, NaverMapsCrawler
-from apps.worker.db import WorkerDatabase
+from apps.worker.db import WorkerDatabase, shared_worker_database
 from apps.worker.dq import DQError, InsufficientReviewsError, validate_reviews
 from apps.worker.embeddings import EmbeddingGenerator
 from apps.worker.llm import ChunkedAnalyzer
 from apps.worker.parser import parse_reviews_html, to_jsonl
-from libs.common import KeyParts, MinioDataLakeClient, sha256_bytes
+from libs.common import KeyParts, MinioDataLakeClient, gold_bundle, sha256_bytes
+from libs.common.events import JOB_RETRYING_STATE, publish_job_event, publish_store_updated
+from libs.common.single_flight import release_inflight
 from libs.common.object_keys import (
     artifacts_chunk_map,
     artifacts_debug_blocked_png,
@@ -21,6 +28,73 @@ from libs.common.object_keys import (
     gold_analysis_json,
     silver_reviews_jsonl,
 )
+from libs.common.store_names import resolve_display_name
+
+
+_event_redis: Redis | None = None
+_event_redis_lock = threading.Lock()
+
+
+def _events_client() -> Redis:
+    global _event_redis
+    with _event_redis_lock:
+        if _event_redis is None:
+            _event_redis = Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        return _event_redis
+
+
+def _publish_store_updated(db: WorkerDatabase, *, run_id: str, store_id: str) -> None:
+    # Cache invalidation is best-effort: a Redis hiccup must not fail a finished job.
+    # Detail entries are keyed by the requested store_id, and every store of the place
+    # reads the refreshed row, so all of them are invalidated.
+    try:
+        store_ids = db.place_store_ids(store_id)
+    except Exception:
+        store_ids = [store_id]
+    try:
+        publish_store_updated(_events_client(), store_ids=store_ids, run_id=run_id)
+    except Exception as exc:
+        db.log_event(run_id=run_id, stage="publish", status="failed", duration_ms=0, payload={"error": str(exc)})
+
+
+def _release_single_flight(db: WorkerDatabase, *, run_id: str, store_id: str) -> None:
+    try:
+        release_inflight(_events_client(), store_id, run_id)
+    except Exception as exc:
+        db.log_event(run_id=run_id, stage="single_flight", status="failed", duration_ms=0, payload={"error": str(exc)})
+
+
+def _is_final_attempt() -> bool:
+    job = get_current_job()
+    return job is None or not job.retries_left
+
+
+_GOLD_BUNDLE_THROTTLE_KEY = "hidden_spot:gold_bundle:compaction_scheduled"
+
+
+def _schedule_gold_bundle_compaction(db: WorkerDatabase, *, run_id: str) -> None:
+    # At most one compaction per GOLD_BUNDLE_COMPACT_INTERVAL_SEC across all workers; it runs
+    # as its own RQ job so the analysis job that triggered it is not slowed down.
+    try:
+        redis = _events_client()
+        if not redis.set(_GOLD_BUNDLE_THROTTLE_KEY, run_id, nx=True, ex=_env_int("GOLD_BUNDLE_COMPACT_INTERVAL_SEC", 600)):
+            return
+        Queue(os.getenv("RQ_QUEUE", "hidden_spot"), connection=redis).enqueue(
+            "apps.worker.tasks.compact_gold_bundle",
+            job_timeout=_env_int("RQ_JOB_TIMEOUT_SEC", 900),
+            result_ttl=3600,
+        )
+    except Exception as exc:
+        db.log_event(run_id=run_id, stage="gold_bundle", status="failed", duration_ms=0, payload={"error": str(exc)})
+
+
+def compact_gold_bundle() -> dict:
+    manifest = gold_bundle.compact(MinioDataLakeClient(), fetch_workers=_env_int("GOLD_BUNDLE_FETCH_WORKERS", 8))
+    return {key: manifest.get(key) for key in ("bundle_key", "store_count", "source_object_count", "bytes")}
+
+
+def _publish_job_event(run_id: str, state: dict) -> None:
+    publish_job_event(_events_client(), run_id=run_id, **state)
 
 
 def _now_ms() -> int:
@@ -107,7 +181,7 @@ def _sanitize_store_name(name: str | None, *, store_id: str, naver_place_id: str
 
 
 def process_job(run_id: str, store_id: str, url: str, collected_at_iso: str) -> dict:
-    db = WorkerDatabase()
+    db = shared_worker_database(on_snapshot=_publish_job_event)
     minio = MinioDataLakeClient()
     min_review_count = _env_int("MIN_REVIEW_COUNT", 3)
 
@@ -120,7 +194,7 @@ def process_job(run_id: str, store_id: str, url: str, collected_at_iso: str) ->
         crawl_start = _now_ms()
         db.update_snapshot(run_id=run_id, status="crawling", progress=10)
 
-        crawler = NaverMapsCrawler()
+        crawler = NaverMapsCrawler(browser_pool=shared_browser_pool())
         crawl_result = process_crawl(crawler=crawler, minio=minio, parts=parts, run_id=run_id, url=url)
         latest_page_screenshot = crawl_result.get("page_screenshot_bytes")
         safe_store_name = _sanitize_store_name(
@@ -137,6 +211,9 @@ def process_job(run_id: str, store_id: str, url: str, collected_at_iso: str) ->
             transport_info=crawl_result.get("address"),
             lat=crawl_result.get("latitude"),
             lng=crawl_result.get("longitude"),
+            # The projection is refreshed once per run, by the final upsert_store below
+            # (or on final failure), not after every intermediate write.
+            refresh_projection=False,
         )
 
         duration = _now_ms() - crawl_start
@@ -163,6 +240,7 @@ def process_job(run_id: str, store_id: str, url: str, collected_at_iso: str) ->
             status="crawled",
             progress=35,
             bronze_path=crawl_result["bronze_meta_path"],
+            defer=True,
         )
 
         stage = "parse"
@@ -208,6 +286,7 @@ def process_job(run_id: str, store_id: str, url: str, collected_at_iso: str) ->
             progress=65,
             silver_path=parse_result["silver_path"],
             quality_band=parse_quality_band,
+            defer=True,
         )
 
         stage = "llm"
@@ -233,6 +312,12 @@ def process_job(run_id: str, store_id: str, url: str, collected_at_iso: str) ->
 
         categories = llm_result["analysis"].get("categories") or []
         primary_category = categories[0] if isinstance(categories, list) and categories else llm_result["analysis"].get("vibe")
+        display = resolve_display_name(
+            safe_store_name,
+            llm_result["reviews"],
+            store_id=parts.store_id,
+            naver_place_id=crawl_result.get("naver_place_id"),
+        )
         db.upsert_store(
             store_id=parts.store_id,
             url=url,
@@ -243,6 +328,9 @@ def process_job(run_id: str, store_id: str, url: str, collected_at_iso: str) ->
             lat=crawl_result.get("latitude"),
             lng=crawl_result.get("longitude"),
             category=primary_category,
+            display_name=display.name or None,
+            display_name_confidence=display.confidence,
+            display_name_source=display.source,
         )
 
         stage = "embed"
@@ -257,6 +345,9 @@ def process_job(run_id: str, store_id: str, url: str, collected_at_iso: str) ->
             payload={"embedded": embedded},
         )
         db.update_snapshot(run_id=run_id, status="completed", progress=100, gold_path=llm_result["gold_path"])
+        _publish_store_updated(db, run_id=run_id, store_id=parts.store_id)
+        _release_single_flight(db, run_id=run_id, store_id=parts.store_id)
+        _schedule_gold_bundle_compaction(db, run_id=run_id)
 
         return {
             "run_id": run_id,
@@ -289,23 +380,43 @@ def process_job(run_id: str, store_id: str, url: str, collected_at_iso: str) ->
                 )
 
         db.log_event(run_id=run_id, stage=stage, status="failed", duration_ms=0, payload={"error": str(exc)})
+        # While RQ still has retries the run is not over: "retrying" is non-terminal, so
+        # waiters keep waiting and single-flight does not hand the store to a new run.
+        final_attempt = _is_final_attempt()
         db.update_snapshot(
             run_id=run_id,
-            status="failed",
-            progress=100,
+            status="failed" if final_attempt else JOB_RETRYING_STATE,
+            progress=100 if final_attempt else 0,
             error_reason=str(exc),
             error_type=error_type,
             error_stage=error_stage,
             evidence_paths_json=evidence_paths,
             quality_band="insufficient" if isinstance(exc, InsufficientReviewsError) else None,
         )
+        # Keep the claim while RQ still has retries, so resubmissions attach to this run.
+        if final_attempt:
+            try:
+                # Project whatever this run did write (new reviews, store details).
+                db.refresh_store_projection(parts.store_id)
+            except Exception as refresh_exc:
+                db.log_event(
+                    run_id=run_id,
+                    stage="projection",
+                    status="failed",
+                    duration_ms=0,
+                    payload={"error": str(refresh_exc)},
+                )
+            _release_single_flight(db, run_id=run_id, store_id=parts.store_id)
         raise
 
 
 def process_crawl(crawler: NaverMapsCrawler, minio: MinioDataLakeClient, parts: KeyParts, run_id: str, url: str) -> dict:
     crawl_timeout_sec = _env_int("CRAWL_TIMEOUT_SEC", 180)
     try:
-        data = asyncio.run(asyncio.wait_for(crawler.crawl(url=url), timeout=crawl_timeout_sec))
+        if crawler.browser_pool is not None:
+            data = crawler.browser_pool.run(crawler.crawl(url=url), timeout=crawl_timeout_sec)
+        else:
+            data = asyncio.run(asyncio.wait_for(crawler.crawl(url=url), timeout=crawl_timeout_sec))
     except CrawlBlockedError as exc:
         evidence_paths = list(exc.evidence_paths or [])
         try:
@@ -387,7 +498,7 @@ def process_parse(minio: MinioDataLakeClient, db: WorkerDatabase, parts: KeyPart
 
     parsed_reviews = parse_reviews_html(html=html, fallback_reviews=meta.get("reviews", []))
     validate_reviews(parsed_reviews, store_id=parts.store_id, collected_at=parts.collected_at_iso)
-    db.upsert_reviews(store_id=parts.store_id, reviews=parsed_reviews)
+    db.upsert_reviews(store_id=parts.store_id, reviews=parsed_reviews, refresh_projection=False)
 
     silver_key = silver_reviews_jsonl(parts)
     minio.put_bytes(
@@ -471,6 +582,7 @@ def process_llm(
         ad_review_ratio=float(gold_payload["analysis"]["ad_review_ratio"]),
         review_summary=gold_payload["analysis"]["review_summary"],
         categories=gold_payload["analysis"]["categories"],
+        refresh_projection=False,
     )
 
     return {
@@ -478,6 +590,7 @@ def process_llm(
         "chunk_count": analysis["chunk_count"],
         "tokens": analysis["tokens"],
         "analysis": gold_payload["analysis"],
+        "reviews": reviews,
     }
 
 
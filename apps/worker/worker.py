@@ -1,7 +1,18 @@
 import os
 
 from redis import Redis
-from rq import Queue, Worker
+from rq import Queue, SimpleWorker, Worker
+
+from apps.worker.browser_pool import shutdown_shared_browser_pool
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    raw = (os.getenv(name, "true" if default else "false") or "").strip().lower()
+    if raw in {"1", "true", "yes", "y", "on"}:
+        return True
+    if raw in {"0", "false", "no", "n", "off"}:
+        return False
+    return default
 
 
 def main() -> None:
@@ -10,8 +21,15 @@ def main() -> None:
 
     conn = Redis.from_url(redis_url)
     queue = Queue(queue_name, connection=conn)
-    worker = Worker([queue], connection=conn)
-    worker.work(with_scheduler=True)
+    # SimpleWorker runs jobs in this process so pooled DB connections survive across jobs;
+    # set WORKER_REUSE_PROCESS=false to go back to fork-per-job isolation.
+    worker_class = SimpleWorker if _env_bool("WORKER_REUSE_PROCESS", True) else Worker
+    worker = worker_class([queue], connection=conn)
+    try:
+        worker.work(with_scheduler=True)
+    finally:
+        # Close the pooled Chromium (if a job started one) on warm shutdown.
+        shutdown_shared_browser_pool()
 
 
 if __name__ == "__main__":
@@ -315,9 +315,37 @@ function HomeContent() {
     }
   };
 
+  const waitForJobEvents = useCallback(
+    (jobId: string, timeoutMs: number): Promise<{ snapshot: JobSnapshot | null; done: boolean }> =>
+      new Promise((resolve) => {
+        let lastSnapshot: JobSnapshot | null = null;
+        const source = new EventSource(`${API_BASE_URL}/jobs/${jobId}/events`);
+        const finish = (done: boolean) => {
+          clearTimeout(timer);
+          source.close();
+          resolve({ snapshot: lastSnapshot, done });
+        };
+        const timer = setTimeout(() => finish(false), timeoutMs);
+        source.addEventListener("progress", (event) => {
+          lastSnapshot = JSON.parse((event as MessageEvent).data) as JobSnapshot;
+          const state = lastSnapshot.state || lastSnapshot.status;
+          if (state === "completed" || state === "failed") finish(true);
+        });
+        source.addEventListener("timeout", () => finish(false));
+        // Connection errors fall back to polling instead of EventSource's auto-reconnect.
+        source.onerror = () => finish(false);
+      }),
+    [API_BASE_URL]
+  );
+
   const waitForJobCompletion = useCallback(
     async (jobId: string): Promise<JobSnapshot | null> => {
       let lastSnapshot: JobSnapshot | null = null;
+      if (typeof EventSource !== "undefined") {
+        const streamed = await waitForJobEvents(jobId, 90000);
+        if (streamed.done) return streamed.snapshot;
+        lastSnapshot = streamed.snapshot;
+      }
       for (let i = 0; i < 60; i += 1) {
         const res = await fetch(`${API_BASE_URL}/jobs/${jobId}`);
         if (!res.ok) break;
@@ -329,7 +357,7 @@ function HomeContent() {
       }
       return lastSnapshot;
     },
-    [API_BASE_URL]
+    [API_BASE_URL, waitForJobEvents]
   );
 
   const handleAnalyze = async (url: string) => {
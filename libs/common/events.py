@@ -0,0 +1,83 @@
+import json
+import time
+from typing import Any, Iterable
+
+# Serving-cache generations live in Redis so every API replica sees the same
+# invalidation. Bumping a generation makes older cache keys unreachable; they then
+# expire on their own TTL.
+SERVING_EVENTS_CHANNEL = "hidden_spot:events:serving"
+CATALOG_GENERATION_KEY = "hidden_spot:cache:gen:catalog"
+EPOCH_GENERATION_KEY = "hidden_spot:cache:gen:epoch"
+
+
+def store_generation_key(store_id: str) -> str:
+    return f"hidden_spot:cache:gen:store:{store_id}"
+
+
+def publish_store_updated(
+    redis: Any,
+    *,
+    store_ids: Iterable[str],
+    run_id: str | None = None,
+    reason: str = "analysis_completed",
+) -> None:
+    """Invalidate listing/search plus the given stores' detail entries and announce it."""
+    ids = [str(x) for x in dict.fromkeys(store_ids) if str(x or "").strip()]
+    event = {
+        "type": "store_updated",
+        "store_ids": ids,
+        "run_id": run_id,
+        "reason": reason,
+        "ts": time.time(),
+    }
+    pipe = redis.pipeline(transaction=False)
+    pipe.incr(CATALOG_GENERATION_KEY)
+    for store_id in ids:
+        pipe.incr(store_generation_key(store_id))
+    pipe.publish(SERVING_EVENTS_CHANNEL, json.dumps(event, ensure_ascii=False))
+    pipe.execute()
+
+
+def publish_catalog_reset(redis: Any, *, reason: str) -> None:
+    """Invalidate every cached serving response (bulk backfills, projection rebuilds)."""
+    event = {"type": "catalog_reset", "reason": reason, "ts": time.time()}
+    pipe = redis.pipeline(transaction=False)
+    pipe.incr(CATALOG_GENERATION_KEY)
+    pipe.incr(EPOCH_GENERATION_KEY)
+    pipe.publish(SERVING_EVENTS_CHANNEL, json.dumps(event, ensure_ascii=False))
+    pipe.execute()
+
+
+# Job progress: every snapshot transition is published on a per-run channel, and the
+# latest state is kept under a key so late subscribers can start from it without
+# querying Postgres.
+JOB_EVENTS_CHANNEL_PREFIX = "hidden_spot:events:job:"
+JOB_STATE_TTL_SEC = 24 * 3600
+JOB_TERMINAL_STATES = frozenset({"completed", "failed"})
+# Published for a failed attempt while RQ still has retries; waiters keep waiting.
+JOB_RETRYING_STATE = "retrying"
+
+
+def job_events_channel(run_id: str) -> str:
+    return f"{JOB_EVENTS_CHANNEL_PREFIX}{run_id}"
+
+
+def job_state_key(run_id: str) -> str:
+    return f"hidden_spot:jobs:state:{run_id}"
+
+
+def publish_job_event(redis: Any, *, run_id: str, status: str, progress: int, **fields: Any) -> None:
+    event = {
+        "type": "job_progress",
+        "run_id": run_id,
+        "status": status,
+        "state": status,
+        "progress": progress,
+        **fields,
+        "ts": time.time(),
+    }
+    payload = json.dumps(event, ensure_ascii=False)
+    pipe = redis.pipeline(transaction=False)
+    pipe.set(job_state_key(run_id), payload, ex=JOB_STATE_TTL_SEC)
+    pipe.publish(job_events_channel(run_id), payload)
+    pipe.execute()
@@ -0,0 +1,162 @@
+import math
+from typing import Any, Iterable
+
+import psycopg2.extras
+
+# Geohash indexing for map queries. The Postgres image ships pgvector but not PostGIS,
+# so each restaurant_current row carries a geohash (C collation, btree indexed) computed
+# whenever the row is refreshed. A viewport becomes a handful of prefix range scans
+# (`geohash >= prefix AND geohash < prefix || '~'`) followed by an exact lat/lng filter,
+# and clustering is a GROUP BY on a geohash prefix.
+
+GEOHASH_PRECISION = 9
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+EARTH_RADIUS_KM = 6371.0088
+
+GEO_DDL = """
+ALTER TABLE restaurant_current ADD COLUMN IF NOT EXISTS geohash TEXT COLLATE "C";
+
+CREATE INDEX IF NOT EXISTS idx_restaurant_current_geohash
+    ON restaurant_current (geohash)
+    WHERE geohash IS NOT NULL;
+"""
+
+_SOURCE_SQL = """
+SELECT place_key, lat, lng
+FROM restaurant_current
+"""
+
+_UPDATE_SQL = """
+UPDATE restaurant_current rc
+SET geohash = d.geohash
+FROM (VALUES %s) AS d(place_key, geohash)
+WHERE rc.place_key = d.place_key
+  AND rc.geohash IS DISTINCT FROM d.geohash;
+"""
+
+
+def valid_point(lat: Any, lng: Any) -> bool:
+    try:
+        lat_f, lng_f = float(lat), float(lng)
+    except (TypeError, ValueError):
+        return False
+    return -90.0 <= lat_f <= 90.0 and -180.0 <= lng_f <= 180.0 and not (lat_f == 0.0 and lng_f == 0.0)
+
+
+def encode(lat: float, lng: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars: list[str] = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        rng, coord = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if coord >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    """(lat_degrees, lng_degrees) of one geohash cell at `precision`."""
+    total_bits = 5 * precision
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def covering_prefixes(
+    south: float,
+    west: float,
+    north: float,
+    east: float,
+    *,
+    max_cells: int = 32,
+    max_precision: int = 7,
+) -> list[str]:
+    """Geohash prefixes whose cells cover the bbox, at the finest precision that needs
+    at most `max_cells` cells."""
+    precision = 1
+    for candidate in range(max_precision, 0, -1):
+        lat_step, lng_step = cell_size(candidate)
+        rows = math.floor(north / lat_step) - math.floor(south / lat_step) + 1
+        cols = math.floor(east / lng_step) - math.floor(west / lng_step) + 1
+        if rows * cols <= max_cells:
+            precision = candidate
+            break
+    lat_step, lng_step = cell_size(precision)
+    prefixes: list[str] = []
+    lat = south
+    while True:
+        lng = west
+        while True:
+            prefixes.append(encode(min(lat, north), min(lng, east), precision))
+            if lng >= east:
+                break
+            lng += lng_step
+        if lat >= north:
+            break
+        lat += lat_step
+    return list(dict.fromkeys(prefixes))
+
+
+def cluster_precision(zoom: int) -> int:
+    """Geohash precision whose cells are a fraction of a web-map tile at `zoom`."""
+    target_lng_bits = zoom + 4
+    precision = 1
+    for candidate in range(1, GEOHASH_PRECISION + 1):
+        if (5 * candidate + 1) // 2 <= target_lng_bits:
+            precision = candidate
+    return precision
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bbox_around(lat: float, lng: float, radius_km: float) -> tuple[float, float, float, float]:
+    """(south, west, north, east) enclosing a circle of `radius_km`."""
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    dlng = math.degrees(radius_km / (EARTH_RADIUS_KM * max(math.cos(math.radians(lat)), 1e-6)))
+    return max(lat - dlat, -90.0), max(lng - dlng, -180.0), min(lat + dlat, 90.0), min(lng + dlng, 180.0)
+
+
+def _document(row: tuple) -> tuple[str, str | None]:
+    place_key, lat, lng = row
+    return place_key, encode(float(lat), float(lng)) if valid_point(lat, lng) else None
+
+
+def _refresh(cur: Any, where_sql: str, params: tuple) -> int:
+    with cur.connection.cursor() as geo_cur:
+        geo_cur.execute(_SOURCE_SQL + where_sql, params)
+        documents = [_document(row) for row in geo_cur.fetchall()]
+        if documents:
+            psycopg2.extras.execute_values(geo_cur, _UPDATE_SQL, documents, page_size=500)
+    return len(documents)
+
+
+def refresh_places(cur: Any, place_keys: Iterable[str]) -> int:
+    keys = [key for key in dict.fromkeys(place_keys) if key]
+    if not keys:
+        return 0
+    return _refresh(cur, "WHERE place_key = ANY(%s)", (keys,))
+
+
+def refresh_all(cur: Any, *, only_missing: bool = False) -> int:
+    where_sql = "WHERE geohash IS NULL AND lat IS NOT NULL AND lng IS NOT NULL" if only_missing else ""
+    return _refresh(cur, where_sql, ())
@@ -0,0 +1,128 @@
+import gzip
+import hashlib
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Iterator
+
+from libs.common.minio_client import MinioDataLakeClient
+from libs.common.object_keys import gold_bundle_manifest, gold_bundle_ndjson_gz
+
+# Consolidated "latest gold analysis per store" bundle. A cold start reads the manifest
+# and one gzip NDJSON object instead of listing and GETting every gold object.
+#
+# Each line is the original gold payload plus `_key` / `_last_modified` of the object it
+# came from. Compaction is incremental: the previous bundle is loaded and only gold
+# objects modified after its `source_max_last_modified` are fetched. The manifest is
+# written last, so readers always see a complete bundle.
+
+BUNDLE_FORMAT = "ndjson.gz"
+BUNDLE_VERSION = 1
+_GOLD_PREFIX = "gold/analysis/"
+_STORE_ID_RE = re.compile(r"store_id=([^/]+)/")
+
+
+def _store_id_from_key(key: str) -> str | None:
+    match = _STORE_ID_RE.search(key)
+    return match.group(1) if match else None
+
+
+def _iso(value: Any) -> str | None:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).isoformat()
+    return str(value)
+
+
+def read_manifest(minio: MinioDataLakeClient) -> dict[str, Any] | None:
+    key = gold_bundle_manifest()
+    if not minio.object_exists(minio.gold_bucket, key):
+        return None
+    manifest = minio.get_json(minio.gold_bucket, key)
+    if not isinstance(manifest, dict) or manifest.get("version") != BUNDLE_VERSION or not manifest.get("bundle_key"):
+        return None
+    return manifest
+
+
+def iter_bundle(minio: MinioDataLakeClient, manifest: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    data = minio.get_bytes(minio.gold_bucket, manifest["bundle_key"])
+    if manifest.get("sha256") and hashlib.sha256(data).hexdigest() != manifest["sha256"]:
+        raise ValueError(f"gold bundle checksum mismatch key={manifest['bundle_key']}")
+    for line in gzip.decompress(data).decode("utf-8").splitlines():
+        if line.strip():
+            yield json.loads(line)
+
+
+def compact(minio: MinioDataLakeClient, *, fetch_workers: int = 8) -> dict[str, Any]:
+    """Rewrite the bundle with the newest gold object per store; returns the new manifest."""
+    bucket = minio.gold_bucket
+    previous = read_manifest(minio)
+    latest: dict[str, dict[str, Any]] = {}
+    since = None
+    if previous is not None:
+        for record in iter_bundle(minio, previous):
+            store_id = str(record.get("store_id") or _store_id_from_key(record.get("_key") or "") or "")
+            if store_id:
+                latest[store_id] = record
+        since = previous.get("source_max_last_modified")
+
+    objects = minio.list_objects_meta(bucket, _GOLD_PREFIX)
+    max_last_modified = max((_iso(lm) for _, lm in objects if lm is not None), default=since)
+    changed = [(key, lm) for key, lm in objects if since is None or lm is None or _iso(lm) > since]
+
+    # Only the newest changed object per store needs fetching.
+    newest_changed: dict[str, tuple[str, Any]] = {}
+    for key, lm in sorted(changed, key=lambda item: (_iso(item[1]) or "", item[0])):
+        store_id = _store_id_from_key(key)
+        if store_id:
+            newest_changed[store_id] = (key, lm)
+
+    def fetch(item: tuple[str, Any]) -> dict[str, Any] | None:
+        key, lm = item
+        payload = minio.get_json(bucket, key)
+        if not isinstance(payload, dict):
+            return None
+        return {**payload, "_key": key, "_last_modified": _iso(lm)}
+
+    with ThreadPoolExecutor(max_workers=fetch_workers, thread_name_prefix="gold-bundle") as pool:
+        for record in pool.map(fetch, newest_changed.values()):
+            if record is None:
+                continue
+            store_id = str(record.get("store_id") or _store_id_from_key(record["_key"]) or "")
+            current = latest.get(store_id)
+            if current is None or str(record.get("collected_at") or "") >= str(current.get("collected_at") or ""):
+                latest[store_id] = record
+
+    if previous is not None and not newest_changed:
+        return previous
+
+    body = "\n".join(json.dumps(latest[store_id], ensure_ascii=False) for store_id in sorted(latest)) + "\n"
+    data = gzip.compress(body.encode("utf-8"))
+    generated_at = datetime.now(timezone.utc)
+    bundle_key = gold_bundle_ndjson_gz(generated_at.strftime("%Y%m%dT%H%M%S%fZ"))
+    minio.put_bytes(bucket, bundle_key, data, content_type="application/gzip")
+
+    manifest = {
+        "version": BUNDLE_VERSION,
+        "format": BUNDLE_FORMAT,
+        "bundle_key": bundle_key,
+        "previous_key": previous.get("bundle_key") if previous else None,
+        "generated_at": generated_at.isoformat(),
+        "store_count": len(latest),
+        "source_object_count": len(objects),
+        "source_max_last_modified": max_last_modified,
+        "bytes": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+    }
+    minio.put_json(bucket, gold_bundle_manifest(), manifest)
+
+    # Keep the previous bundle for readers that fetched the old manifest; drop the one before.
+    stale_key = previous.get("previous_key") if previous else None
+    if stale_key and stale_key not in {bundle_key, manifest["previous_key"]}:
+        try:
+            minio.remove_object(bucket, stale_key)
+        except Exception:
+            pass
+    return manifest
@@ -25,6 +25,8 @@ class MinioDataLakeClient:
         self.artifacts_bucket = os.getenv("MINIO_BUCKET_ARTIFACTS", "hidden-spot-artifacts")
 
         http_client = urllib3.PoolManager(
+            # Sized for the parallel gold backfill; urllib3 defaults to 10 connections per host.
+            maxsize=int(os.getenv("MINIO_HTTP_POOL_SIZE", "16")),
             timeout=urllib3.Timeout(connect=5.0, read=20.0),
             retries=urllib3.Retry(total=1, backoff_factor=0.2),
         )
@@ -72,6 +74,9 @@ class MinioDataLakeClient:
     def get_gzip_text(self, bucket: str, key: str) -> str:
         return gzip.decompress(self.get_bytes(bucket, key)).decode("utf-8")
 
+    def remove_object(self, bucket: str, key: str) -> None:
+        self.client.remove_object(bucket, key)
+
     def object_exists(self, bucket: str, key: str) -> bool:
         try:
             self.client.stat_object(bucket, key)
@@ -83,3 +88,10 @@ class MinioDataLakeClient:
 
     def list_keys(self, bucket: str, prefix: str) -> list[str]:
         return [obj.object_name for obj in self.client.list_objects(bucket, prefix=prefix, recursive=True)]
+
+    def list_objects_meta(self, bucket: str, prefix: str) -> list[tuple[str, Any]]:
+        """(key, last_modified) for every object under prefix."""
+        return [
+            (obj.object_name, obj.last_modified)
+            for obj in self.client.list_objects(bucket, prefix=prefix, recursive=True)
+        ]
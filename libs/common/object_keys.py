@@ -57,3 +57,14 @@ def artifacts_debug_blocked_png(parts: KeyParts) -> str:
 def artifacts_debug_final_failure_png(parts: KeyParts) -> str:
     _require(parts)
     return f"artifacts/debug/store_id={parts.store_id}/dt={parts.dt}/run_id={parts.run_id}/final_failure.png"
+
+
+GOLD_BUNDLE_PREFIX = "gold/bundles/latest_by_store/"
+
+
+def gold_bundle_ndjson_gz(generated_at_compact: str) -> str:
+    return f"{GOLD_BUNDLE_PREFIX}bundle-{generated_at_compact}.ndjson.gz"
+
+
+def gold_bundle_manifest() -> str:
+    return f"{GOLD_BUNDLE_PREFIX}manifest.json"
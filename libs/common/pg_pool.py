@@ -0,0 +1,283 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable
+
+import psycopg2
+import psycopg2.extensions
+
+
+class PoolTimeoutError(RuntimeError):
+    pass
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = (os.getenv(name, str(default)) or "").strip()
+    try:
+        value = int(raw)
+    except ValueError:
+        return default
+    return value if value >= 0 else default
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = (os.getenv(name, str(default)) or "").strip()
+    try:
+        value = float(raw)
+    except ValueError:
+        return default
+    return value if value >= 0 else default
+
+
+class PgConnectionPool:
+    """Thread-safe, fork-aware pool of long-lived psycopg2 connections.
+
+    - Connections are created lazily up to `max_size`; `warm()` opens `min_size` eagerly.
+    - Checkout blocks up to `checkout_timeout_sec` when the pool is saturated.
+    - Connections idle longer than `healthcheck_idle_sec` are probed with `SELECT 1` on checkout.
+    - `statement_timeout_ms` is applied per session so a slow query cannot pin a slot forever.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        *,
+        min_size: int = 1,
+        max_size: int = 10,
+        checkout_timeout_sec: float = 5.0,
+        connect_timeout_sec: int = 5,
+        statement_timeout_ms: int = 15000,
+        healthcheck_idle_sec: float = 30.0,
+        max_idle_sec: float = 300.0,
+        application_name: str = "hidden_spot",
+        connection_factory: Any | None = None,
+        on_checkout: Callable[[float], None] | None = None,
+    ) -> None:
+        self.dsn = dsn
+        self.max_size = max(1, max_size)
+        self.min_size = max(0, min(min_size, self.max_size))
+        self.checkout_timeout_sec = checkout_timeout_sec
+        self.connect_timeout_sec = connect_timeout_sec
+        self.statement_timeout_ms = statement_timeout_ms
+        self.healthcheck_idle_sec = healthcheck_idle_sec
+        self.max_idle_sec = max_idle_sec
+        self.application_name = application_name
+        self.connection_factory = connection_factory
+        self.on_checkout = on_checkout
+
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+        # LIFO so the hottest connections are reused and cold ones age out.
+        self._idle: deque[tuple[Any, float]] = deque()
+        self._in_use = 0
+        self._pid = os.getpid()
+
+        self._created = 0
+        self._closed = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._healthcheck_failures = 0
+        self._wait_ms_total = 0.0
+        self._wait_ms_max = 0.0
+
+    @classmethod
+    def from_env(
+        cls,
+        dsn: str,
+        *,
+        prefix: str = "DB_POOL",
+        default_min_size: int = 1,
+        default_max_size: int = 10,
+        **overrides: Any,
+    ) -> "PgConnectionPool":
+        options: dict[str, Any] = {
+            "min_size": _env_int(f"{prefix}_MIN_SIZE", default_min_size),
+            "max_size": _env_int(f"{prefix}_MAX_SIZE", default_max_size),
+            "checkout_timeout_sec": _env_float(f"{prefix}_CHECKOUT_TIMEOUT_SEC", 5.0),
+            "connect_timeout_sec": _env_int("DB_CONNECT_TIMEOUT_SEC", 5),
+            "statement_timeout_ms": _env_int("DB_STATEMENT_TIMEOUT_MS", 15000),
+            "healthcheck_idle_sec": _env_float(f"{prefix}_HEALTHCHECK_IDLE_SEC", 30.0),
+            "max_idle_sec": _env_float(f"{prefix}_MAX_IDLE_SEC", 300.0),
+        }
+        options.update(overrides)
+        return cls(dsn, **options)
+
+    def _connect(self):
+        kwargs: dict[str, Any] = {
+            "connect_timeout": self.connect_timeout_sec,
+            "application_name": self.application_name,
+        }
+        if self.statement_timeout_ms > 0:
+            kwargs["options"] = f"-c statement_timeout={self.statement_timeout_ms}"
+        if self.connection_factory is not None:
+            kwargs["connection_factory"] = self.connection_factory
+        conn = psycopg2.connect(self.dsn, **kwargs)
+        with self._lock:
+            self._created += 1
+        return conn
+
+    def _discard(self, conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._closed += 1
+
+    def _reset_after_fork(self) -> None:
+        # Sockets inherited from the parent process must never be used (or closed) by the child.
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._idle.clear()
+            self._in_use = 0
+            self._slots = threading.BoundedSemaphore(self.max_size)
+
+    def _is_usable(self, conn, idle_since: float) -> bool:
+        if conn.closed:
+            return False
+        if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            return False
+        if time.monotonic() - idle_since < self.healthcheck_idle_sec:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            with self._lock:
+                self._healthcheck_failures += 1
+            return False
+
+    def _acquire_slot(self) -> None:
+        if self._slots.acquire(blocking=False):
+            return
+        started = time.perf_counter()
+        with self._lock:
+            self._waits += 1
+        acquired = self._slots.acquire(timeout=self.checkout_timeout_sec)
+        waited_ms = (time.perf_counter() - started) * 1000.0
+        with self._lock:
+            self._wait_ms_total += waited_ms
+            self._wait_ms_max = max(self._wait_ms_max, waited_ms)
+            if not acquired:
+                self._timeouts += 1
+        if not acquired:
+            raise PoolTimeoutError(
+                f"database pool exhausted: max_size={self.max_size} waited_ms={int(waited_ms)}"
+            )
+
+    def getconn(self):
+        self._reset_after_fork()
+        started = time.perf_counter()
+        self._acquire_slot()
+        try:
+            conn = None
+            while conn is None:
+                with self._lock:
+                    item = self._idle.pop() if self._idle else None
+                if item is None:
+                    conn = self._connect()
+                    break
+                candidate, idle_since = item
+                if self._is_usable(candidate, idle_since):
+                    conn = candidate
+                else:
+                    self._discard(candidate)
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+        if self.on_checkout is not None:
+            try:
+                self.on_checkout(time.perf_counter() - started)
+            except Exception:
+                pass
+        return conn
+
+    def putconn(self, conn, *, discard: bool = False) -> None:
+        if self._pid != os.getpid():
+            return
+        now = time.monotonic()
+        reusable = (
+            not discard
+            and not conn.closed
+            and conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        )
+        stale: list[Any] = []
+        with self._lock:
+            self._in_use = max(0, self._in_use - 1)
+            if reusable:
+                self._idle.append((conn, now))
+            # Trim connections that have been idle for too long, keeping min_size warm.
+            while len(self._idle) > self.min_size and now - self._idle[0][1] > self.max_idle_sec:
+                stale.append(self._idle.popleft()[0])
+        if not reusable:
+            self._discard(conn)
+        for item in stale:
+            self._discard(item)
+        self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        conn = self.getconn()
+        broken = False
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+            raise
+        finally:
+            self.putconn(conn, discard=broken or conn.closed != 0)
+
+    def warm(self) -> int:
+        opened: list[Any] = []
+        try:
+            for _ in range(self.min_size):
+                opened.append(self.getconn())
+        finally:
+            for conn in opened:
+                self.putconn(conn)
+        return len(opened)
+
+    def close(self) -> None:
+        with self._lock:
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+        for conn in idle:
+            self._discard(conn)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            idle = len(self._idle)
+            in_use = self._in_use
+            checkouts = self._checkouts
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "open": idle + in_use,
+                "idle": idle,
+                "in_use": in_use,
+                "saturation": round(in_use / self.max_size, 4),
+                "checkouts": checkouts,
+                "waits": self._waits,
+                "wait_ratio": round(self._waits / checkouts, 4) if checkouts else 0.0,
+                "timeouts": self._timeouts,
+                "wait_ms_total": round(self._wait_ms_total, 3),
+                "wait_ms_max": round(self._wait_ms_max, 3),
+                "created": self._created,
+                "closed": self._closed,
+                "healthcheck_failures": self._healthcheck_failures,
+            }
@@ -0,0 +1,319 @@
+from typing import Any, Iterable
+
+from libs.common import geo, restaurant_shape, search_documents
+
+# `restaurant_current` keeps one denormalized row per canonical place
+# (naver_place_id when known, store_id otherwise). Writers (worker, backfill, admin)
+# refresh affected places in the same transaction as their base-table writes, so
+# serving reads are simple indexed scans instead of DISTINCT ON over analysis history.
+
+PROJECTION_TABLE = "restaurant_current"
+
+PROJECTION_COLUMNS = (
+    "place_key",
+    "store_id",
+    "run_id",
+    "collected_at",
+    "summary_3lines",
+    "vibe",
+    "signature_menu_json",
+    "tips_json",
+    "review_summary_json",
+    "categories_json",
+    "score",
+    "ad_review_ratio",
+    "url",
+    "naver_place_id",
+    "name",
+    "display_name",
+    "address",
+    "transport_info",
+    "raw_reviews_json",
+    "lat",
+    "lng",
+    "category",
+    "updated_at",
+)
+
+PROJECTION_DDL = """
+CREATE TABLE IF NOT EXISTS restaurant_current (
+    place_key TEXT PRIMARY KEY,
+    store_id TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    collected_at TIMESTAMPTZ,
+    summary_3lines TEXT,
+    vibe TEXT,
+    signature_menu_json JSONB,
+    tips_json JSONB,
+    review_summary_json JSONB,
+    categories_json JSONB,
+    score DOUBLE PRECISION,
+    ad_review_ratio DOUBLE PRECISION,
+    url TEXT,
+    naver_place_id TEXT,
+    name TEXT,
+    address TEXT,
+    transport_info TEXT,
+    raw_reviews_json JSONB NOT NULL DEFAULT '[]'::jsonb,
+    lat DOUBLE PRECISION,
+    lng DOUBLE PRECISION,
+    category TEXT,
+    updated_at TIMESTAMPTZ NOT NULL,
+    refreshed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE restaurant_current ADD COLUMN IF NOT EXISTS display_name TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_restaurant_current_updated
+    ON restaurant_current (updated_at DESC, store_id DESC);
+CREATE INDEX IF NOT EXISTS idx_restaurant_current_score
+    ON restaurant_current (score DESC) INCLUDE (updated_at, store_id);
+CREATE INDEX IF NOT EXISTS idx_restaurant_current_category
+    ON restaurant_current (category, updated_at DESC) INCLUDE (store_id, score);
+CREATE INDEX IF NOT EXISTS idx_restaurant_current_store_id
+    ON restaurant_current (store_id);
+
+-- Catalog version stamp: bumped by every projection change, read by the API for ETags.
+CREATE TABLE IF NOT EXISTS catalog_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    version BIGINT NOT NULL DEFAULT 0,
+    row_count BIGINT NOT NULL DEFAULT 0,
+    changed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+INSERT INTO catalog_version (id) VALUES (TRUE) ON CONFLICT (id) DO NOTHING;
+""" + search_documents.SEARCH_DDL + restaurant_shape.SHAPE_DDL + geo.GEO_DDL
+
+# Base-table indexes that keep per-place refreshes cheap.
+BASE_INDEX_DDL = """
+CREATE INDEX IF NOT EXISTS idx_stores_place_key
+    ON stores ((COALESCE(NULLIF(naver_place_id, ''), store_id)));
+CREATE INDEX IF NOT EXISTS idx_analysis_store_updated
+    ON analysis (store_id, updated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_reviews_store_created
+    ON reviews (store_id, created_at DESC);
+"""
+
+_PLACE_KEY_SQL = "COALESCE(NULLIF(s.naver_place_id, ''), s.store_id)"
+
+
+def _projection_select(where_sql: str = "") -> str:
+    return f"""
+    WITH latest AS (
+        SELECT DISTINCT ON (a.store_id)
+            {_PLACE_KEY_SQL} AS place_key,
+            a.store_id,
+            a.run_id,
+            a.collected_at,
+            a.summary_3lines,
+            a.vibe,
+            a.signature_menu_json,
+            a.tips_json,
+            a.review_summary_json,
+            a.categories_json,
+            a.score,
+            a.ad_review_ratio,
+            s.url,
+            s.naver_place_id,
+            s.name,
+            s.display_name,
+            s.address,
+            s.transport_info,
+            s.lat,
+            s.lng,
+            s.category,
+            a.updated_at
+        FROM analysis a
+        JOIN stores s ON s.store_id = a.store_id
+        {where_sql}
+        ORDER BY a.store_id, a.updated_at DESC
+    ),
+    by_place AS (
+        SELECT DISTINCT ON (place_key)
+            *
+        FROM latest
+        ORDER BY
+            place_key,
+            CASE
+                WHEN COALESCE(display_name, '') <> '' THEN 0
+                WHEN COALESCE(name, '') = '' THEN 1
+                WHEN lower(COALESCE(name, '')) = lower(COALESCE(store_id, '')) THEN 1
+                WHEN lower(COALESCE(name, '')) = lower(COALESCE(naver_place_id, '')) THEN 1
+                ELSE 0
+            END,
+            updated_at DESC
+    )
+    SELECT
+        bp.place_key,
+        bp.store_id,
+        bp.run_id,
+        bp.collected_at,
+        bp.summary_3lines,
+        bp.vibe,
+        bp.signature_menu_json,
+        bp.tips_json,
+        bp.review_summary_json,
+        bp.categories_json,
+        bp.score,
+        bp.ad_review_ratio,
+        bp.url,
+        bp.naver_place_id,
+        bp.name,
+        bp.display_name,
+        bp.address,
+        bp.transport_info,
+        (
+            SELECT COALESCE(jsonb_agg(rv.text), '[]'::jsonb)
+            FROM (
+                SELECT r.text
+                FROM reviews r
+                WHERE r.store_id = bp.store_id
+                ORDER BY r.created_at DESC
+                LIMIT 100
+            ) rv
+        ) AS raw_reviews_json,
+        bp.lat,
+        bp.lng,
+        bp.category,
+        bp.updated_at
+    FROM by_place bp
+    """
+
+
+_INSERT_COLUMNS = ", ".join(PROJECTION_COLUMNS)
+_UPDATE_ASSIGNMENTS = ",\n        ".join(
+    f"{col} = EXCLUDED.{col}" for col in PROJECTION_COLUMNS if col != "place_key"
+)
+
+_CHANGE_COLUMNS = [col for col in PROJECTION_COLUMNS if col != "place_key"]
+
+# Rows whose projected columns are unchanged are left alone (no new tuple, no bump);
+# the counts let the caller skip the derived documents and keep row_count current.
+_REFRESH_PLACE_SQL = f"""
+WITH fresh AS (
+    {_projection_select(f"WHERE {_PLACE_KEY_SQL} = %(place_key)s")}
+),
+removed AS (
+    DELETE FROM restaurant_current rc
+    WHERE rc.place_key = %(place_key)s
+      AND NOT EXISTS (SELECT 1 FROM fresh)
+    RETURNING rc.place_key
+),
+upserted AS (
+    INSERT INTO restaurant_current ({_INSERT_COLUMNS}, refreshed_at)
+    SELECT {_INSERT_COLUMNS}, NOW() FROM fresh
+    ON CONFLICT (place_key)
+    DO UPDATE SET
+        {_UPDATE_ASSIGNMENTS},
+        refreshed_at = NOW()
+    WHERE ({", ".join(f"restaurant_current.{col}" for col in _CHANGE_COLUMNS)})
+        IS DISTINCT FROM ({", ".join(f"EXCLUDED.{col}" for col in _CHANGE_COLUMNS)})
+    RETURNING (xmax = 0) AS inserted
+)
+SELECT
+    (SELECT COUNT(*) FROM removed) AS removed,
+    (SELECT COUNT(*) FROM upserted WHERE inserted) AS inserted,
+    (SELECT COUNT(*) FROM upserted WHERE NOT inserted) AS updated;
+"""
+
+_AFFECTED_PLACES_SQL = f"""
+SELECT place_key FROM restaurant_current WHERE store_id = ANY(%s)
+UNION
+SELECT {_PLACE_KEY_SQL} FROM stores s WHERE s.store_id = ANY(%s);
+"""
+
+
+_PLACE_STORES_SQL = f"""
+SELECT s.store_id FROM stores s WHERE {_PLACE_KEY_SQL} = ANY(%s)
+UNION
+SELECT store_id FROM restaurant_current WHERE place_key = ANY(%s);
+"""
+
+
+def bump_catalog_version(cur: Any, *, row_delta: int = 0, row_count: int | None = None) -> None:
+    """Advance the catalog stamp. Runs last in the writer's transaction so the row lock
+    is held only until commit, and readers never see a new stamp before the new rows.
+
+    row_count is kept incrementally from the writer's own insert/delete counts; pass
+    `row_count` when the writer knows the exact total (a full rebuild)."""
+    if row_count is not None:
+        cur.execute(
+            "UPDATE catalog_version SET version = version + 1, row_count = %s, changed_at = NOW() WHERE id;",
+            (row_count,),
+        )
+        return
+    cur.execute(
+        """
+        UPDATE catalog_version
+        SET version = version + 1,
+            row_count = GREATEST(row_count + %s, 0),
+            changed_at = NOW()
+        WHERE id;
+        """,
+        (row_delta,),
+    )
+
+
+def affected_place_keys(cur: Any, store_ids: Iterable[str]) -> list[str]:
+    ids = [str(x) for x in dict.fromkeys(store_ids) if str(x or "").strip()]
+    if not ids:
+        return []
+    cur.execute(_AFFECTED_PLACES_SQL, (ids, ids))
+    return [row[0] if isinstance(row, tuple) else row["place_key"] for row in cur.fetchall()]
+
+
+def place_store_ids(cur: Any, store_ids: Iterable[str]) -> list[str]:
+    """Every store sharing a place with the given stores; detail reads of any of them
+    resolve to the same projection row."""
+    keys = affected_place_keys(cur, store_ids)
+    if not keys:
+        return [str(x) for x in dict.fromkeys(store_ids) if str(x or "").strip()]
+    cur.execute(_PLACE_STORES_SQL, (keys, keys))
+    siblings = [row[0] if isinstance(row, tuple) else row["store_id"] for row in cur.fetchall()]
+    return list(dict.fromkeys([*store_ids, *siblings]))
+
+
+def refresh_places(cur: Any, place_keys: Iterable[str], *, force: bool = False) -> int:
+    """Recompute projection rows; returns how many places changed.
+
+    Derived documents are rebuilt and the catalog stamp bumped only for places whose row
+    was inserted, updated or removed. `force` rebuilds the documents for every key even
+    when the row is unchanged (their inputs also include legacy payloads)."""
+    keys = [place_key for place_key in dict.fromkeys(place_keys) if place_key]
+    changed: list[str] = []
+    row_delta = 0
+    for place_key in keys:
+        cur.execute(_REFRESH_PLACE_SQL, {"place_key": place_key})
+        row = cur.fetchone()
+        removed, inserted, updated = (row["removed"], row["inserted"], row["updated"]) if isinstance(row, dict) else row
+        row_delta += inserted - removed
+        if removed or inserted or updated:
+            changed.append(place_key)
+    targets = keys if force else changed
+    if not targets:
+        return 0
+    search_documents.refresh_places(cur, targets)
+    restaurant_shape.refresh_places(cur, targets)
+    geo.refresh_places(cur, targets)
+    bump_catalog_version(cur, row_delta=row_delta)
+    return len(targets)
+
+
+def refresh_stores(cur: Any, store_ids: Iterable[str], *, force: bool = False) -> int:
+    """Recompute projection rows for every place the given stores map (or used to map) to."""
+    return refresh_places(cur, affected_place_keys(cur, store_ids), force=force)
+
+
+def rebuild(cur: Any) -> int:
+    cur.execute("DELETE FROM restaurant_current;")
+    cur.execute(
+        f"""
+        INSERT INTO restaurant_current ({_INSERT_COLUMNS}, refreshed_at)
+        SELECT {_INSERT_COLUMNS}, NOW() FROM ({_projection_select()}) src;
+        """
+    )
+    rows = cur.rowcount
+    search_documents.refresh_all(cur)
+    restaurant_shape.refresh_all(cur)
+    geo.refresh_all(cur)
+    bump_catalog_version(cur, row_count=rows)
+    return rows
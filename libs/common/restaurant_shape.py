@@ -0,0 +1,258 @@
+import json
+from datetime import date, datetime
+from typing import Any, Iterable
+
+import psycopg2.extras
+
+# Pre-shaped API documents. `restaurant_current.restaurant_json` holds the exact
+# /api/v1/restaurants item for the place, computed whenever the projection row is
+# refreshed, so reads return the column as-is instead of merging nested JSON per request.
+#
+# Fields from the legacy frontend/src/data/restaurants.json are loaded once into
+# `legacy_restaurants` (keyed like the old in-process index: naver_place_id, else id)
+# and used as fallbacks while shaping.
+
+SHAPE_DDL = """
+CREATE TABLE IF NOT EXISTS legacy_restaurants (
+    store_id TEXT PRIMARY KEY,
+    payload JSONB NOT NULL,
+    loaded_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE restaurant_current ADD COLUMN IF NOT EXISTS restaurant_json JSONB;
+"""
+
+MANUAL_TASTE_PROFILE_OVERRIDES: dict[str, dict[str, Any]] = {
+    # 뼈탄집 성수역점: default "실사용 기반 후기 혼합" 템플릿 대신
+    # 실제 리뷰 맥락을 반영한 동적 맛 분석으로 보정.
+    "1928780548": {
+        "category_name": "직원 그릴링 기반 숙성 삼겹 전문점",
+        "metrics": [
+            {
+                "label": "고기 익힘 완성도",
+                "text": "직원 그릴링 비중이 높아 두툼한 숙성 삼겹의 육즙과 식감이 안정적으로 유지됩니다.",
+                "score": 5,
+            },
+            {
+                "label": "곁들임 조합력",
+                "text": "백김치·명이나물·고추절임 등 곁들임 반찬이 기름진 풍미를 균형감 있게 정리해 줍니다.",
+                "score": 5,
+            },
+            {
+                "label": "공간/서비스 만족도",
+                "text": "청결한 매장과 친절한 응대 언급이 많고, 데이트·모임 모두 무난하다는 평가가 반복됩니다.",
+                "score": 4,
+            },
+            {
+                "label": "재방문 가능성",
+                "text": "재방문과 추천 의도가 높게 나타나며, 피크 시간대에는 예약 방문 시 체감 만족도가 더 높습니다.",
+                "score": 4,
+            },
+        ],
+    }
+}
+
+
+def _needs_taste_profile_override(summary_json: dict[str, Any]) -> bool:
+    taste = summary_json.get("taste_profile") if isinstance(summary_json.get("taste_profile"), dict) else {}
+    category_name = str(taste.get("category_name") or "").strip()
+    metrics = taste.get("metrics") if isinstance(taste.get("metrics"), list) else []
+    has_generic_tag = any(str(tag).strip() == "#실사용기반후기혼합" for tag in (summary_json.get("tags") or []))
+    is_generic_category = category_name in {"", "실사용 기반 후기 혼합", "processing"}
+    return is_generic_category or (has_generic_tag and len(metrics) > 0)
+
+
+def apply_manual_taste_profile_override(summary_json: dict[str, Any], *, naver_place_id: str) -> None:
+    override = MANUAL_TASTE_PROFILE_OVERRIDES.get(naver_place_id)
+    if not override:
+        return
+    if not _needs_taste_profile_override(summary_json):
+        return
+    summary_json["taste_profile"] = {
+        "category_name": str(override.get("category_name") or "").strip(),
+        "metrics": override.get("metrics") if isinstance(override.get("metrics"), list) else [],
+    }
+
+
+def shape_restaurant(row: dict[str, Any], legacy: dict[str, Any] | None = None) -> dict[str, Any]:
+    """API restaurant shape for a restaurant_current row, with legacy fields as fallbacks."""
+    legacy = legacy if isinstance(legacy, dict) else {}
+    legacy_summary = legacy.get("summary_json") if isinstance(legacy.get("summary_json"), dict) else {}
+    db_summary = row.get("review_summary_json") if isinstance(row.get("review_summary_json"), dict) else {}
+    db_taste = db_summary.get("taste_profile") if isinstance(db_summary.get("taste_profile"), dict) else {}
+    legacy_taste = legacy_summary.get("taste_profile") if isinstance(legacy_summary.get("taste_profile"), dict) else {}
+
+    summary_json = {
+        "one_line_copy": str(
+            db_summary.get("one_line_copy")
+            or row.get("summary_3lines")
+            or legacy_summary.get("one_line_copy")
+            or ""
+        ).strip(),
+        "tags": db_summary.get("tags") if isinstance(db_summary.get("tags"), list) else legacy_summary.get("tags") if isinstance(legacy_summary.get("tags"), list) else [],
+        "taste_profile": {
+            "category_name": str(
+                db_taste.get("category_name")
+                or row.get("vibe")
+                or legacy_taste.get("category_name")
+                or ""
+            ).strip(),
+            "metrics": db_taste.get("metrics") if isinstance(db_taste.get("metrics"), list) else legacy_taste.get("metrics") if isinstance(legacy_taste.get("metrics"), list) else [],
+        },
+        "pro_tips": db_summary.get("pro_tips") if isinstance(db_summary.get("pro_tips"), list) else row.get("tips_json") if isinstance(row.get("tips_json"), list) else legacy_summary.get("pro_tips") if isinstance(legacy_summary.get("pro_tips"), list) else [],
+        "negative_points": db_summary.get("negative_points") if isinstance(db_summary.get("negative_points"), list) else legacy_summary.get("negative_points") if isinstance(legacy_summary.get("negative_points"), list) else [],
+    }
+
+    signature_menu = row.get("signature_menu_json") if isinstance(row.get("signature_menu_json"), list) else legacy.get("must_eat_menus") if isinstance(legacy.get("must_eat_menus"), list) else []
+    categories = row.get("categories_json") if isinstance(row.get("categories_json"), list) else []
+
+    db_reviews = row.get("raw_reviews_json") if isinstance(row.get("raw_reviews_json"), list) else []
+    legacy_reviews = legacy.get("raw_reviews") if isinstance(legacy.get("raw_reviews"), list) else []
+    merged_reviews = db_reviews if db_reviews else legacy_reviews
+
+    naver_place_id = str(row.get("naver_place_id") or legacy.get("naver_place_id") or row.get("store_id") or "").strip()
+    apply_manual_taste_profile_override(summary_json, naver_place_id=naver_place_id)
+    # display_name is resolved at write time (worker / reparse_store_names).
+    name = str(row.get("display_name") or "").strip() or "이름 확인 중"
+
+    address = str(row.get("address") or legacy.get("address") or "").strip()
+    search_tags: list[str] = []
+    search_tags.extend([str(x).strip() for x in signature_menu if str(x).strip()])
+    search_tags.extend([str(x).strip() for x in categories if str(x).strip()])
+    if name and name != "이름 확인 중":
+        search_tags.append(name)
+    if address:
+        search_tags.append(address)
+    if isinstance(legacy.get("search_tags"), list):
+        search_tags.extend([str(x).strip() for x in legacy.get("search_tags") if str(x).strip()])
+    seen = set()
+    dedup_tags: list[str] = []
+    for tag in search_tags:
+        if tag in seen:
+            continue
+        seen.add(tag)
+        dedup_tags.append(tag)
+
+    return {
+        "id": row.get("store_id"),
+        "naver_place_id": naver_place_id,
+        "name": name,
+        "address": address,
+        "latitude": float(row.get("lat")) if row.get("lat") is not None else float(legacy.get("latitude") or 37.5665),
+        "longitude": float(row.get("lng")) if row.get("lng") is not None else float(legacy.get("longitude") or 126.9780),
+        "ai_score": float(row.get("score") or 0),
+        "ad_review_ratio": float(row.get("ad_review_ratio") or 0),
+        "category": row.get("category") or summary_json["taste_profile"]["category_name"] or "",
+        "categories": categories,
+        "analysis_run_id": row.get("run_id"),
+        "updated_at": row.get("updated_at"),
+        "transport_info": str(row.get("transport_info") or legacy.get("transport_info") or address),
+        "summary_json": summary_json,
+        "must_eat_menus": signature_menu,
+        "search_tags": dedup_tags,
+        "original_url": row.get("url") or legacy.get("original_url") or "",
+        "created_at": row.get("collected_at"),
+        "raw_reviews": merged_reviews,
+    }
+
+
+_SOURCE_SQL = """
+SELECT
+    rc.place_key,
+    rc.store_id,
+    rc.run_id,
+    rc.collected_at,
+    rc.summary_3lines,
+    rc.vibe,
+    rc.signature_menu_json,
+    rc.tips_json,
+    rc.review_summary_json,
+    rc.categories_json,
+    rc.score,
+    rc.ad_review_ratio,
+    rc.url,
+    rc.naver_place_id,
+    rc.display_name,
+    rc.address,
+    rc.transport_info,
+    rc.raw_reviews_json,
+    rc.lat,
+    rc.lng,
+    rc.category,
+    rc.updated_at,
+    lr.payload AS legacy_json
+FROM restaurant_current rc
+LEFT JOIN legacy_restaurants lr ON lr.store_id = rc.store_id
+"""
+
+_UPDATE_SQL = """
+UPDATE restaurant_current rc
+SET restaurant_json = d.doc::jsonb
+FROM (VALUES %s) AS d(place_key, doc)
+WHERE rc.place_key = d.place_key;
+"""
+
+_UPSERT_LEGACY_SQL = """
+INSERT INTO legacy_restaurants (store_id, payload, loaded_at)
+VALUES %s
+ON CONFLICT (store_id)
+DO UPDATE SET payload = EXCLUDED.payload, loaded_at = NOW()
+WHERE legacy_restaurants.payload IS DISTINCT FROM EXCLUDED.payload
+RETURNING store_id;
+"""
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"unsupported type {type(value).__name__}")
+
+
+def _refresh(cur: Any, where_sql: str, params: tuple) -> int:
+    with cur.connection.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as doc_cur:
+        doc_cur.execute(_SOURCE_SQL + where_sql, params)
+        documents = [
+            (
+                row["place_key"],
+                json.dumps(shape_restaurant(row, row.get("legacy_json")), ensure_ascii=False, default=_json_default),
+            )
+            for row in doc_cur.fetchall()
+        ]
+        if documents:
+            psycopg2.extras.execute_values(doc_cur, _UPDATE_SQL, documents, page_size=500)
+    return len(documents)
+
+
+def refresh_places(cur: Any, place_keys: Iterable[str]) -> int:
+    keys = [key for key in dict.fromkeys(place_keys) if key]
+    if not keys:
+        return 0
+    return _refresh(cur, "WHERE rc.place_key = ANY(%s)", (keys,))
+
+
+def refresh_all(cur: Any, *, only_missing: bool = False) -> int:
+    return _refresh(cur, "WHERE rc.restaurant_json IS NULL" if only_missing else "", ())
+
+
+def legacy_key(row: dict[str, Any]) -> str:
+    return str(row.get("naver_place_id") or row.get("id") or "").strip()
+
+
+def upsert_legacy(cur: Any, rows: Iterable[dict[str, Any]]) -> list[str]:
+    """Store legacy payloads; returns the store ids whose payload actually changed."""
+    values: dict[str, str] = {}
+    for row in rows:
+        key = legacy_key(row) if isinstance(row, dict) else ""
+        if key:
+            values[key] = json.dumps(row, ensure_ascii=False)
+    if not values:
+        return []
+    changed = psycopg2.extras.execute_values(
+        cur,
+        _UPSERT_LEGACY_SQL,
+        list(values.items()),
+        template="(%s, %s::jsonb, NOW())",
+        page_size=500,
+        fetch=True,
+    )
+    return [row[0] for row in changed]
@@ -0,0 +1,65 @@
+import hashlib
+from typing import Any, Sequence
+
+# Boot-time DDL is gated by a stored version: each component (api, worker) records a
+# hash of the DDL it last applied, and startup only re-runs the DDL when that hash
+# changes. Replicas booting together serialize on an advisory lock, so one applies the
+# DDL and the rest see the new version and skip it.
+
+_LOCK_ID = 0x68737063  # "hspc"
+
+_TABLE_DDL = """
+CREATE TABLE IF NOT EXISTS schema_versions (
+    component TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+"""
+
+
+def ddl_version(statements: Sequence[str]) -> str:
+    digest = hashlib.sha256()
+    for statement in statements:
+        digest.update(" ".join(statement.split()).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def stored_version(cur: Any, component: str) -> str | None:
+    cur.execute("SELECT to_regclass('public.schema_versions') IS NOT NULL")
+    if not cur.fetchone()[0]:
+        return None
+    cur.execute("SELECT version FROM schema_versions WHERE component = %s", (component,))
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def ensure_schema(conn: Any, component: str, statements: Sequence[str], *, force: bool = False) -> bool:
+    """Apply `statements` unless `component` already recorded this DDL version.
+
+    Returns True when the DDL ran. The caller's connection context commits.
+    """
+    version = ddl_version(statements)
+    with conn.cursor() as cur:
+        if not force and stored_version(cur, component) == version:
+            return False
+        cur.execute("SELECT pg_advisory_xact_lock(%s)", (_LOCK_ID,))
+        if not force and stored_version(cur, component) == version:
+            return False
+        for statement in statements:
+            cur.execute(statement)
+        record_version(cur, component, version)
+    return True
+
+
+def record_version(cur: Any, component: str, version: str) -> None:
+    cur.execute(_TABLE_DDL)
+    cur.execute(
+        """
+        INSERT INTO schema_versions (component, version, applied_at)
+        VALUES (%s, %s, NOW())
+        ON CONFLICT (component)
+        DO UPDATE SET version = EXCLUDED.version, applied_at = NOW();
+        """,
+        (component, version),
+    )
@@ -0,0 +1,137 @@
+import re
+from typing import Any, Iterable
+
+import psycopg2.extras
+
+# Per-place search documents for /search/smart. They are rebuilt whenever the place's
+# restaurant_current row is refreshed, so search is an indexed lookup instead of
+# ILIKE scans over analysis JOIN stores.
+#
+# Postgres ships no Korean stemmer, so Hangul words are indexed as syllable bigrams
+# (plus unigrams for one-syllable queries like "탕") through the 'simple' config:
+# "김치찌개" -> "김치 치찌 찌개 김 치 찌 개". A query word becomes a phrase of its
+# bigrams, which matches it anywhere inside a longer word ("김치찌개집", "국물이").
+# Latin/number words are indexed as-is and queried as prefixes.
+#
+# Field weights: A = name, B = menus/categories/tags, C = vibe, D = summary.
+
+SEARCH_DDL = """
+ALTER TABLE restaurant_current ADD COLUMN IF NOT EXISTS search_text TEXT;
+ALTER TABLE restaurant_current ADD COLUMN IF NOT EXISTS search_tsv TSVECTOR;
+
+CREATE INDEX IF NOT EXISTS idx_restaurant_current_search_tsv
+    ON restaurant_current USING GIN (search_tsv);
+"""
+
+# Trigram index for typo-tolerant matching; needs pg_trgm, so only the API (which owns
+# extensions) runs it.
+TRGM_DDL = """
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_restaurant_current_search_trgm
+    ON restaurant_current USING GIN (search_text gin_trgm_ops);
+"""
+
+_WORD_RE = re.compile(r"[0-9a-z가-힣]+")
+_HANGUL_RE = re.compile(r"[가-힣]")
+
+_SOURCE_SQL = """
+SELECT
+    place_key,
+    COALESCE(NULLIF(display_name, ''), name, ''),
+    signature_menu_json,
+    categories_json,
+    review_summary_json,
+    category,
+    vibe,
+    summary_3lines
+FROM restaurant_current
+"""
+
+_UPDATE_SQL = """
+UPDATE restaurant_current rc
+SET
+    search_text = d.search_text,
+    search_tsv =
+        setweight(to_tsvector('simple', d.tokens_a), 'A')
+        || setweight(to_tsvector('simple', d.tokens_b), 'B')
+        || setweight(to_tsvector('simple', d.tokens_c), 'C')
+        || setweight(to_tsvector('simple', d.tokens_d), 'D')
+FROM (VALUES %s) AS d(place_key, search_text, tokens_a, tokens_b, tokens_c, tokens_d)
+WHERE rc.place_key = d.place_key;
+"""
+
+
+def _text_items(value: Any) -> list[str]:
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item or "").strip()]
+    if isinstance(value, str) and value.strip():
+        return [value.strip()]
+    return []
+
+
+def _has_hangul(word: str) -> bool:
+    return bool(_HANGUL_RE.search(word))
+
+
+def index_tokens(text: str) -> list[str]:
+    tokens: list[str] = []
+    for word in _WORD_RE.findall((text or "").lower()):
+        if not _has_hangul(word) or len(word) == 1:
+            tokens.append(word)
+            continue
+        tokens.extend(word[i : i + 2] for i in range(len(word) - 1))
+        tokens.extend(word)
+    return tokens
+
+
+def build_tsquery(term: str) -> str:
+    """to_tsquery('simple', ...) text for one search term, '' when nothing is searchable."""
+    parts: list[str] = []
+    for word in _WORD_RE.findall((term or "").lower()):
+        if not _has_hangul(word):
+            parts.append(f"{word}:*")
+        elif len(word) == 1:
+            parts.append(word)
+        else:
+            grams = [word[i : i + 2] for i in range(len(word) - 1)]
+            parts.append(grams[0] if len(grams) == 1 else "(" + " <-> ".join(grams) + ")")
+    return " & ".join(parts)
+
+
+def build_document(row: tuple) -> tuple[str, str, str, str, str, str]:
+    place_key, name, menus, categories, review_summary, category, vibe, summary = row
+    summary_json = review_summary if isinstance(review_summary, dict) else {}
+    fields_b = _text_items(menus) + _text_items(categories) + _text_items(category)
+    fields_b += [tag.lstrip("#") for tag in _text_items(summary_json.get("tags"))]
+    fields_d = _text_items(summary) + _text_items(summary_json.get("one_line_copy"))
+
+    search_text = " ".join([str(name or "").strip(), *fields_b, str(vibe or "").strip(), *fields_d]).strip()
+    return (
+        place_key,
+        search_text.lower(),
+        " ".join(index_tokens(str(name or ""))),
+        " ".join(index_tokens(" ".join(fields_b))),
+        " ".join(index_tokens(str(vibe or ""))),
+        " ".join(index_tokens(" ".join(fields_d))),
+    )
+
+
+def _refresh(cur: Any, where_sql: str, params: tuple) -> int:
+    with cur.connection.cursor() as doc_cur:
+        doc_cur.execute(_SOURCE_SQL + where_sql, params)
+        documents = [build_document(row) for row in doc_cur.fetchall()]
+        if documents:
+            psycopg2.extras.execute_values(doc_cur, _UPDATE_SQL, documents, page_size=500)
+    return len(documents)
+
+
+def refresh_places(cur: Any, place_keys: Iterable[str]) -> int:
+    keys = [key for key in dict.fromkeys(place_keys) if key]
+    if not keys:
+        return 0
+    return _refresh(cur, "WHERE place_key = ANY(%s)", (keys,))
+
+
+def refresh_all(cur: Any, *, only_missing: bool = False) -> int:
+    return _refresh(cur, "WHERE search_tsv IS NULL" if only_missing else "", ())
@@ -0,0 +1,111 @@
+import json
+from typing import Any, Iterable
+
+from libs.common.events import JOB_TERMINAL_STATES, job_state_key
+
+# Single-flight registry: at most one in-flight run per canonical store id. The API
+# claims `inflight_key(store_id)` with SET NX before enqueueing; later submissions for
+# the same store attach to the claimed run. The worker releases the claim when the run
+# completes or fails for good. The TTL only matters when a worker dies mid-job.
+
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_TAKEOVER_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+
+def inflight_key(store_id: str) -> str:
+    return f"hidden_spot:jobs:inflight:{store_id}"
+
+
+def _decode(value: Any) -> str | None:
+    if value is None:
+        return None
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+def _is_finished(raw_state: Any) -> bool:
+    if not raw_state:
+        return False
+    try:
+        return json.loads(raw_state).get("state") in JOB_TERMINAL_STATES
+    except (TypeError, ValueError):
+        return False
+
+
+_CLAIM_ATTEMPTS = 3
+
+
+def claim_inflight_many(
+    redis: Any,
+    claims: Iterable[tuple[str, str]],
+    *,
+    ttl_sec: int,
+    force: bool = False,
+) -> list[str | None]:
+    """Claim (store_id, run_id) pairs, normally in one round-trip.
+
+    Returns, per pair, None when the claim was taken (the caller must enqueue run_id) or
+    the run_id already in flight for that store. force=True always takes the claim.
+    Claims whose holder already reported completed/failed (a missed release) are taken
+    over.
+    """
+    pairs = list(claims)
+    if not pairs:
+        return []
+    results: list[str | None] = [None] * len(pairs)
+    pending = list(range(len(pairs)))
+    for _ in range(_CLAIM_ATTEMPTS):
+        pipe = redis.pipeline(transaction=False)
+        for index in pending:
+            store_id, run_id = pairs[index]
+            if force:
+                pipe.set(inflight_key(store_id), run_id, ex=ttl_sec)
+            else:
+                pipe.set(inflight_key(store_id), run_id, nx=True, ex=ttl_sec)
+            pipe.get(inflight_key(store_id))
+        replies = pipe.execute()
+
+        unsettled = []
+        for position, index in enumerate(pending):
+            claimed, holder = replies[2 * position], _decode(replies[2 * position + 1])
+            if not claimed and holder is None:
+                # The holder expired between SET NX and GET: nobody owns it, claim again.
+                unsettled.append(index)
+                continue
+            results[index] = None if claimed or holder == pairs[index][1] else holder
+        pending = unsettled
+        if not pending:
+            break
+    else:
+        raise RuntimeError(f"single-flight claim did not settle for {len(pending)} store(s)")
+
+    stale = [(index, holder) for index, holder in enumerate(results) if holder is not None]
+    if stale:
+        states = redis.mget([job_state_key(holder) for _, holder in stale])
+        for (index, holder), raw_state in zip(stale, states):
+            if not _is_finished(raw_state):
+                continue
+            store_id, run_id = pairs[index]
+            if redis.eval(_TAKEOVER_SCRIPT, 1, inflight_key(store_id), holder, run_id, ttl_sec):
+                results[index] = None
+    return results
+
+
+def claim_inflight(redis: Any, store_id: str, run_id: str, *, ttl_sec: int, force: bool = False) -> str | None:
+    return claim_inflight_many(redis, [(store_id, run_id)], ttl_sec=ttl_sec, force=force)[0]
+
+
+def release_inflight(redis: Any, store_id: str, run_id: str) -> bool:
+    """Drop the claim if it still belongs to run_id (a forced newer run keeps its own)."""
+    return bool(redis.eval(_RELEASE_SCRIPT, 1, inflight_key(store_id), run_id))
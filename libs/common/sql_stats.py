@@ -0,0 +1,273 @@
+import hashlib
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Any
+
+import psycopg2.extensions
+
+# Per-statement execution stats, collected by a psycopg2 connection factory.
+#
+# Every cursor the connection hands out (whatever cursor_factory the caller asked for)
+# is a subclass that times execute(). Statements are grouped by fingerprint: literals,
+# placeholders and repeated VALUES tuples collapse, so `... WHERE store_id = %s` is one
+# entry however many ids it ran with. Read-only statements slower than the threshold
+# are re-run under EXPLAIN (ANALYZE, BUFFERS) on a sampled basis, at most once per
+# fingerprint per interval, inside a savepoint so a failed EXPLAIN cannot poison the
+# caller's transaction.
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = (os.getenv(name, str(default)) or "").strip()
+    try:
+        value = float(raw)
+    except ValueError:
+        return default
+    return value if value >= 0 else default
+
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER_RE = re.compile(r"%\(\w+\)s|%s")
+_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_VALUES_RE = re.compile(r"(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))+")
+_LIST_RE = re.compile(r"\?(?:\s*,\s*\?)+")
+_CACHEABLE_SQL_CHARS = 4096
+_READ_ONLY_RE = re.compile(r"^\s*(select|with)\b", re.IGNORECASE)
+_WRITE_RE = re.compile(r"\b(insert|update|delete|merge|create|alter|drop|truncate)\b", re.IGNORECASE)
+
+
+def normalize(sql: str) -> str:
+    text = _STRING_RE.sub("?", sql)
+    text = _PLACEHOLDER_RE.sub("?", text)
+    text = _NUMBER_RE.sub("?", text)
+    text = " ".join(text.split())
+    text = _VALUES_RE.sub(r"\1, ...", text)
+    return _LIST_RE.sub("?, ...", text)
+
+
+def fingerprint(sql: str) -> tuple[str, str]:
+    normalized = normalize(sql)
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16], normalized
+
+
+class _Entry:
+    __slots__ = ("query", "calls", "errors", "total_ms", "max_ms", "rows", "samples", "explain", "explained_at")
+
+    def __init__(self, query: str, reservoir: int) -> None:
+        self.query = query
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.samples: deque[float] = deque(maxlen=reservoir)
+        self.explain: dict[str, Any] | None = None
+        self.explained_at = 0.0
+
+
+class SqlStats:
+    """Process-wide statement registry; see module comment."""
+
+    def __init__(
+        self,
+        *,
+        explain_threshold_ms: float = 200.0,
+        explain_sample_rate: float = 0.1,
+        explain_min_interval_sec: float = 300.0,
+        reservoir: int = 512,
+        max_fingerprints: int = 500,
+        fingerprint_cache_bytes: int = 4 * 1024 * 1024,
+    ) -> None:
+        self.explain_threshold_ms = explain_threshold_ms
+        self.explain_sample_rate = explain_sample_rate
+        self.explain_min_interval_sec = explain_min_interval_sec
+        self.reservoir = reservoir
+        self.max_fingerprints = max_fingerprints
+        self.fingerprint_cache_bytes = fingerprint_cache_bytes
+        self.started_at = time.time()
+        self._entries: dict[str, _Entry] = {}
+        self._fingerprints: dict[str, tuple[str, str]] = {}
+        self._fingerprint_bytes = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "SqlStats":
+        return cls(
+            explain_threshold_ms=_env_float("SQL_EXPLAIN_THRESHOLD_MS", 200.0),
+            explain_sample_rate=min(_env_float("SQL_EXPLAIN_SAMPLE_RATE", 0.1), 1.0),
+            explain_min_interval_sec=_env_float("SQL_EXPLAIN_MIN_INTERVAL_SEC", 300.0),
+        )
+
+    def _fingerprint(self, sql: str) -> tuple[str, str]:
+        # execute_values inlines its rows, so batch writes are long and never repeat;
+        # only short statement texts are cached, within a total byte budget.
+        if len(sql) > _CACHEABLE_SQL_CHARS:
+            return fingerprint(sql)
+        cached = self._fingerprints.get(sql)
+        if cached is None:
+            cached = fingerprint(sql)
+            size = len(sql) + len(cached[1])
+            with self._lock:
+                if self._fingerprint_bytes + size <= self.fingerprint_cache_bytes and sql not in self._fingerprints:
+                    self._fingerprints[sql] = cached
+                    self._fingerprint_bytes += size
+        return cached
+
+    def record(self, sql: str, duration_ms: float, rows: int, *, failed: bool = False) -> tuple[str, bool]:
+        """Returns (fingerprint id, whether the caller should capture an EXPLAIN)."""
+        key, normalized = self._fingerprint(sql)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_fingerprints:
+                    key, entry = "other", self._entries.setdefault("other", _Entry("<other statements>", self.reservoir))
+                else:
+                    entry = self._entries[key] = _Entry(normalized, self.reservoir)
+            entry.calls += 1
+            entry.total_ms += duration_ms
+            entry.max_ms = max(entry.max_ms, duration_ms)
+            entry.samples.append(duration_ms)
+            if failed:
+                entry.errors += 1
+            elif rows > 0:
+                entry.rows += rows
+            wants_explain = (
+                not failed
+                and self.explain_sample_rate > 0
+                and duration_ms >= self.explain_threshold_ms
+                and time.time() - entry.explained_at >= self.explain_min_interval_sec
+                and random.random() < self.explain_sample_rate
+                and _READ_ONLY_RE.match(normalized) is not None
+                and _WRITE_RE.search(normalized) is None
+            )
+            if wants_explain:
+                # Claim the slot now so concurrent slow calls do not all EXPLAIN.
+                entry.explained_at = time.time()
+        return key, wants_explain
+
+    def attach_explain(self, key: str, plan: str, duration_ms: float) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.explain = {"plan": plan, "duration_ms": round(duration_ms, 3), "captured_at": time.time()}
+
+    def snapshot(self, *, limit: int = 50, order_by: str = "total_ms", with_plans: bool = True) -> dict[str, Any]:
+        with self._lock:
+            items = [(key, entry, sorted(entry.samples)) for key, entry in self._entries.items()]
+        rows = []
+        for key, entry, samples in items:
+            p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))] if samples else 0.0
+            p50 = samples[len(samples) // 2] if samples else 0.0
+            row = {
+                "fingerprint": key,
+                "query": entry.query,
+                "calls": entry.calls,
+                "errors": entry.errors,
+                "total_ms": round(entry.total_ms, 3),
+                "mean_ms": round(entry.total_ms / entry.calls, 3) if entry.calls else 0.0,
+                "p50_ms": round(p50, 3),
+                "p99_ms": round(p99, 3),
+                "max_ms": round(entry.max_ms, 3),
+                "rows": entry.rows,
+                "rows_per_call": round(entry.rows / entry.calls, 2) if entry.calls else 0.0,
+            }
+            if with_plans:
+                row["explain"] = entry.explain
+            rows.append(row)
+        rows.sort(key=lambda row: row.get(order_by) or 0, reverse=True)
+        return {
+            "since": self.started_at,
+            "fingerprints": len(rows),
+            "explain_threshold_ms": self.explain_threshold_ms,
+            "explain_sample_rate": self.explain_sample_rate,
+            "statements": rows[:limit],
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.started_at = time.time()
+
+
+STATS = SqlStats.from_env()
+
+
+def _as_text(query: Any) -> str:
+    if isinstance(query, bytes):
+        return query.decode("utf-8", errors="replace")
+    if isinstance(query, str):
+        return query
+    # psycopg2.sql.Composable and friends.
+    try:
+        return str(query)
+    except Exception:
+        return repr(query)
+
+
+class _InstrumentedCursorMixin:
+    def execute(self, query: Any, vars: Any = None) -> Any:
+        started = time.perf_counter()
+        try:
+            result = super().execute(query, vars)
+        except Exception:
+            STATS.record(_as_text(query), (time.perf_counter() - started) * 1000, 0, failed=True)
+            raise
+        duration_ms = (time.perf_counter() - started) * 1000
+        key, wants_explain = STATS.record(_as_text(query), duration_ms, self.rowcount)
+        if wants_explain:
+            self._capture_explain(key, query, vars, duration_ms)
+        return result
+
+    def _capture_explain(self, key: str, query: Any, vars: Any, duration_ms: float) -> None:
+        conn = self.connection
+        # A plain cursor built directly, so it is neither instrumented nor the caller's.
+        explain_cur = psycopg2.extensions.cursor(conn)
+        use_savepoint = not conn.autocommit
+        try:
+            if use_savepoint:
+                explain_cur.execute("SAVEPOINT sql_stats_explain")
+            text = _as_text(query)
+            explain_cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT TEXT) " + text, vars)
+            plan = "\n".join(row[0] for row in explain_cur.fetchall())
+            if use_savepoint:
+                explain_cur.execute("RELEASE SAVEPOINT sql_stats_explain")
+            STATS.attach_explain(key, plan, duration_ms)
+        except Exception as exc:
+            logger.warning("sql explain capture failed fingerprint=%s error=%s", key, exc)
+            if use_savepoint:
+                try:
+                    explain_cur.execute("ROLLBACK TO SAVEPOINT sql_stats_explain")
+                except Exception:
+                    pass
+        finally:
+            explain_cur.close()
+
+
+_cursor_classes: dict[type, type] = {}
+_cursor_classes_lock = threading.Lock()
+
+
+def _instrumented(cursor_class: type) -> type:
+    cls = _cursor_classes.get(cursor_class)
+    if cls is None:
+        with _cursor_classes_lock:
+            cls = _cursor_classes.get(cursor_class)
+            if cls is None:
+                cls = type(f"Instrumented{cursor_class.__name__}", (_InstrumentedCursorMixin, cursor_class), {})
+                _cursor_classes[cursor_class] = cls
+    return cls
+
+
+class InstrumentedConnection(psycopg2.extensions.connection):
+    """Pass as PgConnectionPool(connection_factory=...) to record every statement."""
+
+    def cursor(self, *args: Any, **kwargs: Any) -> Any:
+        factory = kwargs.get("cursor_factory") or self.cursor_factory or psycopg2.extensions.cursor
+        kwargs["cursor_factory"] = _instrumented(factory)
+        return super().cursor(*args, **kwargs)
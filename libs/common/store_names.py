@@ -0,0 +1,197 @@
+import re
+from dataclasses import dataclass
+from typing import Any
+
+# Display-name heuristics shared by the worker (write time) and the API's bulk
+# recompute. Whenever the rules below change, recompute stored names with
+# `POST /admin/reparse-store-names` or scripts/recompute_display_names.py.
+
+
+@dataclass(frozen=True)
+class DisplayName:
+    name: str
+    confidence: float
+    source: str
+
+
+def looks_like_identifier_name(name: str, *, store_id: str, naver_place_id: str) -> bool:
+    text = (name or "").strip()
+    if not text:
+        return True
+    lowered = text.lower()
+    identifiers = {store_id.lower(), naver_place_id.lower()}
+    if lowered in identifiers:
+        return True
+    return False
+
+
+def looks_like_noise_name(name: str) -> bool:
+    text = (name or "").strip()
+    if not text:
+        return True
+    lowered = text.lower()
+
+    if any(marker in lowered for marker in ("http://", "https://", "관련 링크", "에서 보기")):
+        return True
+    if "플레이스 플러스" in text or re.search(r"\bplace\s*plus\b", lowered):
+        return True
+    if "이 장소에서" in text:
+        return True
+
+    if len(text) > 42:
+        return True
+
+    # Floor/location fragments are frequently extracted from overview sentences,
+    # but they are not store names (e.g. "지하 1층", "2층", "B1").
+    if re.search(r"^(?:지하\s*\d+\s*층?|\d+\s*층|b\d+)$", lowered):
+        return True
+    if re.search(r"^(?:지하|[0-9]+층)\b", text):
+        return True
+
+    generic_names = {
+        "여기",
+        "이곳",
+        "성수에",
+        "성수에는",
+        "저희는",
+        "저는",
+        "이번에는",
+    }
+    if text in generic_names:
+        return True
+
+    if text.count(" ") >= 2 and any(token in text for token in ("블로그", "후기", "추천", "먹어야", "일상")):
+        return True
+
+    noise_tokens = (
+        "팩트만",
+        "전달",
+        "판단",
+        "방문",
+        "예약",
+        "대기 시간",
+        "데이트",
+        "연인",
+        "배우자",
+        "리뷰",
+        "강추",
+        "추천",
+        "좋았",
+        "맛있",
+        "친절",
+        "쾌적",
+        "분위기",
+        "입장",
+        "지하",
+        "층별",
+        "플레이스",
+        "이 장소에서",
+    )
+    token_hits = sum(1 for token in noise_tokens if token in text)
+    if token_hits >= 2:
+        return True
+
+    if len(text.split()) >= 4 and token_hits >= 1:
+        return True
+
+    return False
+
+
+def clean_candidate_name(text: str) -> str:
+    candidate = re.sub(r"\s+", " ", text).strip()
+    candidate = candidate.strip("[](){}<>\"'`|:;,./")
+    return candidate
+
+
+def infer_name_from_reviews(reviews: list[Any], *, store_id: str, naver_place_id: str) -> str:
+    scores: dict[str, int] = {}
+
+    def add_candidate(raw: str, weight: int) -> None:
+        candidate = clean_candidate_name(raw)
+        if len(candidate) < 2 or len(candidate) > 40:
+            return
+        if looks_like_identifier_name(candidate, store_id=store_id, naver_place_id=naver_place_id):
+            return
+        if looks_like_noise_name(candidate):
+            return
+        scores[candidate] = scores.get(candidate, 0) + weight
+
+    # Keep candidate format conservative: 1~4 tokens, each up to 15 chars.
+    token = r"[가-힣A-Za-z0-9&()'`·\-]{1,15}"
+    phrase = rf"({token}(?:\s{token}){{0,3}})"
+
+    for item in reviews[:30]:
+        text = re.sub(r"\s+", " ", str(item or "")).strip()
+        if not text:
+            continue
+        # Skip nearby-place recommendation lines from map pages:
+        # "<상호명> 카페,디저트성동구 ... 이 장소에서 190m"
+        if (
+            "이 장소에서" in text
+            or re.search(r"(카페,디저트|한식|중식|일식|양식|분식|요리주점|육류,고기요리)", text)
+        ):
+            continue
+
+        # Naver overview style: "<name> 한식 방문자 리뷰 ..."
+        m = re.search(
+            rf"^{phrase}\s+(한식|카페|중식|일식|양식|분식|고기집|음식점|주점|술집|브런치|베이커리|방문자 리뷰)\b",
+            text,
+        )
+        if m:
+            add_candidate(m.group(1), 6)
+
+        # Summary style: "<name>은/는 ..."
+        m = re.search(rf"^{phrase}(?:은|는)\s", text)
+        if m:
+            add_candidate(m.group(1), 4)
+
+        # Reservation style inside review: "<name> 예약 ..."
+        m = re.search(r"([가-힣A-Za-z0-9][가-힣A-Za-z0-9&()'`·\- ]{1,38}?)\s+예약\b", text)
+        if m:
+            add_candidate(m.group(1), 3)
+
+    if not scores:
+        return ""
+    # Highest score first, then shorter candidate.
+    return sorted(scores.items(), key=lambda kv: (-kv[1], len(kv[0]), kv[0]))[0][0]
+
+
+def count_name_mentions(name: str, reviews: list[Any]) -> int:
+    needle = str(name or "").strip().lower()
+    if not needle:
+        return 0
+    count = 0
+    for item in reviews[:60]:
+        text = str(item or "").lower()
+        if needle and needle in text:
+            count += 1
+    return count
+
+
+def resolve_display_name(
+    name: str | None,
+    reviews: list[Any],
+    *,
+    store_id: str,
+    naver_place_id: str | None = None,
+) -> DisplayName:
+    """Pick the name to show for a store from the crawled title and its reviews.
+
+    source is "crawl" when the crawled title is kept, "reviews" when a name mentioned
+    repeatedly in reviews wins, and "none" when nothing usable was found.
+    """
+    place_id = str(naver_place_id or store_id or "").strip()
+    current = str(name or "").strip()
+    if looks_like_identifier_name(current, store_id=store_id, naver_place_id=place_id) or looks_like_noise_name(current):
+        current = ""
+
+    inferred = infer_name_from_reviews(reviews, store_id=store_id, naver_place_id=place_id)
+    inferred_mentions = count_name_mentions(inferred, reviews)
+    if current:
+        current_mentions = count_name_mentions(current, reviews)
+        if inferred and inferred != current and inferred_mentions >= max(2, current_mentions + 1):
+            return DisplayName(inferred, round(min(0.9, 0.5 + 0.1 * inferred_mentions), 2), "reviews")
+        return DisplayName(current, 0.9 if current_mentions > 0 else 0.7, "crawl")
+    if inferred:
+        return DisplayName(inferred, round(min(0.8, 0.3 + 0.1 * inferred_mentions), 2), "reviews")
+    return DisplayName("", 0.0, "none")
@@ -1,24 +1,65 @@
 import argparse
 import json
+from itertools import islice
 from pathlib import Path
+from typing import Iterator
 
 import requests
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Submit URL list to Hidden Spot job API")
-    parser.add_argument("--api", default="http://localhost:8000", help="API base URL")
-    parser.add_argument("--file", required=True, help="Text file with one URL per line")
-    args = parser.parse_args()
+def _iter_urls(path: Path) -> Iterator[str]:
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            url = line.strip()
+            if url:
+                yield url
+
 
-    urls = [line.strip() for line in Path(args.file).read_text(encoding="utf-8").splitlines() if line.strip()]
+def _submit_one_by_one(api: str, urls: Iterator[str]) -> None:
     for url in urls:
-        resp = requests.post(f"{args.api}/jobs", json={"url": url}, timeout=30)
+        resp = requests.post(f"{api}/jobs", json={"url": url}, timeout=30)
         if resp.status_code >= 400:
             print(f"FAILED {url}: {resp.status_code} {resp.text}")
             continue
         print(json.dumps(resp.json(), ensure_ascii=False))
 
 
+def _submit_batches(api: str, urls: Iterator[str], batch_size: int) -> None:
+    with requests.Session() as session:
+        while True:
+            chunk = list(islice(urls, batch_size))
+            if not chunk:
+                return
+            resp = session.post(f"{api}/jobs/batch", json={"urls": chunk}, timeout=120)
+            if resp.status_code >= 400:
+                for url in chunk:
+                    print(f"FAILED {url}: {resp.status_code} {resp.text}")
+                continue
+            for result in resp.json().get("results", []):
+                if "error" in result:
+                    print(f"FAILED {result.get('url')}: {result['error']}")
+                    continue
+                print(json.dumps(result, ensure_ascii=False))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Submit URL list to Hidden Spot job API")
+    parser.add_argument("--api", default="http://localhost:8000", help="API base URL")
+    parser.add_argument("--file", required=True, help="Text file with one URL per line")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=0,
+        help="Stream URLs to POST /jobs/batch in chunks of this size (0 = one POST /jobs per URL)",
+    )
+    args = parser.parse_args()
+
+    urls = _iter_urls(Path(args.file))
+    if args.batch_size > 0:
+        _submit_batches(args.api, urls, args.batch_size)
+    else:
+        _submit_one_by_one(args.api, urls)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,181 @@
+import argparse
+import gzip
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Wire-size / latency benchmark for the serving endpoints. Each path is fetched as
+#   identity  - uncompressed (what every request cost before compression)
+#   gzip, br  - negotiated compression (br only if the server has brotli installed)
+#   304       - conditional GET replaying the ETag from the first response
+# plus a local JSON encode comparison (stdlib json vs orjson) on the fetched payload.
+# --save writes the results; --compare diffs two saved runs (before/after a deploy).
+
+DEFAULT_PATHS = [
+    "/api/v1/restaurants",
+    "/api/v1/restaurants?limit=20",
+    "/api/v1/restaurants?limit=20&fields=name,ai_score,latitude,longitude",
+    "/search/smart?q=%ED%8C%8C%EC%8A%A4%ED%83%80",
+]
+
+
+def _fetch(url: str, headers: dict[str, str]) -> tuple[int, bytes, dict[str, str], float]:
+    request = urllib.request.Request(url, headers=headers)
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=30) as resp:
+            body = resp.read()
+            status, resp_headers = resp.status, dict(resp.headers)
+    except urllib.error.HTTPError as exc:
+        body = exc.read()
+        status, resp_headers = exc.code, dict(exc.headers)
+    return status, body, resp_headers, (time.perf_counter() - started) * 1000
+
+
+def _decode(body: bytes, encoding: str | None) -> bytes:
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "br" and brotli is not None:
+        return brotli.decompress(body)
+    return body
+
+
+def _encode_ms(payload: object, rounds: int) -> dict[str, float | None]:
+    def timed(fn) -> float:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            fn()
+        return (time.perf_counter() - started) * 1000 / rounds
+
+    result: dict[str, float | None] = {
+        "json_encode_ms": round(timed(lambda: json.dumps(payload, ensure_ascii=False).encode("utf-8")), 3),
+        "orjson_encode_ms": None,
+    }
+    if orjson is not None:
+        result["orjson_encode_ms"] = round(timed(lambda: orjson.dumps(payload)), 3)
+    return result
+
+
+def bench_path(api: str, path: str, repeat: int) -> dict:
+    url = f"{api.rstrip('/')}{path}"
+    variants = {"identity": {"Accept-Encoding": "identity"}, "gzip": {"Accept-Encoding": "gzip"}}
+    if brotli is not None:
+        variants["br"] = {"Accept-Encoding": "br"}
+
+    out: dict = {"path": path}
+    etag = None
+    payload = None
+    for name, headers in variants.items():
+        latencies = []
+        wire = decoded = 0
+        encoding = None
+        for _ in range(repeat):
+            status, body, resp_headers, ms = _fetch(url, headers)
+            latencies.append(ms)
+            encoding = resp_headers.get("Content-Encoding")
+            wire = len(body)
+            raw = _decode(body, encoding)
+            decoded = len(raw)
+            etag = etag or resp_headers.get("ETag")
+            if payload is None and status == 200:
+                payload = json.loads(raw)
+        out[name] = {
+            "status": status,
+            "content_encoding": encoding,
+            "wire_bytes": wire,
+            "decoded_bytes": decoded,
+            "p50_ms": round(statistics.median(latencies), 2),
+        }
+
+    if etag:
+        latencies = []
+        for _ in range(repeat):
+            status, body, _, ms = _fetch(url, {"Accept-Encoding": "gzip", "If-None-Match": etag})
+            latencies.append(ms)
+        out["conditional"] = {
+            "status": status,
+            "wire_bytes": len(body),
+            "p50_ms": round(statistics.median(latencies), 2),
+        }
+    else:
+        out["conditional"] = None
+    if payload is not None:
+        out.update(_encode_ms(payload, rounds=max(repeat, 5)))
+    return out
+
+
+def _print_run(results: list[dict]) -> None:
+    for item in results:
+        print(item["path"])
+        for name in ("identity", "gzip", "br"):
+            row = item.get(name)
+            if row:
+                print(
+                    f"  {name:<9} status={row['status']} enc={row['content_encoding'] or '-':<5} "
+                    f"wire={row['wire_bytes']:>9} decoded={row['decoded_bytes']:>9} p50={row['p50_ms']}ms"
+                )
+        cond = item.get("conditional")
+        if cond:
+            print(f"  {'304':<9} status={cond['status']} wire={cond['wire_bytes']:>9} p50={cond['p50_ms']}ms")
+        else:
+            print("  304       (no ETag returned)")
+        if item.get("json_encode_ms") is not None:
+            print(f"  encode    json={item['json_encode_ms']}ms orjson={item.get('orjson_encode_ms')}ms")
+
+
+def _compare(before_path: Path, after_path: Path) -> None:
+    before = {item["path"]: item for item in json.loads(before_path.read_text(encoding="utf-8"))}
+    after = {item["path"]: item for item in json.loads(after_path.read_text(encoding="utf-8"))}
+    for path in [p for p in before if p in after]:
+        b, a = before[path], after[path]
+        # "Default" transfer: what a browser sending gzip gets, or the 304 when it revalidates.
+        b_wire = b["gzip"]["wire_bytes"]
+        a_wire = a["gzip"]["wire_bytes"]
+        a_cond = (a.get("conditional") or {}).get("wire_bytes")
+        print(path)
+        print(f"  gzip-accepting wire bytes: {b_wire} -> {a_wire} ({_pct(b_wire, a_wire)})")
+        if a_cond is not None:
+            print(f"  revalidation wire bytes:   {b_wire} -> {a_cond} ({_pct(b_wire, a_cond)})")
+        print(f"  p50 ms (gzip): {b['gzip']['p50_ms']} -> {a['gzip']['p50_ms']}")
+
+
+def _pct(before: int, after: int) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure serving API payload size and latency")
+    parser.add_argument("--api", default="http://localhost:8000", help="API base URL")
+    parser.add_argument("--path", action="append", help="Path to benchmark (repeatable; defaults to the serving routes)")
+    parser.add_argument("--repeat", type=int, default=5, help="Requests per variant")
+    parser.add_argument("--save", help="Write results JSON to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Diff two saved runs and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        _compare(Path(args.compare[0]), Path(args.compare[1]))
+        return
+
+    results = [bench_path(args.api, path, max(args.repeat, 1)) for path in (args.path or DEFAULT_PATHS)]
+    _print_run(results)
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
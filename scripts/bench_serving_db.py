@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import math
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# Seeded benchmark for the serving queries, run against a throwaway Postgres:
+#   seed     - insert synthetic stores/analysis/reviews/embeddings (ids prefixed "bench-")
+#              at a preset or explicit scale, then rebuild restaurant_current and ANALYZE
+#   run      - time list/get/search/reparse through ApiDatabase with warmup + repetitions
+#              and write a JSON report (latency percentiles, statements per call, and an
+#              EXPLAIN (ANALYZE, BUFFERS) summary of each statement the path issued)
+#   compare  - diff two reports; exits 1 when a case's p95 regressed past --threshold
+# Point it at the bench database with --dsn (or BENCH_DATABASE_URL / DATABASE_URL).
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+ID_PREFIX = "bench-"
+EMBEDDING_DIM = 1536
+SEOUL_BBOX = (37.45, 126.85, 37.65, 127.15)
+
+AREAS = ["성수", "연남", "망원", "을지로", "익선", "서촌", "한남", "합정", "문래", "신당", "망리단", "해방촌", "후암", "용리단"]
+CUISINES = [
+    ("파스타", "양식"),
+    ("돈카츠", "일식"),
+    ("라멘", "일식"),
+    ("스시", "일식"),
+    ("국밥", "한식"),
+    ("냉면", "한식"),
+    ("칼국수", "한식"),
+    ("김치찌개", "한식"),
+    ("삼겹살", "한식"),
+    ("떡볶이", "분식"),
+    ("쌀국수", "아시안"),
+    ("마라탕", "중식"),
+    ("짜장면", "중식"),
+    ("버거", "양식"),
+    ("베이글", "카페"),
+    ("커피", "카페"),
+]
+SUFFIXES = ["식당", "상회", "집", "공방", "키친", "본점", "다이닝", "포차", "하우스", ""]
+VIBES = ["아늑한", "힙한", "조용한", "활기찬", "레트로한", "깔끔한", "노포 감성의", "데이트하기 좋은"]
+TASTES = ["진한", "담백한", "매콤한", "고소한", "달큰한", "짭짤한", "불맛 나는", "새콤한"]
+REVIEW_OPENERS = ["웨이팅 30분 했는데", "점심에 갔는데", "친구 추천으로 왔어요", "재방문입니다", "퇴근길에 들렀는데", "주말 저녁에 방문했어요"]
+REVIEW_BODIES = [
+    "{dish}가 정말 {taste} 맛이라 계속 생각나요",
+    "양이 많고 {dish} 면이 쫄깃해요",
+    "사장님이 친절하시고 {dish} 구성이 알차요",
+    "가격 대비 {dish} 퀄리티가 좋아요",
+    "{dish}는 무난했는데 사이드가 더 맛있었어요",
+    "분위기가 {vibe} 곳이라 오래 머물렀어요",
+]
+REVIEW_CLOSERS = ["또 올게요!", "추천합니다.", "다음엔 다른 메뉴도 먹어볼래요.", "줄 서는 이유가 있네요.", "조금 짰지만 만족.", ""]
+AD_MARKERS = ["체험단으로 방문했습니다.", "소정의 원고료를 받았습니다."]
+SEARCH_TERMS = ["파스타", "국물", "면", "고기", "성수 라멘", "돈카츠", "마라탕", "떡복이", "데이트", "커피"]
+
+
+def _pick(rng: random.Random, items: list) -> Any:
+    return items[rng.randrange(len(items))]
+
+
+def _store_rows(rng: random.Random, index: int, runs: int, reviews: int, now: datetime) -> dict[str, list[tuple]]:
+    store_id = f"{ID_PREFIX}{index:07d}"
+    area = _pick(rng, AREAS)
+    dish, category = _pick(rng, CUISINES)
+    name = f"{area} {dish}{_pick(rng, SUFFIXES)}".strip()
+    vibe = _pick(rng, VIBES)
+    lat = rng.uniform(SEOUL_BBOX[0], SEOUL_BBOX[2])
+    lng = rng.uniform(SEOUL_BBOX[1], SEOUL_BBOX[3])
+    updated = now - timedelta(minutes=rng.randrange(60 * 24 * 180))
+    out: dict[str, list[tuple]] = {"stores": [], "analysis": [], "reviews": [], "embeddings": []}
+    out["stores"].append(
+        (
+            store_id,
+            f"https://map.naver.com/p/entry/place/{9_000_000_000 + index}",
+            str(9_000_000_000 + index),
+            name,
+            f"서울 {area}동 {rng.randrange(1, 300)}-{rng.randrange(1, 40)}",
+            f"{area}역 {rng.randrange(1, 9)}번 출구에서 {rng.randrange(2, 15)}분",
+            lat,
+            lng,
+            category,
+            updated,
+        )
+    )
+    for run in range(runs):
+        collected = updated - timedelta(days=7 * (runs - 1 - run))
+        menus = [dish] + rng.sample([d for d, _ in CUISINES if d != dish], 2)
+        summary = {
+            "one_line_copy": f"{vibe} 분위기의 {area} {dish} 맛집",
+            "tags": [area, dish, category],
+            "taste_profile": {"category_name": category, "metrics": []},
+            "pro_tips": [f"{rng.randrange(11, 14)}시 전에 가면 웨이팅이 짧아요"],
+            "negative_points": ["주차가 어려워요"] if rng.random() < 0.5 else [],
+        }
+        out["analysis"].append(
+            (
+                store_id,
+                collected,
+                f"{store_id}-run{run}",
+                f"{vibe} {area}의 {dish} 전문점.\n{_pick(rng, TASTES)} 국물과 {menus[1]}가 인기.\n웨이팅이 있지만 회전이 빨라요.",
+                vibe,
+                json.dumps(menus, ensure_ascii=False),
+                json.dumps(summary["pro_tips"], ensure_ascii=False),
+                round(rng.uniform(40, 98), 1),
+                round(rng.uniform(0, 0.4), 3),
+                json.dumps(summary, ensure_ascii=False),
+                json.dumps([category, dish], ensure_ascii=False),
+                collected,
+            )
+        )
+    for review in range(reviews):
+        body = _pick(rng, REVIEW_BODIES).format(dish=dish, taste=_pick(rng, TASTES), vibe=vibe)
+        is_ad = rng.random() < 0.05
+        text = " ".join(
+            part for part in (_pick(rng, REVIEW_OPENERS), body, _pick(rng, REVIEW_CLOSERS), _pick(rng, AD_MARKERS) if is_ad else "") if part
+        )
+        created = updated - timedelta(hours=rng.randrange(24 * 365))
+        out["reviews"].append(
+            (store_id, f"r{review}", created.date(), float(rng.randrange(1, 6)), text, is_ad, created)
+        )
+    return out
+
+
+def _vector_literal(rng: random.Random) -> str:
+    values = [rng.gauss(0.0, 1.0) for _ in range(EMBEDDING_DIM)]
+    norm = math.sqrt(sum(v * v for v in values)) or 1.0
+    return "[" + ",".join(f"{v / norm:.5f}" for v in values) + "]"
+
+
+_INSERT_SQL = {
+    "stores": """
+        INSERT INTO stores (store_id, url, naver_place_id, name, address, transport_info, lat, lng, category, updated_at)
+        VALUES %s ON CONFLICT (store_id) DO NOTHING
+    """,
+    "analysis": """
+        INSERT INTO analysis
+            (store_id, collected_at, run_id, summary_3lines, vibe, signature_menu_json, tips_json,
+             score, ad_review_ratio, review_summary_json, categories_json, updated_at)
+        VALUES %s ON CONFLICT (run_id) DO NOTHING
+    """,
+    "reviews": """
+        INSERT INTO reviews (store_id, review_key, date, rating, text, is_ad_suspect, created_at)
+        VALUES %s ON CONFLICT (store_id, review_key) DO NOTHING
+    """,
+    "embeddings": """
+        INSERT INTO embeddings (store_id, doc_type, vector)
+        VALUES %s ON CONFLICT (store_id, doc_type) DO NOTHING
+    """,
+}
+_INSERT_TEMPLATES = {"embeddings": "(%s, %s, %s::vector)"}
+
+
+def _delete_bench_rows(db: Any) -> None:
+    with db.conn() as conn:
+        with conn.cursor() as cur:
+            pattern = ID_PREFIX + "%"
+            for table in ("reviews", "embeddings", "analysis", "stores"):
+                cur.execute(f"DELETE FROM {table} WHERE store_id LIKE %s", (pattern,))
+            cur.execute("DELETE FROM restaurant_current WHERE store_id LIKE %s", (pattern,))
+
+
+def seed(args: argparse.Namespace) -> int:
+    import psycopg2.extras
+
+    from apps.api.db import ApiDatabase
+
+    stores = args.stores or SCALES[args.scale]
+    db = ApiDatabase()
+    db.ensure_tables()
+    if args.reset:
+        _delete_bench_rows(db)
+
+    rng = random.Random(args.seed)
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    started = time.perf_counter()
+    counts = {table: 0 for table in _INSERT_SQL}
+    for batch_start in range(0, stores, args.batch_size):
+        batch: dict[str, list[tuple]] = {table: [] for table in _INSERT_SQL}
+        for index in range(batch_start, min(batch_start + args.batch_size, stores)):
+            for table, rows in _store_rows(rng, index, args.runs, args.reviews, now).items():
+                batch[table].extend(rows)
+            if args.embeddings:
+                batch["embeddings"].append((f"{ID_PREFIX}{index:07d}", "analysis_summary", _vector_literal(rng)))
+        with db.conn() as conn:
+            with conn.cursor() as cur:
+                for table, rows in batch.items():
+                    if rows:
+                        psycopg2.extras.execute_values(
+                            cur, _INSERT_SQL[table], rows, template=_INSERT_TEMPLATES.get(table), page_size=1000
+                        )
+                        counts[table] += len(rows)
+        print(f"seeded {min(batch_start + args.batch_size, stores)}/{stores} stores", file=sys.stderr)
+
+    seeded_ms = int((time.perf_counter() - started) * 1000)
+    projection = db.rebuild_restaurant_projection()
+    with db.conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("ANALYZE;")
+    result = {
+        "stores": stores,
+        "runs_per_store": args.runs,
+        "reviews_per_store": args.reviews,
+        "inserted": counts,
+        "projection_rows": projection["rows"],
+        "seed_ms": seeded_ms,
+        "total_ms": int((time.perf_counter() - started) * 1000),
+    }
+    print(json.dumps(result, ensure_ascii=False))
+    return 0
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _latency_summary(samples_ms: list[float]) -> dict[str, float]:
+    ordered = sorted(samples_ms)
+    return {
+        "n": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 3) if ordered else 0.0,
+        "p50_ms": round(_percentile(ordered, 50), 3),
+        "p90_ms": round(_percentile(ordered, 90), 3),
+        "p95_ms": round(_percentile(ordered, 95), 3),
+        "p99_ms": round(_percentile(ordered, 99), 3),
+        "max_ms": round(ordered[-1], 3) if ordered else 0.0,
+    }
+
+
+_SCAN_RE = re.compile(
+    r"((?:Parallel )?(?:Seq Scan|Index Only Scan|Index Scan|Bitmap Heap Scan|Bitmap Index Scan))(?: Backward)?"
+    r"(?: using (\S+))?(?: on (\S+))?"
+)
+_BUFFERS_RE = re.compile(r"Buffers: shared(?: hit=(\d+))?(?: read=(\d+))?")
+_TIME_RE = re.compile(r"(Planning|Execution) Time: ([\d.]+) ms")
+
+
+def summarize_plan(plan: str) -> dict[str, Any]:
+    lines = plan.splitlines()
+    summary: dict[str, Any] = {"root": lines[0].split("  (")[0].strip() if lines else "", "scans": []}
+    for line in lines:
+        match = _SCAN_RE.search(line)
+        if match:
+            node, index, relation = match.groups()
+            summary["scans"].append(" ".join(part for part in (node, f"on {relation}" if relation else "", f"using {index}" if index else "") if part))
+    buffers = _BUFFERS_RE.search(plan)
+    if buffers:
+        summary["shared_hit"] = int(buffers.group(1) or 0)
+        summary["shared_read"] = int(buffers.group(2) or 0)
+    for kind, value in _TIME_RE.findall(plan):
+        summary[f"{kind.lower()}_ms"] = float(value)
+    summary["scans"] = sorted(set(summary["scans"]))
+    return summary
+
+
+def _capture_plans(stats: Any, call: Callable[[], Any]) -> list[dict[str, Any]]:
+    """One extra call with every read-only statement EXPLAINed; timings from this call are discarded."""
+    saved = (stats.explain_threshold_ms, stats.explain_sample_rate, stats.explain_min_interval_sec)
+    stats.reset()
+    stats.explain_threshold_ms, stats.explain_sample_rate, stats.explain_min_interval_sec = 0.0, 1.0, 0.0
+    try:
+        call()
+    finally:
+        stats.explain_threshold_ms, stats.explain_sample_rate, stats.explain_min_interval_sec = saved
+    plans = []
+    for row in stats.snapshot(limit=50)["statements"]:
+        if row.get("explain"):
+            plans.append({"query": row["query"][:240], **summarize_plan(row["explain"]["plan"])})
+    return plans
+
+
+def _run_case(stats: Any, name: str, calls: list[Callable[[], Any]], warmup: int, repeat: int, plans: bool) -> dict:
+    for i in range(warmup):
+        calls[i % len(calls)]()
+    stats.reset()
+    samples = []
+    rows = 0
+    for i in range(repeat):
+        started = time.perf_counter()
+        result = calls[i % len(calls)]()
+        samples.append((time.perf_counter() - started) * 1000)
+        if isinstance(result, tuple):
+            result = result[0]
+        rows += len(result) if isinstance(result, list) else int(result is not None)
+    statements = stats.snapshot(limit=50, with_plans=False)["statements"]
+    out = {
+        "latency": _latency_summary(samples),
+        "rows_per_call": round(rows / max(repeat, 1), 2),
+        "statements_per_call": round(sum(row["calls"] for row in statements) / max(repeat, 1), 2),
+        "db_ms_per_call": round(sum(row["total_ms"] for row in statements) / max(repeat, 1), 3),
+    }
+    if plans:
+        out["plans"] = _capture_plans(stats, calls[0])
+    print(f"{name:<22} p50={out['latency']['p50_ms']}ms p95={out['latency']['p95_ms']}ms stmts={out['statements_per_call']}", file=sys.stderr)
+    return out
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run(args: argparse.Namespace) -> int:
+    from apps.api.db import ApiDatabase
+    from apps.api.search import expand_query_weighted
+    from libs.common import sql_stats
+
+    db = ApiDatabase()
+    rng = random.Random(args.seed)
+    with db.conn() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT store_id FROM stores WHERE store_id LIKE %s ORDER BY store_id", (ID_PREFIX + "%",))
+            store_ids = [row[0] for row in cur.fetchall()]
+            counts = {}
+            for table in ("stores", "analysis", "reviews", "embeddings", "restaurant_current"):
+                cur.execute(f"SELECT COUNT(*) FROM {table}")
+                counts[table] = cur.fetchone()[0]
+            cur.execute("SHOW server_version")
+            server_version = cur.fetchone()[0]
+    if not store_ids:
+        print("no bench stores found; run `seed` first", file=sys.stderr)
+        return 1
+    sample_ids = rng.sample(store_ids, min(len(store_ids), 200))
+
+    def list_after(page: int) -> Callable[[], Any]:
+        def call():
+            after = None
+            for _ in range(page):
+                _, after = db.list_restaurants_page(limit=20, after=after)
+            return db.list_restaurants_page(limit=20, after=after)
+
+        return call
+
+    cases: dict[str, list[Callable[[], Any]]] = {
+        "list_first_page": [lambda: db.list_restaurants_page(limit=20)],
+        "list_page_10": [list_after(10)],
+        "list_keyword": [lambda kw=kw: db.list_restaurants_page(keyword=kw, limit=20) for kw in ("파스타", "성수", "국밥")],
+        "list_min_score_80": [lambda: db.list_restaurants_page(min_score=80, limit=20)],
+        "list_full": [lambda: db.list_restaurants_page()],
+        "get_restaurant": [lambda sid=sid: db.get_restaurant(sid) for sid in sample_ids],
+        "smart_search": [lambda q=q: db.smart_search(expand_query_weighted(q), limit=50) for q in SEARCH_TERMS],
+        "reparse_store_names": [lambda: db.reparse_store_names(limit=args.reparse_limit)],
+    }
+    # Full listings and the reparse pass are seconds, not milliseconds, at 100k.
+    heavy = {"list_full", "reparse_store_names"}
+    selected = args.case or list(cases)
+
+    report: dict[str, Any] = {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "server_version": server_version,
+            "counts": counts,
+            "warmup": args.warmup,
+            "repeat": args.repeat,
+        },
+        "cases": {},
+    }
+    for name in selected:
+        repeat = min(args.repeat, args.heavy_repeat) if name in heavy else args.repeat
+        warmup = min(args.warmup, 1) if name in heavy else args.warmup
+        report["cases"][name] = _run_case(sql_stats.STATS, name, cases[name], warmup, repeat, plans=not args.no_plans)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+    else:
+        print(text)
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    before = json.loads(Path(args.before).read_text(encoding="utf-8"))
+    after = json.loads(Path(args.after).read_text(encoding="utf-8"))
+    print(f"before={before['meta'].get('commit')} after={after['meta'].get('commit')}")
+    regressed = []
+    for name, b in before["cases"].items():
+        a = after["cases"].get(name)
+        if a is None:
+            continue
+        line = [f"{name:<22}"]
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            line.append(f"{key[:-3]} {b['latency'][key]:>9} -> {a['latency'][key]:<9} ({_pct(b['latency'][key], a['latency'][key])})")
+        line.append(f"stmts {b['statements_per_call']} -> {a['statements_per_call']}")
+        print("  ".join(line))
+        b_scans = {scan for plan in b.get("plans", []) for scan in plan["scans"]}
+        a_scans = {scan for plan in a.get("plans", []) for scan in plan["scans"]}
+        for scan in sorted(a_scans - b_scans):
+            print(f"    + {scan}")
+        for scan in sorted(b_scans - a_scans):
+            print(f"    - {scan}")
+        base = b["latency"]["p95_ms"]
+        if base and (a["latency"]["p95_ms"] - base) / base * 100 > args.threshold:
+            regressed.append(name)
+    if regressed:
+        print(f"p95 regressed more than {args.threshold}%: {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+def _pct(before: float, after: float) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Seeded benchmark for the serving database queries")
+    parser.add_argument("--dsn", help="Bench database URL (default: BENCH_DATABASE_URL, then DATABASE_URL)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = sub.add_parser("seed", help="Insert synthetic bench-* rows and rebuild the projection")
+    seed_parser.add_argument("--scale", choices=sorted(SCALES), default="1k")
+    seed_parser.add_argument("--stores", type=int, default=0, help="Explicit store count (overrides --scale)")
+    seed_parser.add_argument("--runs", type=int, default=2, help="Analysis runs per store")
+    seed_parser.add_argument("--reviews", type=int, default=20, help="Reviews per store")
+    seed_parser.add_argument("--no-embeddings", dest="embeddings", action="store_false")
+    seed_parser.add_argument("--batch-size", type=int, default=1000)
+    seed_parser.add_argument("--seed", type=int, default=42)
+    seed_parser.add_argument("--reset", action="store_true", help="Delete existing bench-* rows first")
+
+    run_parser = sub.add_parser("run", help="Time the serving query paths and write a JSON report")
+    run_parser.add_argument("--case", action="append", help="Case to run (repeatable; default all)")
+    run_parser.add_argument("--warmup", type=int, default=3)
+    run_parser.add_argument("--repeat", type=int, default=30)
+    run_parser.add_argument("--heavy-repeat", type=int, default=3, help="Repetitions for list_full and reparse")
+    run_parser.add_argument("--reparse-limit", type=int, default=1000)
+    run_parser.add_argument("--no-plans", action="store_true", help="Skip the EXPLAIN pass")
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--out", help="Write the report here instead of stdout")
+
+    compare_parser = sub.add_parser("compare", help="Diff two reports")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="Allowed p95 regression in percent")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        return compare(args)
+
+    dsn = args.dsn or os.getenv("BENCH_DATABASE_URL")
+    if dsn:
+        os.environ["DATABASE_URL"] = dsn
+    # The run report's statement counts and plans come from the instrumented pool.
+    os.environ["SQL_STATS_ENABLED"] = "true"
+    return seed(args) if args.command == "seed" else run(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
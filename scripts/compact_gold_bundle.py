@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from libs.common import MinioDataLakeClient, gold_bundle
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compact latest gold analysis per store into the cold-start bundle")
+    parser.add_argument("--fetch-workers", type=int, default=8)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    manifest = gold_bundle.compact(MinioDataLakeClient(), fetch_workers=max(args.fetch_workers, 1))
+    manifest["duration_ms"] = int((time.perf_counter() - started) * 1000)
+    print(json.dumps(manifest, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
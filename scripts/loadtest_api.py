@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+import argparse
+import gzip
+import http.client
+import json
+import math
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# HTTP load test for apps/api/main.py. Worker threads replay a weighted mix of
+#   list        - /api/v1/restaurants pages with random min_score/keyword/fields filters
+#   detail      - /api/v1/restaurants/{id} for ids sampled from the catalog
+#   search      - /search/smart over a fixed Korean query set
+#   job_create  - POST /jobs over a small pool of place URLs (mostly dedup/reuse hits)
+#   job_poll    - GET /jobs/{id} for jobs created earlier in the run
+# at each concurrency stage for a fixed duration, and report throughput, latency
+# percentiles and error rates per stage and per op, plus /admin/db-pool after each stage.
+# The knee is the last stage before throughput stops scaling while p95 climbs (or errors
+# appear); that is the number to watch as pooling/caching work lands (--save / --compare).
+#
+# Run against local Postgres + Redis (docker compose up postgres redis, then
+# `scripts/bench_serving_db.py seed` for data). --start-server launches uvicorn itself
+# with --server-env overrides, e.g. --server-env DB_POOL_MAX_SIZE=20. Do not leave a
+# worker consuming the queue unless crawling the job_create URLs is intended.
+
+DEFAULT_MIX = {"list": 35, "detail": 30, "search": 20, "job_create": 5, "job_poll": 10}
+DEFAULT_STAGES = "1,2,4,8,16,32,64"
+KEYWORDS = ["파스타", "성수", "국밥", "라멘", "카페", "데이트"]
+SEARCH_TERMS = ["파스타", "국물", "면", "고기", "성수 라멘", "돈카츠", "마라탕", "떡복이", "데이트", "커피"]
+FIELDS = "id,name,ai_score,latitude,longitude,category"
+
+
+class Client:
+    """One keep-alive connection per worker thread; reconnects after errors."""
+
+    def __init__(self, base: urllib.parse.SplitResult, timeout: float, keepalive: bool) -> None:
+        self.base = base
+        self.timeout = timeout
+        self.keepalive = keepalive
+        self._conn: http.client.HTTPConnection | None = None
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self._conn is None:
+            cls = http.client.HTTPSConnection if self.base.scheme == "https" else http.client.HTTPConnection
+            self._conn = cls(self.base.hostname, self.base.port, timeout=self.timeout)
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def request(self, method: str, path: str, body: dict | None = None) -> tuple[int, bytes]:
+        headers = {"Accept-Encoding": "gzip"}
+        if not self.keepalive:
+            headers["Connection"] = "close"
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        conn = self._connection()
+        try:
+            conn.request(method, path, body=payload, headers=headers)
+            resp = conn.getresponse()
+            data = resp.read()
+            if resp.getheader("Content-Encoding") == "gzip":
+                data = gzip.decompress(data)
+        except Exception:
+            self.close()
+            raise
+        if not self.keepalive or resp.will_close:
+            self.close()
+        return resp.status, data
+
+
+class Scenario:
+    def __init__(self, mix: dict[str, int], restaurant_ids: list[str], job_urls: int) -> None:
+        self.ops = [op for op, weight in mix.items() if weight > 0]
+        self.weights = [mix[op] for op in self.ops]
+        self.restaurant_ids = restaurant_ids
+        self.job_urls = [f"https://map.naver.com/p/entry/place/{1_900_000_000 + i}" for i in range(job_urls)]
+        self.job_ids: list[str] = []
+        self._lock = threading.Lock()
+
+    def next(self, rng: random.Random) -> tuple[str, str, str, dict | None]:
+        op = rng.choices(self.ops, self.weights)[0]
+        if op == "detail" and self.restaurant_ids:
+            return op, "GET", f"/api/v1/restaurants/{urllib.parse.quote(rng.choice(self.restaurant_ids))}", None
+        if op == "search":
+            return op, "GET", "/search/smart?" + urllib.parse.urlencode({"q": rng.choice(SEARCH_TERMS), "limit": 20}), None
+        if op == "job_create":
+            return op, "POST", "/jobs", {"url": rng.choice(self.job_urls)}
+        if op == "job_poll":
+            with self._lock:
+                job_id = rng.choice(self.job_ids) if self.job_ids else None
+            if job_id:
+                return op, "GET", f"/jobs/{urllib.parse.quote(job_id)}", None
+        params: dict[str, Any] = {"limit": 20, "min_score": rng.choice([0, 0, 60, 80])}
+        if rng.random() < 0.3:
+            params["keyword"] = rng.choice(KEYWORDS)
+        if rng.random() < 0.5:
+            params["fields"] = FIELDS
+        return "list", "GET", "/api/v1/restaurants?" + urllib.parse.urlencode(params), None
+
+    def observe(self, op: str, status: int, body: bytes) -> None:
+        if op != "job_create" or status >= 400:
+            return
+        try:
+            job_id = json.loads(body).get("job_id")
+        except ValueError:
+            return
+        if job_id:
+            with self._lock:
+                if job_id not in self.job_ids:
+                    self.job_ids.append(job_id)
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _latency(samples_ms: list[float]) -> dict[str, float]:
+    ordered = sorted(samples_ms)
+    return {
+        "mean_ms": round(statistics.fmean(ordered), 2) if ordered else 0.0,
+        "p50_ms": round(_percentile(ordered, 50), 2),
+        "p90_ms": round(_percentile(ordered, 90), 2),
+        "p95_ms": round(_percentile(ordered, 95), 2),
+        "p99_ms": round(_percentile(ordered, 99), 2),
+        "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+    }
+
+
+def _worker(
+    index: int,
+    args: argparse.Namespace,
+    scenario: Scenario,
+    base: urllib.parse.SplitResult,
+    record_from: float,
+    deadline: float,
+    out: list[tuple[str, int | str, float]],
+) -> None:
+    rng = random.Random(args.seed * 1000 + index)
+    client = Client(base, args.timeout, not args.no_keepalive)
+    try:
+        while True:
+            started = time.perf_counter()
+            if started >= deadline:
+                break
+            op, method, path, body = scenario.next(rng)
+            try:
+                status, data = client.request(method, path, body)
+                scenario.observe(op, status, data)
+                outcome: int | str = status
+            except Exception as exc:
+                outcome = type(exc).__name__
+            if started >= record_from:
+                out.append((op, outcome, (time.perf_counter() - started) * 1000))
+            if args.think_ms:
+                time.sleep(rng.uniform(0, 2 * args.think_ms) / 1000)
+    finally:
+        client.close()
+
+
+def _is_error(outcome: int | str) -> bool:
+    return isinstance(outcome, str) or outcome >= 500 or outcome == 429
+
+
+def _summarize(samples: list[tuple[str, int | str, float]], seconds: float) -> dict[str, Any]:
+    errors: dict[str, int] = {}
+    for _, outcome, _ in samples:
+        if _is_error(outcome):
+            errors[str(outcome)] = errors.get(str(outcome), 0) + 1
+    by_op: dict[str, dict[str, Any]] = {}
+    for op in sorted({op for op, _, _ in samples}):
+        op_samples = [(outcome, ms) for name, outcome, ms in samples if name == op]
+        by_op[op] = {
+            "requests": len(op_samples),
+            "error_rate": round(sum(_is_error(o) for o, _ in op_samples) / len(op_samples), 4),
+            **_latency([ms for _, ms in op_samples]),
+        }
+    total = len(samples)
+    return {
+        "requests": total,
+        "rps": round(total / seconds, 2) if seconds else 0.0,
+        "error_rate": round(sum(errors.values()) / total, 4) if total else 0.0,
+        "errors": errors,
+        **_latency([ms for _, _, ms in samples]),
+        "ops": by_op,
+    }
+
+
+def _server_stats(base_url: str, timeout: float) -> dict | None:
+    base = urllib.parse.urlsplit(base_url)
+    client = Client(base, timeout, keepalive=False)
+    try:
+        status, body = client.request("GET", "/admin/db-pool")
+        return json.loads(body) if status == 200 else None
+    except Exception:
+        return None
+
+
+def find_knee(stages: list[dict[str, Any]], *, min_gain: float = 0.10, p95_growth: float = 0.5, max_errors: float = 0.01) -> int | None:
+    """Concurrency of the last stage that still scaled; None if every stage did."""
+    for prev, cur in zip(stages, stages[1:]):
+        if cur["error_rate"] > max_errors:
+            return prev["concurrency"]
+        gain = (cur["rps"] - prev["rps"]) / prev["rps"] if prev["rps"] else 0.0
+        growth = (cur["p95_ms"] - prev["p95_ms"]) / prev["p95_ms"] if prev["p95_ms"] else 0.0
+        if gain < min_gain and growth > p95_growth:
+            return prev["concurrency"]
+    return None
+
+
+def _restaurant_ids(base_url: str, timeout: float, limit: int) -> list[str]:
+    client = Client(urllib.parse.urlsplit(base_url), timeout, keepalive=False)
+    query = urllib.parse.urlencode({"limit": limit, "fields": "id"})
+    try:
+        status, body = client.request("GET", f"/api/v1/restaurants?{query}")
+    except Exception as exc:
+        print(f"could not list restaurants: {exc}", file=sys.stderr)
+        return []
+    if status != 200:
+        return []
+    return [str(item["id"]) for item in json.loads(body) if isinstance(item, dict) and item.get("id")]
+
+
+def _start_server(args: argparse.Namespace) -> subprocess.Popen:
+    port = urllib.parse.urlsplit(args.api).port or 8000
+    env = dict(os.environ)
+    for item in args.server_env or []:
+        key, _, value = item.partition("=")
+        env[key] = value
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "apps.api.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        env=env,
+    )
+    deadline = time.monotonic() + args.ready_timeout
+    client = Client(urllib.parse.urlsplit(args.api), 2.0, keepalive=False)
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with code {proc.returncode}")
+        try:
+            status, _ = client.request("GET", "/ready")
+            if status == 200:
+                return proc
+        except Exception:
+            pass
+        time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError(f"server not ready after {args.ready_timeout}s")
+
+
+def _parse_mix(raw: str | None) -> dict[str, int]:
+    if not raw:
+        return dict(DEFAULT_MIX)
+    mix = {op: 0 for op in DEFAULT_MIX}
+    for part in raw.split(","):
+        op, _, weight = part.partition("=")
+        if op.strip() not in mix:
+            raise SystemExit(f"unknown op in --mix: {op!r} (known: {', '.join(DEFAULT_MIX)})")
+        mix[op.strip()] = int(weight or 0)
+    return mix
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    base = urllib.parse.urlsplit(args.api)
+    ids = _restaurant_ids(args.api, args.timeout, args.id_sample)
+    mix = _parse_mix(args.mix)
+    if not ids and mix.get("detail"):
+        print("catalog is empty; detail requests fall back to list", file=sys.stderr)
+    scenario = Scenario(mix, ids, args.job_urls)
+
+    stages = []
+    for concurrency in [int(c) for c in args.stages.split(",") if c.strip()]:
+        samples: list[tuple[str, int | str, float]] = []
+        now = time.perf_counter()
+        record_from = now + args.warmup_seconds
+        deadline = record_from + args.stage_seconds
+        buckets: list[list] = [[] for _ in range(concurrency)]
+        threads = [
+            threading.Thread(target=_worker, args=(i, args, scenario, base, record_from, deadline, buckets[i]), daemon=True)
+            for i in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for bucket in buckets:
+            samples.extend(bucket)
+        stage = {"concurrency": concurrency, **_summarize(samples, args.stage_seconds)}
+        if not args.no_server_stats:
+            stage["db_pool"] = _server_stats(args.api, args.timeout)
+        stages.append(stage)
+        print(
+            f"c={concurrency:<4} rps={stage['rps']:<9} p50={stage['p50_ms']:<8} p95={stage['p95_ms']:<8} "
+            f"p99={stage['p99_ms']:<8} errors={stage['error_rate']:.2%}",
+            file=sys.stderr,
+        )
+        if stage["error_rate"] > args.abort_error_rate:
+            print(f"stopping: error rate above {args.abort_error_rate:.0%}", file=sys.stderr)
+            break
+
+    knee = find_knee(stages)
+    return {
+        "api": args.api,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "mix": mix,
+        "stage_seconds": args.stage_seconds,
+        "keepalive": not args.no_keepalive,
+        "server_env": args.server_env or [],
+        "knee_concurrency": knee,
+        "peak_rps": max((stage["rps"] for stage in stages), default=0.0),
+        "stages": stages,
+    }
+
+
+def _compare(before_path: Path, after_path: Path) -> None:
+    before = json.loads(before_path.read_text(encoding="utf-8"))
+    after = json.loads(after_path.read_text(encoding="utf-8"))
+    print(f"knee: {before['knee_concurrency']} -> {after['knee_concurrency']}   peak rps: {before['peak_rps']} -> {after['peak_rps']}")
+    after_stages = {stage["concurrency"]: stage for stage in after["stages"]}
+    for b in before["stages"]:
+        a = after_stages.get(b["concurrency"])
+        if a is None:
+            continue
+        print(
+            f"c={b['concurrency']:<4} rps {b['rps']} -> {a['rps']} ({_pct(b['rps'], a['rps'])})  "
+            f"p95 {b['p95_ms']} -> {a['p95_ms']} ({_pct(b['p95_ms'], a['p95_ms'])})  "
+            f"errors {b['error_rate']:.2%} -> {a['error_rate']:.2%}"
+        )
+
+
+def _pct(before: float, after: float) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Staged HTTP load test for the serving API")
+    parser.add_argument("--api", default="http://127.0.0.1:8000", help="API base URL")
+    parser.add_argument("--stages", default=DEFAULT_STAGES, help="Comma-separated concurrency levels")
+    parser.add_argument("--stage-seconds", type=float, default=20.0)
+    parser.add_argument("--warmup-seconds", type=float, default=3.0, help="Unrecorded lead-in per stage")
+    parser.add_argument("--mix", help=f"Op weights, e.g. list=40,detail=40,search=20 (default {DEFAULT_MIX})")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Mean pause between a worker's requests")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--no-keepalive", action="store_true", help="Open a connection per request")
+    parser.add_argument("--id-sample", type=int, default=500, help="Restaurant ids to draw detail requests from")
+    parser.add_argument("--job-urls", type=int, default=20, help="Distinct place URLs used by job_create")
+    parser.add_argument("--abort-error-rate", type=float, default=0.5)
+    parser.add_argument("--no-server-stats", action="store_true", help="Skip /admin/db-pool after each stage")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--start-server", action="store_true", help="Launch uvicorn for apps.api.main:app")
+    parser.add_argument("--server-env", action="append", metavar="KEY=VALUE", help="Env override for --start-server")
+    parser.add_argument("--ready-timeout", type=float, default=120.0)
+    parser.add_argument("--save", help="Write results JSON to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Diff two saved runs and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        _compare(Path(args.compare[0]), Path(args.compare[1]))
+        return 0
+
+    server = _start_server(args) if args.start_server else None
+    try:
+        result = run(args)
+    finally:
+        if server is not None:
+            server.terminate()
+            try:
+                server.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    print(f"knee concurrency: {result['knee_concurrency'] or 'not reached'}  peak rps: {result['peak_rps']}")
+    if args.save:
+        Path(args.save).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from apps.api.db import ApiDatabase
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild restaurant_current serving projection from stores/analysis/reviews")
+    parser.parse_args()
+
+    db = ApiDatabase()
+    db.ensure_tables()
+    started = time.perf_counter()
+    result = db.rebuild_restaurant_projection()
+    result["duration_ms"] = int((time.perf_counter() - started) * 1000)
+    result["database_url_set"] = bool(os.getenv("DATABASE_URL"))
+    print(json.dumps(result, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from apps.api.db import ApiDatabase
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Recompute stores.display_name after changing the name heuristics")
+    parser.add_argument("--limit", type=int, default=0, help="0 means all stores")
+    parser.add_argument("--only-missing", action="store_true", help="Only stores without a resolved display name")
+    args = parser.parse_args()
+
+    db = ApiDatabase()
+    db.ensure_tables()
+    started = time.perf_counter()
+    result = db.reparse_store_names(limit=args.limit, only_missing=args.only_missing)
+    result["duration_ms"] = int((time.perf_counter() - started) * 1000)
+    print(json.dumps(result, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())